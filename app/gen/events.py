@@ -1,21 +1,28 @@
 import json
 import os
 import random
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict
 
+import numpy as np
 import pandas as pd
 
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen.storage import TableWriter, format_id, iter_table_chunks, read_table, table_path
+
 
 # =====================
 # CONFIG
 # =====================
 INPUT_DIR = Path("data")
 OUTPUT_DIR = Path("data")
-PLAYERS_CSV = INPUT_DIR / "raw_players.csv"
-SESSIONS_CSV = INPUT_DIR / "raw_sessions.csv"
-OUTPUT_CSV = OUTPUT_DIR / "raw_game_events.csv"
+# .csv or .arrow (OUTPUT_FORMAT)
+PLAYERS_FILE = table_path(INPUT_DIR, "raw_players")
+SESSIONS_FILE = table_path(INPUT_DIR, "raw_sessions")
+OUTPUT_FILE = table_path(OUTPUT_DIR, "raw_game_events")
 
 # Read from environment variable or use default
 GAME_VERSION = os.getenv("GAME_VERSION", "1.0.3")
@@ -23,6 +30,14 @@ EVENT_DATE_START = os.getenv("EVENT_DATE_START")  # YYYY-MM-DD, optional
 EVENT_DATE_END = os.getenv("EVENT_DATE_END")  # YYYY-MM-DD, optional
 # Incremental: EVENT_ID_OFFSET = max existing + 1 (e.g. 50001 if max is event_50000)
 EVENT_ID_OFFSET = os.getenv("EVENT_ID_OFFSET")
+# "python" = original per-event random loop, "numpy" = batched columnar generator
+GEN_ENGINE = os.getenv("GEN_ENGINE", "python")
+# numpy engine: each stage draws from its own streams of GAME_DATA_SEED (parallel.stage_rng)
+RNG_STREAM = 2
+# Sessions per streamed chunk: peak memory is bounded by one chunk's events
+EVENT_CHUNK_SESSIONS = int(os.getenv("EVENT_CHUNK_SESSIONS", "5000"))
+# "json" = one properties JSON string per event, "columns" = typed prop_<key> columns
+PROPERTIES_FORMAT = os.getenv("PROPERTIES_FORMAT", "json")
 
 EVENT_TYPES = [
     "game_started",
@@ -73,6 +88,54 @@ CRAFTING_MATERIALS = {
     "shiv": ["scissors", "tape", "blade"]
 }
 
+# Properties of each event type, in the order they appear in the JSON.
+# Kinds: int, float, bool, str, json (a list, kept as JSON array text)
+PROPERTY_SCHEMAS = {
+    "game_started": {
+        "load_time_ms": "int", "resolution": "str", "fps_target": "int", "audio_quality": "str",
+    },
+    "chapter_started": {
+        "chapter_id": "int", "chapter_name": "str", "location": "str", "weather": "str",
+        "time_of_day": "str",
+    },
+    "checkpoint_reached": {
+        "chapter_id": "int", "checkpoint_id": "int", "time_since_chapter_start_seconds": "int",
+        "health_percentage": "int", "ammo_count": "int", "inventory_items": "int",
+    },
+    "enemy_killed": {
+        "chapter_id": "int", "enemy_type": "str", "enemy_name": "str", "weapon_type": "str",
+        "weapon_name": "str", "damage_dealt": "int", "headshot": "bool", "distance_meters": "int",
+        "xp_gained": "int", "stealth_kill": "bool",
+    },
+    "player_died": {
+        "chapter_id": "int", "death_reason": "str", "health_at_death": "int",
+        "time_survived_seconds": "int", "last_enemy_type": "str", "location": "str",
+        "death_count_in_chapter": "int",
+    },
+    "item_crafted": {
+        "chapter_id": "int", "item_type": "str", "materials_used": "json",
+        "crafting_time_seconds": "int", "success": "bool", "workbench_used": "bool",
+    },
+    "chapter_completed": {
+        "chapter_id": "int", "completion_time_seconds": "int", "score": "int",
+        "collectibles_found": "int", "deaths_count": "int", "enemies_killed": "int",
+        "accuracy_percentage": "float",
+    },
+    "game_closed": {
+        "session_duration_seconds": "int", "reason": "str", "total_deaths": "int",
+        "total_enemies_killed": "int", "chapters_completed": "int", "achievements_unlocked": "int",
+        "final_score": "int",
+    },
+}
+
+# PROPERTIES_FORMAT=columns: one sparse column per property key (shared keys share a column)
+PROPERTY_COLUMN_PREFIX = "prop_"
+PROPERTY_KINDS = {key: kind for schema in PROPERTY_SCHEMAS.values() for key, kind in schema.items()}
+PROPERTY_COLUMNS = [PROPERTY_COLUMN_PREFIX + key for key in PROPERTY_KINDS]
+_NULLABLE_DTYPES = {"int": "Int64", "float": "Float64", "bool": "boolean", "str": object, "json": object}
+_NUMPY_DTYPES = {"int": np.int64, "float": np.float64, "bool": bool, "str": object, "json": object}
+_MASKED_ARRAYS = {"int": pd.arrays.IntegerArray, "float": pd.arrays.FloatingArray, "bool": pd.arrays.BooleanArray}
+
 
 # =====================
 # HELPERS
@@ -96,11 +159,11 @@ def make_event(
     properties: Dict,
 ) -> Dict:
     """Make an event json object (event_id is deterministic for reproducible runs)."""
-    n = _event_id_counter[0]
-    eid = f"event_{_event_id_offset + n}" if _event_id_offset else f"event_{n}"
+    event_key = _event_id_offset + _event_id_counter[0]
     _event_id_counter[0] += 1
     return {
-        "event_id": eid,
+        "event_id": f"event_{event_key}",
+        "event_key": event_key,
         "event_time": event_time,
         "player_id": player_id,
         "event_name": event_name,
@@ -333,6 +396,437 @@ def generate_events_for_session(session, difficulty) -> List[Dict]:
     return events
 
 
+# =====================
+# BATCHED EVENT GENERATION (GEN_ENGINE=numpy)
+# =====================
+# Sort rank of each event inside its chapter; reproduces the order in which
+# generate_events_for_session() appends events.
+_RANK_CHAPTER_STARTED = 0
+_RANK_CHECKPOINT = 1
+_RANK_ENEMY_KILLED = 2
+_RANK_PLAYER_DIED = 3
+_RANK_ITEM_CRAFTED = 4
+_RANK_CHAPTER_COMPLETED = 5
+
+
+def _pick(rng: np.random.Generator, options, size: int) -> np.ndarray:
+    """Vectorized random.choice(options): an array of size draws."""
+    return np.asarray(options)[rng.integers(0, len(options), size=size)]
+
+
+def _random_times(rng: np.random.Generator, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Vectorized random_time(): one whole-second offset in [start, end] per row."""
+    span = (end - start) // np.timedelta64(1, "s")
+    return start + rng.integers(0, span + 1).astype("timedelta64[s]")
+
+
+def _seconds(delta: np.ndarray) -> np.ndarray:
+    return (delta // np.timedelta64(1, "s")).astype(np.int64)
+
+
+def _group_index(counts: np.ndarray) -> np.ndarray:
+    """1-based position of each row inside its np.repeat group (1, 2, .., count)."""
+    return np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+
+
+def _properties_json(fields, raw=()) -> np.ndarray:
+    """
+    fields: List of (key, values array)
+    Return one JSON object string per row, formatted exactly like json.dumps().
+    String arrays are quoted as JSON strings unless their key is listed in raw
+    (values that are JSON text already).
+    """
+    parts, columns = [], []
+    for key, values in fields:
+        if values.dtype == bool:
+            parts.append(f'"{key}": %s')
+            columns.append(np.where(values, "true", "false").tolist())
+        elif values.dtype.kind in "OU" and key not in raw:
+            parts.append(f'"{key}": "%s"')
+            columns.append(values.tolist())
+        else:
+            parts.append(f'"{key}": %s')
+            columns.append(values.tolist())
+    template = "{" + ", ".join(parts) + "}"
+    return np.array([template % row for row in zip(*columns)], dtype=object)
+
+
+def _property_columns(parts, order: np.ndarray) -> Dict[str, pd.api.extensions.ExtensionArray]:
+    """
+    parts: List of (event name, fields) per event type, in concatenation order
+    Return the typed prop_<key> columns, null where an event type has no such key.
+    """
+    offsets = np.cumsum([0] + [len(fields[0][1]) for _, fields in parts])
+    total = int(offsets[-1])
+    columns = {}
+    for key, kind in PROPERTY_KINDS.items():
+        values = np.zeros(total, dtype=_NUMPY_DTYPES[kind])
+        if kind in ("str", "json"):
+            values[:] = None
+        missing = np.ones(total, dtype=bool)
+        for i, (name, fields) in enumerate(parts):
+            for field, field_values in fields:
+                if field == key:
+                    values[offsets[i]:offsets[i + 1]] = field_values
+                    missing[offsets[i]:offsets[i + 1]] = False
+        values, missing = values[order], missing[order]
+        if kind in _MASKED_ARRAYS:
+            values = _MASKED_ARRAYS[kind](values, missing)
+        columns[PROPERTY_COLUMN_PREFIX + key] = values
+    return columns
+
+
+def properties_to_columns(properties) -> Dict[str, pd.api.extensions.ExtensionArray]:
+    """Typed prop_<key> columns from per-event properties dicts (python engine)."""
+    columns = {}
+    for key, kind in PROPERTY_KINDS.items():
+        values = [p.get(key) for p in properties]
+        if kind == "json":
+            values = [None if v is None else json.dumps(v) for v in values]
+        columns[PROPERTY_COLUMN_PREFIX + key] = pd.array(values, dtype=_NULLABLE_DTYPES[kind])
+    return columns
+
+
+def properties_from_columns(df: pd.DataFrame) -> pd.Series:
+    """
+    Rebuild the per-event properties dicts from prop_<key> columns.
+
+    Works per event type on whole columns (each type's keys are never null), so no
+    JSON is parsed; materials_used-style list properties are decoded once per value.
+    """
+    properties = np.empty(len(df), dtype=object)
+    event_names = df["event_name"].to_numpy()
+    for name, schema in PROPERTY_SCHEMAS.items():
+        rows = np.flatnonzero(event_names == name)
+        if not len(rows):
+            continue
+        columns = []
+        for key, kind in schema.items():
+            values = df[PROPERTY_COLUMN_PREFIX + key].array[rows].to_numpy(dtype=_NUMPY_DTYPES[kind])
+            if kind == "json":
+                decoded = {v: json.loads(v) for v in set(values)}
+                columns.append([decoded[v] for v in values])
+            else:
+                columns.append(values.tolist())
+        keys = list(schema)
+        properties[rows] = [dict(zip(keys, row)) for row in zip(*columns)]
+    return pd.Series(properties, index=df.index)
+
+
+def generate_events_vectorized(
+    sessions_df: pd.DataFrame,
+    difficulties: np.ndarray,
+    rng: np.random.Generator,
+    first_event_id: int = 0,
+    game_version: str = GAME_VERSION,
+    properties_format: str = PROPERTIES_FORMAT,
+) -> pd.DataFrame:
+    """
+    Batched equivalent of generate_events_for_session() over all sessions at once.
+
+    Chapters are expanded per session, the death / crafting / completion draws are
+    Bernoulli arrays, and the rage-quit and "chapter not completed" breaks become a
+    mask on a grouped cumulative sum. Each event type is built as whole arrays and
+    the game_closed totals come from bincount over the session index.
+
+    event_id is returned as the integer part; callers format it to "event_<n>".
+    With properties_format="json" properties is already JSON text; with "columns" the
+    frame has typed prop_<key> columns (see PROPERTY_SCHEMAS) instead.
+    """
+    n = len(sessions_df)
+    start = sessions_df["session_start"].to_numpy(dtype="datetime64[us]")
+    end = sessions_df["session_end"].to_numpy(dtype="datetime64[us]")
+    death_p = pd.Series(difficulties).map(DIFFICULTY_DEATH_MULTIPLIER).to_numpy(dtype=float)
+
+    # Events per type: (session idx, chapter, rank, sub-index, time, name, property fields)
+    parts = []
+
+    def add(sess, chapter, rank, sub, times, name, fields):
+        parts.append((sess, chapter, rank, sub, times, name, fields))
+
+    sessions = np.arange(n)
+    max_chapter = rng.integers(1, 11, size=n)
+    # max_chapter + 1 plays the role of None in random.choice(chapters + [None])
+    rage_quit_chapter = rng.integers(1, max_chapter + 2)
+
+    # game started
+    add(
+        sessions, np.zeros(n, dtype=np.int64), 0, 0, start, "game_started",
+        [
+            ("load_time_ms", rng.integers(2000, 8001, size=n)),
+            ("resolution", _pick(rng, ["1080p", "1440p", "4K"], n)),
+            ("fps_target", _pick(rng, [30, 60, 120], n)),
+            ("audio_quality", _pick(rng, ["low", "medium", "high"], n)),
+        ],
+    )
+
+    # Chapters: one row per (session, chapter) up to max_chapter, then keep only
+    # the chapters reached before the first rage quit / non-completed chapter.
+    ch_sess = np.repeat(sessions, max_chapter)
+    chapter = _group_index(max_chapter)
+    died = rng.random(len(ch_sess)) < death_p[ch_sess]
+    crafted = rng.random(len(ch_sess)) < 0.4
+    completed = rng.random(len(ch_sess)) < 0.85
+    played, rage_quit = played_chapters(max_chapter, chapter, rage_quit_chapter[ch_sess], died, completed)
+
+    ch_sess, chapter = ch_sess[played], chapter[played]
+    died, rage_quit = died[played], rage_quit[played]
+    crafted = crafted[played] & ~rage_quit
+    completed = completed[played] & ~rage_quit
+    n_ch = len(ch_sess)
+    ch_end = end[ch_sess]
+    ch_start = _random_times(rng, start[ch_sess], ch_end)
+
+    chapter_name = np.array(CHAPTER_NAMES, dtype=object)[np.minimum(chapter - 1, len(CHAPTER_NAMES) - 1)]
+    add(
+        ch_sess, chapter, _RANK_CHAPTER_STARTED, 0, ch_start, "chapter_started",
+        [
+            ("chapter_id", chapter),
+            ("chapter_name", chapter_name),
+            ("location", _pick(rng, LOCATIONS, n_ch)),
+            ("weather", _pick(rng, WEATHER, n_ch)),
+            ("time_of_day", _pick(rng, ["dawn", "day", "dusk", "night"], n_ch)),
+        ],
+    )
+
+    # Checkpoints: range(1, randint(2, 5)) -> 1..4 per chapter
+    n_checkpoints = rng.integers(1, 5, size=n_ch)
+    cp = np.repeat(np.arange(n_ch), n_checkpoints)
+    checkpoint_id = _group_index(n_checkpoints)
+    cp_time = _random_times(rng, ch_start[cp], ch_end[cp])
+    add(
+        ch_sess[cp], chapter[cp], _RANK_CHECKPOINT, checkpoint_id, cp_time, "checkpoint_reached",
+        [
+            ("chapter_id", chapter[cp]),
+            ("checkpoint_id", checkpoint_id),
+            ("time_since_chapter_start_seconds", _seconds(cp_time - ch_start[cp])),
+            ("health_percentage", rng.integers(20, 101, size=len(cp))),
+            ("ammo_count", rng.integers(0, 201, size=len(cp))),
+            ("inventory_items", rng.integers(5, 26, size=len(cp))),
+        ],
+    )
+
+    # Enemy kills: 2..10 per chapter
+    n_kills = rng.integers(2, 11, size=n_ch)
+    k = np.repeat(np.arange(n_ch), n_kills)
+    n_k = len(k)
+    enemy_types = ["infected", "human"]
+    enemy_type = rng.integers(0, len(enemy_types), size=n_k)
+    enemy_names = np.array([ENEMY_NAMES[t] for t in enemy_types], dtype=object)
+    weapon_types = ["pistol", "rifle", "bow"]
+    weapon_type = rng.integers(0, len(weapon_types), size=n_k)
+    weapon_counts = np.array([len(WEAPON_NAMES[t]) for t in weapon_types])
+    weapon_names = np.array(
+        [WEAPON_NAMES[t] + [None] * (weapon_counts.max() - len(WEAPON_NAMES[t])) for t in weapon_types],
+        dtype=object,
+    )
+    headshot = rng.random(n_k) < 0.3
+    damage = np.where(headshot, rng.integers(150, 301, size=n_k), rng.integers(50, 201, size=n_k))
+    add(
+        ch_sess[k], chapter[k], _RANK_ENEMY_KILLED, _group_index(n_kills),
+        _random_times(rng, ch_start[k], ch_end[k]), "enemy_killed",
+        [
+            ("chapter_id", chapter[k]),
+            ("enemy_type", np.array(enemy_types, dtype=object)[enemy_type]),
+            ("enemy_name", enemy_names[enemy_type, rng.integers(0, enemy_names.shape[1], size=n_k)]),
+            ("weapon_type", np.array(weapon_types, dtype=object)[weapon_type]),
+            ("weapon_name", weapon_names[weapon_type, rng.integers(0, weapon_counts[weapon_type])]),
+            ("damage_dealt", damage),
+            ("headshot", headshot),
+            ("distance_meters", rng.integers(5, 51, size=n_k)),
+            ("xp_gained", rng.integers(10, 51, size=n_k)),
+            ("stealth_kill", rng.random(n_k) < 0.2),
+        ],
+    )
+
+    # Deaths (difficulty-driven): at most one per chapter
+    d = np.flatnonzero(died)
+    death_time = _random_times(rng, ch_start[d], ch_end[d])
+    add(
+        ch_sess[d], chapter[d], _RANK_PLAYER_DIED, 0, death_time, "player_died",
+        [
+            ("chapter_id", chapter[d]),
+            ("death_reason", _pick(rng, ["combat", "environment", "fall", "explosion"], len(d))),
+            ("health_at_death", rng.integers(0, 31, size=len(d))),
+            ("time_survived_seconds", _seconds(death_time - ch_start[d])),
+            ("last_enemy_type", _pick(rng, ["infected", "human", "none"], len(d))),
+            ("location", _pick(rng, LOCATIONS, len(d))),
+            ("death_count_in_chapter", np.ones(len(d), dtype=np.int64)),
+        ],
+    )
+
+    # Crafting (optional, skipped after a rage quit)
+    c = np.flatnonzero(crafted)
+    item_types = list(CRAFTING_MATERIALS)
+    materials = np.array([json.dumps(CRAFTING_MATERIALS[t]) for t in item_types], dtype=object)
+    item_type = rng.integers(0, len(item_types), size=len(c))
+    add(
+        ch_sess[c], chapter[c], _RANK_ITEM_CRAFTED, 0,
+        _random_times(rng, ch_start[c], ch_end[c]), "item_crafted",
+        [
+            ("chapter_id", chapter[c]),
+            ("item_type", np.array(item_types, dtype=object)[item_type]),
+            ("materials_used", materials[item_type]),
+            ("crafting_time_seconds", rng.integers(2, 9, size=len(c))),
+            ("success", rng.random(len(c)) > 0.1),  # 90% success rate
+            ("workbench_used", rng.random(len(c)) < 0.3),
+        ],
+    )
+
+    # Chapter completion
+    cc = np.flatnonzero(completed)
+    chapter_end_time = _random_times(rng, ch_start[cc], ch_end[cc])
+    add(
+        ch_sess[cc], chapter[cc], _RANK_CHAPTER_COMPLETED, 0, chapter_end_time, "chapter_completed",
+        [
+            ("chapter_id", chapter[cc]),
+            ("completion_time_seconds", _seconds(chapter_end_time - ch_start[cc])),
+            ("score", rng.integers(500, 5001, size=len(cc))),
+            ("collectibles_found", rng.integers(0, 6, size=len(cc))),
+            ("deaths_count", died[cc].astype(np.int64)),
+            ("enemies_killed", n_kills[cc]),
+            ("accuracy_percentage", np.round(rng.uniform(45, 95, size=len(cc)), 1)),
+        ],
+    )
+
+    # game closed: session totals as grouped reductions over the chapter rows
+    add(
+        sessions, np.full(n, len(CHAPTER_NAMES) + 1), 0, 0, end, "game_closed",
+        [
+            ("session_duration_seconds", _seconds(end - start)),
+            ("reason", _pick(rng, ["normal", "quit", "menu", "idle_timeout"], n)),
+            ("total_deaths", np.bincount(ch_sess[died], minlength=n)),
+            ("total_enemies_killed", np.bincount(ch_sess, weights=n_kills, minlength=n).astype(np.int64)),
+            ("chapters_completed", np.bincount(ch_sess[completed], minlength=n)),
+            ("achievements_unlocked", rng.integers(0, 4, size=n)),
+            ("final_score", rng.integers(1000, 50001, size=n)),
+        ],
+    )
+
+    df, _ = events_frame(
+        parts, sessions_df["player_id"].to_numpy(), sessions_df["platform"].to_numpy(),
+        game_version, properties_format,
+    )
+    df.insert(0, "event_id", np.arange(first_event_id, first_event_id + len(df), dtype=np.int64))
+    return df
+
+
+def played_chapters(max_chapter, chapter, rage_quit_chapter, died, completed):
+    """
+    For chapter rows (chapter 1..max_chapter of each session, in order), return
+    (played, rage_quit): the chapters reached before the first rage quit or
+    non-completed chapter, and the chapters that end in a rage quit.
+    """
+    rage_quit = died & (rage_quit_chapter == chapter)
+    stop = (rage_quit | ~completed).astype(np.int64)
+    stops_before = np.cumsum(stop) - stop
+    stops_before -= np.repeat(stops_before[np.cumsum(max_chapter) - max_chapter], max_chapter)
+    return stops_before == 0, rage_quit
+
+
+def events_frame(parts, player_ids, platforms, game_version: str, properties_format: str):
+    """
+    parts: List of (session idx, chapter, rank, sub-index, times, event name, property fields)
+    Return (events DataFrame without event_id, session idx per row), rows in the order
+    generate_events_for_session() appends them (session, chapter, rank, sub-index).
+    """
+    def column(i, dtype=None):
+        return np.concatenate(
+            [np.broadcast_to(np.asarray(p[i], dtype=dtype), (len(p[0]),)) for p in parts]
+        )
+
+    sess = column(0)
+    order = np.lexsort((column(3), column(2), column(1), sess))
+    sess = sess[order]
+    df = pd.DataFrame(
+        {
+            "event_time": column(4)[order],
+            "player_id": player_ids[sess],
+            "event_name": column(5, dtype=object)[order],
+            "platform": platforms[sess],
+            "game_version": game_version,
+        }
+    )
+    if properties_format == "columns":
+        return df.assign(**_property_columns([(p[5], p[6]) for p in parts], order)), sess
+
+    raw = {name: [k for k, kind in PROPERTY_SCHEMAS[name].items() if kind == "json"] for name in PROPERTY_SCHEMAS}
+    df["properties"] = np.concatenate([_properties_json(p[6], raw=raw[p[5]]) for p in parts])[order]
+    return df, sess
+
+
+# =====================
+# STREAMING
+# =====================
+def _iter_shard_sessions(sessions_chunks, player_shards: Dict):
+    """Regroup streamed sessions chunks into one DataFrame per player shard, in stream order."""
+    pending, pending_shard = [], None
+    for sessions in sessions_chunks:
+        shards = sessions["player_id"].map(player_shards).to_numpy()
+        bounds = [0, *(np.flatnonzero(np.diff(shards)) + 1), len(sessions)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if lo == hi:
+                continue
+            if pending and shards[lo] != pending_shard:
+                yield pending_shard, pd.concat(pending, ignore_index=True)
+                pending = []
+            pending_shard = shards[lo]
+            pending.append(sessions.iloc[lo:hi])
+    if pending:
+        yield pending_shard, pd.concat(pending, ignore_index=True)
+
+
+def iter_event_chunks(sessions_chunks, players_map: Dict, shard_rng=None, player_shards: Dict = None):
+    """
+    Yield one events DataFrame per chunk of sessions (numpy engine: per player shard).
+
+    sessions_chunks: iterable of sessions DataFrames (e.g. iter_table_chunks(SESSIONS_FILE, N))
+    shard_rng: callable shard -> numpy Generator for the batched engine; None uses
+        generate_events_for_session().
+    player_shards: player_id -> shard index, required with shard_rng.
+
+    The python engine consumes the global random stream exactly like a single pass, so
+    its output does not depend on the chunk size. The numpy engine regroups the chunks by
+    player shard and draws each shard from its own generator, so its output does not
+    either; its peak memory is one shard's events.
+    """
+    if shard_rng is not None:
+        sessions_chunks = _iter_shard_sessions(sessions_chunks, player_shards)
+    next_event_id = _event_id_offset
+    for sessions in sessions_chunks:
+        if shard_rng is not None:
+            shard, sessions = sessions
+        # Convert datetime columns
+        sessions["session_start"] = pd.to_datetime(sessions["session_start"])
+        sessions["session_end"] = pd.to_datetime(sessions["session_end"])
+
+        if shard_rng is not None:
+            difficulties = sessions["player_id"].map(players_map).fillna("normal").to_numpy()
+            df = generate_events_vectorized(
+                sessions.assign(player_id=sessions["player_key"]), difficulties, shard_rng(shard),
+                first_event_id=next_event_id,
+            )
+            next_event_id += len(df)
+            df = format_id(format_id(df, "event_id"), "player_id")
+        else:
+            chunk_events = []
+
+            for _, session in sessions.iterrows():
+                difficulty = players_map.get(
+                    session["player_id"], "normal"
+                )
+                chunk_events.extend(
+                    generate_events_for_session(session, difficulty)
+                )
+
+            df = pd.DataFrame(chunk_events)
+            df["event_time"] = pd.to_datetime(df["event_time"])
+            player_keys = dict(zip(sessions["player_id"], sessions["player_key"]))
+            df.insert(df.columns.get_loc("player_id") + 1, "player_key", df["player_id"].map(player_keys))
+
+        yield df
+
+
 # =====================
 # MAIN
 # =====================
@@ -341,51 +835,57 @@ def main():
     random.seed(seed)
     _event_id_counter[0] = 0  # offset is applied in make_event()
 
-    # Read input CSV files
-    players = pd.read_csv(PLAYERS_CSV)
-    sessions = pd.read_csv(SESSIONS_CSV)
-
-    # Convert datetime columns
-    sessions["session_start"] = pd.to_datetime(sessions["session_start"])
-    sessions["session_end"] = pd.to_datetime(sessions["session_end"])
+    # Read input files; sessions are streamed so only one chunk's events are in memory
+    players = read_table(PLAYERS_FILE)
+    sessions_chunks = iter_table_chunks(SESSIONS_FILE, EVENT_CHUNK_SESSIONS)
 
     players_map = dict(
         zip(players.player_id, players.difficulty_selected)
     )
 
-    all_events = []
+    shard_rng = player_shards = None
+    if GEN_ENGINE == "numpy":
+        from gen.parallel import SHARD_SIZE, stage_rng  # gen.parallel imports this module
 
-    for _, session in sessions.iterrows():
-        difficulty = players_map.get(
-            session["player_id"], "normal"
-        )
-        all_events.extend(
-            generate_events_for_session(session, difficulty)
-        )
+        # One generator per shard of SHARD_SIZE players (by row in the players file)
+        player_shards = dict(zip(players.player_id, np.arange(len(players)) // SHARD_SIZE))
 
-    df = pd.DataFrame(all_events)
-    df["event_time"] = pd.to_datetime(df["event_time"])
+        def shard_rng(shard):
+            return stage_rng(seed, shard, RNG_STREAM)
 
     if EVENT_DATE_START and EVENT_DATE_END:
         range_start = datetime.strptime(EVENT_DATE_START, "%Y-%m-%d")
         range_end = datetime.strptime(EVENT_DATE_END, "%Y-%m-%d") + timedelta(days=1)
-        before = len(df)
-        df = df[(df["event_time"] >= range_start) & (df["event_time"] < range_end)]
-        if len(df) < before:
-            print(f"Filtered to event date range: {before - len(df)} events outside [{EVENT_DATE_START}, {EVENT_DATE_END}] dropped")
-
-    # Serialize properties dict to JSON string for CSV
-    df["properties"] = df["properties"].apply(json.dumps)
 
     # Ensure output directory exists
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Export to CSV
-    df.to_csv(OUTPUT_CSV, index=False)
+    dropped = 0
+    writer = TableWriter(OUTPUT_FILE)
+    for df in iter_event_chunks(sessions_chunks, players_map, shard_rng, player_shards):
+        if EVENT_DATE_START and EVENT_DATE_END:
+            before = len(df)
+            df = df[(df["event_time"] >= range_start) & (df["event_time"] < range_end)].copy()
+            dropped += before - len(df)
+
+        # Serialize properties dict to JSON string for CSV (numpy engine already emits JSON text)
+        if GEN_ENGINE != "numpy":
+            if PROPERTIES_FORMAT == "columns":
+                df = df.drop(columns="properties").assign(
+                    **properties_to_columns(df["properties"])
+                )
+            else:
+                df["properties"] = df["properties"].apply(json.dumps)
+
+        # Export, appending chunk by chunk
+        writer.write(df)
+    writer.close()
+
+    if dropped:
+        print(f"Filtered to event date range: {dropped} events outside [{EVENT_DATE_START}, {EVENT_DATE_END}] dropped")
 
-    print(f"Exported {len(df)} events to {OUTPUT_CSV}")
+    print(f"Exported {writer.rows} events to {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,746 @@
+"""
+Keyed generation engine (GEN_ENGINE=keyed): any player subset or date slice on its own.
+
+Every random value is a pure function of (GAME_DATA_SEED, player number, session index,
+row within the session, draw name): one Philox4x32-10 block (the counter-based generator
+of Random123) evaluated over numpy arrays. There is no stream to advance, so player_1234's
+sessions, or one day's events, do not depend on anything generated before them:
+
+- --players 1-100,250 / --sample 1% / --date 2011-01-20 write exactly the rows a full run
+  writes for that slice, IDs included;
+- the output does not depend on WORKERS or SHARD_SIZE.
+
+The game logic is the numpy engine's (same distributions, shared helpers), but the values
+differ, like they differ between the python and numpy engines.
+
+Session and event IDs stay sequential. Each block of SHARD_SIZE players counts its kept
+sessions and its events (before the date filter, like the numpy engine) from the session
+and chapter draws alone, and its IDs continue after the counts of the blocks before it.
+A slice still runs that count over the players before it, but builds event rows and
+properties (most of the work) only for the slice.
+
+The same count makes distributed generation coordination-free: --shard i/N generates
+the i-th of N contiguous player ranges into data/shard-i-of-N/, its IDs starting after
+the counts of the players before it. --merge-shards N concatenates the shard outputs
+into data/, which is then identical to a single-node run (storage.merge_tables()).
+
+Usage (from app/):
+    GEN_ENGINE=keyed python gen/keyed.py
+    python gen/keyed.py --players 1-100 --date 2011-01-20
+    python main.py --sample 1% --no-ingest
+    python gen/keyed.py --shard 2/4            # on node 2 of 4 (N_PLAYERS etc. identical on all)
+    python gen/keyed.py --merge-shards 4       # after copying the shard-*-of-4/ directories into data/
+"""
+
+import argparse
+import json
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen import events, players, sessions
+from gen.parallel import SHARD_SIZE, WORKERS, _bounded_map, format_ids
+from gen.storage import OUTPUT_FORMAT, TableWriter, merge_tables, table_path
+
+
+# =====================
+# CONFIG
+# =====================
+OUTPUT_DIR = Path("data")
+TABLES = ("raw_players", "raw_sessions", "raw_game_events")
+
+PHILOX_ROUNDS = 10
+
+# Philox4x32 multipliers and Weyl key increments (Salmon et al., SC'11)
+_M0 = np.uint64(0xD2511F53)
+_M1 = np.uint64(0xCD9E8D57)
+_W0 = 0x9E3779B9
+_W1 = 0xBB67AE85
+_LOW32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+
+# Rows below a chapter (checkpoints, kills) are keyed chapter * _SUB_ROWS + their index
+_SUB_ROWS = 256
+
+
+# =====================
+# COUNTER-BASED RNG
+# =====================
+def philox4x32(c0, c1, c2, c3, key, rounds: int = PHILOX_ROUNDS):
+    """
+    Philox4x32 of the counter words (uint32 values held in uint64 arrays) under key (k0, k1).
+    Returns the 4 output words; philox4x32(0, 0, 0, 0, (0, 0)) is
+    (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8), the Random123 known answer.
+    """
+    k0, k1 = key
+    for _ in range(rounds):
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> _SHIFT32) ^ c1 ^ np.uint64(k0),
+            p1 & _LOW32,
+            (p0 >> _SHIFT32) ^ c3 ^ np.uint64(k1),
+            p0 & _LOW32,
+        )
+        k0 = (k0 + _W0) & 0xFFFFFFFF
+        k1 = (k1 + _W1) & 0xFFFFFFFF
+    return c0, c1, c2, c3
+
+
+class KeyedRNG:
+    """Random draws keyed by (seed, player, session, row, draw name) instead of a stream position."""
+
+    def __init__(self, seed: int):
+        self.key = (seed & 0xFFFFFFFF, (seed >> 32) & 0xFFFFFFFF)
+
+    def at(self, player, session=0, row=0) -> "KeyedRows":
+        return KeyedRows(self.key, player, session, row)
+
+
+class KeyedRows:
+    """
+    Draws for a set of rows, one value per row. A row's value depends only on its keys
+    and the draw name, never on the other rows or on the draws made before.
+    """
+
+    def __init__(self, key, player, session=0, row=0):
+        self.key = key
+        words = [np.asarray(k, dtype=np.int64).astype(np.uint64) & _LOW32 for k in (player, session, row)]
+        self.counter = np.broadcast_arrays(*words)
+
+    def __len__(self) -> int:
+        return len(self.counter[0])
+
+    def take(self, index) -> "KeyedRows":
+        """The rows at index (a boolean mask or positions), with the same keys."""
+        return KeyedRows(self.key, *(c[index] for c in self.counter))
+
+    def random(self, name: str) -> np.ndarray:
+        """Uniform floats in [0, 1) with 53 random bits."""
+        w0, w1, _, _ = philox4x32(*self.counter, np.uint64(zlib.crc32(name.encode())), self.key)
+        return ((w0 >> np.uint64(5)).astype(np.float64) * 67108864.0 + (w1 >> np.uint64(6))) / 9007199254740992.0
+
+    def integers(self, name: str, low, high) -> np.ndarray:
+        """Integers in [low, high); low / high may be per-row arrays."""
+        low = np.asarray(low, dtype=np.int64)
+        return low + (self.random(name) * (np.asarray(high, dtype=np.int64) - low)).astype(np.int64)
+
+    def uniform(self, name: str, low: float, high: float) -> np.ndarray:
+        return low + self.random(name) * (high - low)
+
+    def exponential(self, name: str, scale: float) -> np.ndarray:
+        return -scale * np.log1p(-self.random(name))
+
+    def choice(self, name: str, options) -> np.ndarray:
+        """Uniform pick from options (like events._pick)."""
+        return np.asarray(options)[self.integers(name, 0, len(options))]
+
+    def weighted(self, name: str, weights) -> np.ndarray:
+        """Index drawn with probability proportional to weights."""
+        cumulative = np.cumsum(weights) / np.sum(weights)
+        return np.minimum(np.searchsorted(cumulative, self.random(name), side="right"), len(weights) - 1)
+
+    def times(self, name: str, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """One whole-second time in [start, end] per row (like events._random_times)."""
+        span = (end - start) // np.timedelta64(1, "s")
+        return start + self.integers(name, 0, span + 1).astype("timedelta64[s]")
+
+
+# =====================
+# SLICES
+# =====================
+def parse_players(spec: str) -> np.ndarray:
+    """'1-100,250,player_7' -> sorted unique player numbers."""
+    numbers = []
+    for part in spec.split(","):
+        part = part.strip().replace("player_", "")
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        numbers.extend(range(int(low), int(high or low) + 1))
+    return np.unique(np.array(numbers, dtype=np.int64))
+
+
+def parse_sample(spec: str) -> float:
+    """'1%' or '0.01' -> 0.01."""
+    spec = spec.strip()
+    fraction = float(spec[:-1]) / 100 if spec.endswith("%") else float(spec)
+    if not 0 < fraction <= 1:
+        raise ValueError(f"Sample must be in (0, 100%], got {spec!r}")
+    return fraction
+
+
+def parse_dates(spec: str):
+    """'2011-01-20' or '2011-01-20..2011-01-22' (inclusive) -> (start, end) datetime64, end exclusive."""
+    first, _, last = spec.partition("..")
+    start = np.datetime64(first.strip(), "us")
+    end = np.datetime64((last or first).strip(), "us") + np.timedelta64(1, "D")
+    return start, end
+
+
+def make_selection(players_spec: str = None, sample_spec: str = None, date_spec: str = None):
+    """Slice options as a selection dict for iter_shards() (None when nothing is sliced)."""
+    if not (players_spec or sample_spec or date_spec):
+        return None
+    return {
+        "players": parse_players(players_spec) if players_spec else None,
+        "sample": parse_sample(sample_spec) if sample_spec else None,
+        "dates": parse_dates(date_spec) if date_spec else None,
+    }
+
+
+def describe_selection(selection) -> str:
+    if not selection:
+        return "all players, all dates"
+    parts = []
+    if selection["players"] is not None:
+        parts.append(f"{len(selection['players'])} listed players")
+    if selection["sample"] is not None:
+        parts.append(f"{selection['sample']:.2%} sample of players")
+    if selection["dates"] is not None:
+        start, end = selection["dates"]
+        parts.append(f"dates {start.astype('datetime64[D]')}..{(end - np.timedelta64(1, 'D')).astype('datetime64[D]')}")
+    return ", ".join(parts)
+
+
+def parse_shard(spec: str):
+    """'2/4' -> (2, 4); shards are numbered from 1."""
+    index, _, count = spec.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard must be i/N with 1 <= i <= N, got {spec!r}")
+    return index, count
+
+
+def shard_range(index: int, count: int, n_players: int, first_player_id: int = 1):
+    """(first player, number of players) of shard index of count: contiguous, sizes differ by at most one."""
+    base, extra = divmod(n_players, count)
+    k = index - 1
+    return first_player_id + k * base + min(k, extra), base + (k < extra)
+
+
+def shard_dir(output_dir: Path, index: int, count: int) -> Path:
+    return output_dir / f"shard-{index}-of-{count}"
+
+
+def _selected(rng: KeyedRNG, numbers: np.ndarray, selection) -> np.ndarray:
+    """Players of numbers in the slice (before the date filter)."""
+    keep = np.ones(len(numbers), dtype=bool)
+    if selection and selection["players"] is not None:
+        keep &= np.isin(numbers, selection["players"])
+    if selection and selection["sample"] is not None:
+        keep &= rng.at(numbers).random("player.sample") < selection["sample"]
+    return keep
+
+
+# =====================
+# GENERATION
+# =====================
+def _players(rng: KeyedRNG, numbers: np.ndarray, params: dict) -> pd.DataFrame:
+    """Player rows (players.generate_players_vectorized() logic), keyed by player number."""
+    rows = rng.at(numbers)
+    start = np.datetime64(params["event_date_start"], "s")
+    end = np.datetime64(params["event_date_end"], "s") + np.timedelta64(1, "D")
+    span = int((end - start) / np.timedelta64(1, "s"))
+    countries = players._case_variant_table([c for c, _ in players.COUNTRIES])
+    languages = players._case_variant_table([lang for _, lang in players.COUNTRIES])
+    difficulties = np.array([d for d, _ in players.DIFFICULTY_DISTRIBUTION], dtype=object)
+
+    country = rows.integers("player.country", 0, len(players.COUNTRIES))
+    return pd.DataFrame(
+        {
+            "player_id": numbers,
+            "first_seen_at": start + rows.integers("player.first_seen_at", 0, max(1, span)).astype("timedelta64[s]"),
+            "country": countries[country, rows.integers("player.country_case", 0, 3)],
+            "language": languages[country, rows.integers("player.language_case", 0, 3)],
+            "difficulty_selected": difficulties[
+                rows.weighted("player.difficulty", [w for _, w in players.DIFFICULTY_DISTRIBUTION])
+            ],
+        }
+    )
+
+
+def _sessions(rng: KeyedRNG, players_df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Kept sessions of the players (sessions.generate_sessions_vectorized() logic), in player
+    order, with the owner row and the session index within the player (the RNG key).
+    """
+    numbers = players_df["player_id"].to_numpy()
+    counts = np.maximum(1, rng.at(numbers).exponential("session.count", 5).astype(np.int64))
+    counts = np.minimum(counts, params["max_sessions_per_player"])
+    owner = np.repeat(np.arange(len(numbers)), counts)
+    index = events._group_index(counts) - 1
+    rows = rng.at(numbers[owner], index)
+
+    gaps = rows.integers("session.gap_days", 0, 6) * 86400 + rows.integers("session.gap_hours", 0, 13) * 3600
+    categories = [c for c, _ in sessions.SESSION_LENGTH_DISTRIBUTION]
+    category = rows.weighted("session.length", [w for _, w in sessions.SESSION_LENGTH_DISTRIBUTION])
+    low = np.array([sessions.SESSION_LENGTH_MINUTES[c][0] for c in categories])[category]
+    high = np.array([sessions.SESSION_LENGTH_MINUTES[c][1] for c in categories])[category]
+    lengths = rows.integers("session.length_minutes", low, high + 1) * 60
+    platforms = np.array([p for p, _ in sessions.PLATFORMS], dtype=object)
+    platform = platforms[rows.weighted("session.platform", [w for _, w in sessions.PLATFORMS])]
+
+    range_start = np.datetime64(params["event_date_start"], "us")
+    range_end = np.datetime64(params["event_date_end"], "us") + np.timedelta64(1, "D")
+    origin = np.maximum(players_df["first_seen_at"].to_numpy(dtype="datetime64[us]"), range_start)[owner]
+    limits = (range_end - origin) / np.timedelta64(1, "s")
+    starts_rel, ends_rel, keep = sessions.session_timeline(counts, gaps, lengths, limits)
+    session_start = origin + starts_rel.astype("timedelta64[s]")
+    session_end = np.minimum(origin + ends_rel.astype("timedelta64[s]"), range_end)
+
+    return pd.DataFrame(
+        {
+            "owner": owner[keep],
+            "index": index[keep],
+            "player_id": numbers[owner[keep]],
+            "session_start": session_start[keep],
+            "session_end": session_end[keep],
+            "platform": platform[keep],
+        }
+    )
+
+
+def _chapters(rng: KeyedRNG, sessions_df: pd.DataFrame, difficulties: np.ndarray) -> dict:
+    """
+    Chapters played in each session and the session's event count, from the session and
+    chapter draws only (events.generate_events_vectorized() logic). This is all the ID
+    count needs, so it is also the whole cost of the players before a slice.
+    """
+    player = sessions_df["player_id"].to_numpy()
+    index = sessions_df["index"].to_numpy()
+    n = len(sessions_df)
+    session_rows = rng.at(player, index)
+    max_chapter = session_rows.integers("events.max_chapter", 1, 11)
+    # max_chapter + 1 plays the role of None in random.choice(chapters + [None])
+    rage_quit_chapter = session_rows.integers("events.rage_quit_chapter", 1, max_chapter + 2)
+
+    ch_sess = np.repeat(np.arange(n), max_chapter)
+    chapter = events._group_index(max_chapter)
+    rows = rng.at(player[ch_sess], index[ch_sess], chapter)
+    death_p = pd.Series(difficulties).map(events.DIFFICULTY_DEATH_MULTIPLIER).to_numpy(dtype=float)
+    died = rows.random("chapter.died") < death_p[ch_sess]
+    crafted = rows.random("chapter.crafted") < 0.4
+    completed = rows.random("chapter.completed") < 0.85
+    played, rage_quit = events.played_chapters(max_chapter, chapter, rage_quit_chapter[ch_sess], died, completed)
+
+    rows = rows.take(played)
+    plan = {
+        "sess": ch_sess[played],
+        "chapter": chapter[played],
+        "died": died[played],
+        "crafted": crafted[played] & ~rage_quit[played],
+        "completed": completed[played] & ~rage_quit[played],
+        "checkpoints": rows.integers("chapter.checkpoints", 1, 5),
+        "kills": rows.integers("chapter.kills", 2, 11),
+    }
+    per_chapter = 1 + plan["checkpoints"] + plan["kills"] + plan["died"] + plan["crafted"] + plan["completed"]
+    # game_started + chapters + game_closed
+    plan["events"] = 2 + np.bincount(plan["sess"], weights=per_chapter, minlength=n).astype(np.int64)
+    return plan
+
+
+def _events(rng: KeyedRNG, sessions_df: pd.DataFrame, plan: dict, want: np.ndarray, params: dict):
+    """
+    Event rows of the sessions in want (a mask over sessions_df), with event IDs local to
+    sessions_df: each session's events follow the events of all sessions before it.
+    """
+    player = sessions_df["player_id"].to_numpy()
+    index = sessions_df["index"].to_numpy()
+    start = sessions_df["session_start"].to_numpy(dtype="datetime64[us]")
+    end = sessions_df["session_end"].to_numpy(dtype="datetime64[us]")
+    parts = []
+
+    def add(sess, chapter, rank, sub, times, name, fields):
+        parts.append((sess, chapter, rank, sub, times, name, fields))
+
+    def sub_rows(sess, chapter, sub):
+        return rng.at(player[sess], index[sess], chapter * _SUB_ROWS + sub)
+
+    # game started
+    ss = np.flatnonzero(want)
+    rows = rng.at(player[ss], index[ss])
+    add(
+        ss, np.zeros(len(ss), dtype=np.int64), 0, 0, start[ss], "game_started",
+        [
+            ("load_time_ms", rows.integers("game_started.load_time_ms", 2000, 8001)),
+            ("resolution", rows.choice("game_started.resolution", ["1080p", "1440p", "4K"])),
+            ("fps_target", rows.choice("game_started.fps_target", [30, 60, 120])),
+            ("audio_quality", rows.choice("game_started.audio_quality", ["low", "medium", "high"])),
+        ],
+    )
+
+    # Chapters of the wanted sessions
+    c = np.flatnonzero(want[plan["sess"]])
+    ch_sess, chapter = plan["sess"][c], plan["chapter"][c]
+    died, crafted, completed = plan["died"][c], plan["crafted"][c], plan["completed"][c]
+    n_checkpoints, n_kills = plan["checkpoints"][c], plan["kills"][c]
+    n_ch = len(c)
+    ch_rows = rng.at(player[ch_sess], index[ch_sess], chapter)
+    ch_end = end[ch_sess]
+    ch_start = ch_rows.times("chapter_started.time", start[ch_sess], ch_end)
+
+    chapter_name = np.array(events.CHAPTER_NAMES, dtype=object)[np.minimum(chapter - 1, len(events.CHAPTER_NAMES) - 1)]
+    add(
+        ch_sess, chapter, events._RANK_CHAPTER_STARTED, 0, ch_start, "chapter_started",
+        [
+            ("chapter_id", chapter),
+            ("chapter_name", chapter_name),
+            ("location", ch_rows.choice("chapter_started.location", events.LOCATIONS)),
+            ("weather", ch_rows.choice("chapter_started.weather", events.WEATHER)),
+            ("time_of_day", ch_rows.choice("chapter_started.time_of_day", ["dawn", "day", "dusk", "night"])),
+        ],
+    )
+
+    # Checkpoints
+    cp = np.repeat(np.arange(n_ch), n_checkpoints)
+    checkpoint_id = events._group_index(n_checkpoints)
+    rows = sub_rows(ch_sess[cp], chapter[cp], checkpoint_id)
+    cp_time = rows.times("checkpoint_reached.time", ch_start[cp], ch_end[cp])
+    add(
+        ch_sess[cp], chapter[cp], events._RANK_CHECKPOINT, checkpoint_id, cp_time, "checkpoint_reached",
+        [
+            ("chapter_id", chapter[cp]),
+            ("checkpoint_id", checkpoint_id),
+            ("time_since_chapter_start_seconds", events._seconds(cp_time - ch_start[cp])),
+            ("health_percentage", rows.integers("checkpoint_reached.health_percentage", 20, 101)),
+            ("ammo_count", rows.integers("checkpoint_reached.ammo_count", 0, 201)),
+            ("inventory_items", rows.integers("checkpoint_reached.inventory_items", 5, 26)),
+        ],
+    )
+
+    # Enemy kills
+    k = np.repeat(np.arange(n_ch), n_kills)
+    kill = events._group_index(n_kills)
+    rows = sub_rows(ch_sess[k], chapter[k], kill)
+    enemy_types = ["infected", "human"]
+    enemy_type = rows.integers("enemy_killed.enemy_type", 0, len(enemy_types))
+    enemy_names = np.array([events.ENEMY_NAMES[t] for t in enemy_types], dtype=object)
+    weapon_types = ["pistol", "rifle", "bow"]
+    weapon_type = rows.integers("enemy_killed.weapon_type", 0, len(weapon_types))
+    weapon_counts = np.array([len(events.WEAPON_NAMES[t]) for t in weapon_types])
+    weapon_names = np.array(
+        [events.WEAPON_NAMES[t] + [None] * (weapon_counts.max() - len(events.WEAPON_NAMES[t])) for t in weapon_types],
+        dtype=object,
+    )
+    headshot = rows.random("enemy_killed.headshot") < 0.3
+    damage = np.where(
+        headshot,
+        rows.integers("enemy_killed.headshot_damage", 150, 301),
+        rows.integers("enemy_killed.damage", 50, 201),
+    )
+    add(
+        ch_sess[k], chapter[k], events._RANK_ENEMY_KILLED, kill,
+        rows.times("enemy_killed.time", ch_start[k], ch_end[k]), "enemy_killed",
+        [
+            ("chapter_id", chapter[k]),
+            ("enemy_type", np.array(enemy_types, dtype=object)[enemy_type]),
+            ("enemy_name", enemy_names[enemy_type, rows.integers("enemy_killed.enemy_name", 0, enemy_names.shape[1])]),
+            ("weapon_type", np.array(weapon_types, dtype=object)[weapon_type]),
+            ("weapon_name", weapon_names[weapon_type, rows.integers("enemy_killed.weapon_name", 0, weapon_counts[weapon_type])]),
+            ("damage_dealt", damage),
+            ("headshot", headshot),
+            ("distance_meters", rows.integers("enemy_killed.distance_meters", 5, 51)),
+            ("xp_gained", rows.integers("enemy_killed.xp_gained", 10, 51)),
+            ("stealth_kill", rows.random("enemy_killed.stealth_kill") < 0.2),
+        ],
+    )
+
+    # Deaths
+    d = np.flatnonzero(died)
+    rows = ch_rows.take(d)
+    death_time = rows.times("player_died.time", ch_start[d], ch_end[d])
+    add(
+        ch_sess[d], chapter[d], events._RANK_PLAYER_DIED, 0, death_time, "player_died",
+        [
+            ("chapter_id", chapter[d]),
+            ("death_reason", rows.choice("player_died.death_reason", ["combat", "environment", "fall", "explosion"])),
+            ("health_at_death", rows.integers("player_died.health_at_death", 0, 31)),
+            ("time_survived_seconds", events._seconds(death_time - ch_start[d])),
+            ("last_enemy_type", rows.choice("player_died.last_enemy_type", ["infected", "human", "none"])),
+            ("location", rows.choice("player_died.location", events.LOCATIONS)),
+            ("death_count_in_chapter", np.ones(len(d), dtype=np.int64)),
+        ],
+    )
+
+    # Crafting
+    cr = np.flatnonzero(crafted)
+    rows = ch_rows.take(cr)
+    item_types = list(events.CRAFTING_MATERIALS)
+    materials = np.array([json.dumps(events.CRAFTING_MATERIALS[t]) for t in item_types], dtype=object)
+    item_type = rows.integers("item_crafted.item_type", 0, len(item_types))
+    add(
+        ch_sess[cr], chapter[cr], events._RANK_ITEM_CRAFTED, 0,
+        rows.times("item_crafted.time", ch_start[cr], ch_end[cr]), "item_crafted",
+        [
+            ("chapter_id", chapter[cr]),
+            ("item_type", np.array(item_types, dtype=object)[item_type]),
+            ("materials_used", materials[item_type]),
+            ("crafting_time_seconds", rows.integers("item_crafted.crafting_time_seconds", 2, 9)),
+            ("success", rows.random("item_crafted.success") > 0.1),  # 90% success rate
+            ("workbench_used", rows.random("item_crafted.workbench_used") < 0.3),
+        ],
+    )
+
+    # Chapter completion
+    cc = np.flatnonzero(completed)
+    rows = ch_rows.take(cc)
+    chapter_end_time = rows.times("chapter_completed.time", ch_start[cc], ch_end[cc])
+    add(
+        ch_sess[cc], chapter[cc], events._RANK_CHAPTER_COMPLETED, 0, chapter_end_time, "chapter_completed",
+        [
+            ("chapter_id", chapter[cc]),
+            ("completion_time_seconds", events._seconds(chapter_end_time - ch_start[cc])),
+            ("score", rows.integers("chapter_completed.score", 500, 5001)),
+            ("collectibles_found", rows.integers("chapter_completed.collectibles_found", 0, 6)),
+            ("deaths_count", died[cc].astype(np.int64)),
+            ("enemies_killed", n_kills[cc]),
+            ("accuracy_percentage", np.round(rows.uniform("chapter_completed.accuracy_percentage", 45, 95), 1)),
+        ],
+    )
+
+    # game closed
+    n = len(sessions_df)
+    rows = rng.at(player[ss], index[ss])
+    add(
+        ss, np.full(len(ss), len(events.CHAPTER_NAMES) + 1), 0, 0, end[ss], "game_closed",
+        [
+            ("session_duration_seconds", events._seconds(end[ss] - start[ss])),
+            ("reason", rows.choice("game_closed.reason", ["normal", "quit", "menu", "idle_timeout"])),
+            ("total_deaths", np.bincount(ch_sess[died], minlength=n)[ss]),
+            ("total_enemies_killed", np.bincount(ch_sess, weights=n_kills, minlength=n).astype(np.int64)[ss]),
+            ("chapters_completed", np.bincount(ch_sess[completed], minlength=n)[ss]),
+            ("achievements_unlocked", rows.integers("game_closed.achievements_unlocked", 0, 4)),
+            ("final_score", rows.integers("game_closed.final_score", 1000, 50001)),
+        ],
+    )
+
+    df, sess = events.events_frame(
+        parts, player, sessions_df["platform"].to_numpy(), params["game_version"],
+        params.get("properties_format", events.PROPERTIES_FORMAT),
+    )
+    first_event = np.cumsum(plan["events"]) - plan["events"]
+    position = np.arange(len(sess)) - np.searchsorted(sess, sess)
+    df.insert(0, "event_id", first_event[sess] + position)
+    return df
+
+
+def _plan_block(rng: KeyedRNG, numbers: np.ndarray, params: dict):
+    """Players, kept sessions and chapter plan of a block: everything but the event rows."""
+    players_df = _players(rng, numbers, params)
+    sessions_df = _sessions(rng, players_df, params)
+    difficulties = players_df["difficulty_selected"].to_numpy()[sessions_df["owner"].to_numpy()]
+    return players_df, sessions_df, _chapters(rng, sessions_df, difficulties)
+
+
+def count_block(seed: int, first_player_id: int, n_players: int, params: dict):
+    """(kept sessions, events before the date filter) of a block of players: the IDs it uses."""
+    numbers = np.arange(first_player_id, first_player_id + n_players, dtype=np.int64)
+    _, sessions_df, plan = _plan_block(KeyedRNG(seed), numbers, params)
+    return len(sessions_df), int(plan["events"].sum())
+
+
+def _count_block(args):
+    return count_block(*args)
+
+
+def generate_block(seed: int, first_player_id: int, n_players: int, params: dict, selection: dict = None):
+    """
+    Generate the rows of one block of players that fall in selection (everything if None).
+
+    Returns (players_df, sessions_df, events_df, n_sessions, n_events). Session and event
+    IDs are block-local (from 0); n_sessions / n_events count the whole block (events
+    before the date filter), so the IDs of the next block continue after them.
+    """
+    rng = KeyedRNG(seed)
+    numbers = np.arange(first_player_id, first_player_id + n_players, dtype=np.int64)
+    selected = _selected(rng, numbers, selection)
+    dates = selection["dates"] if selection else None
+
+    players_df, sessions_df, plan = _plan_block(rng, numbers, params)
+    sessions_df.insert(0, "session_id", np.arange(len(sessions_df), dtype=np.int64))
+
+    # Sessions whose events are built: selected players, overlapping the dates
+    want = selected[sessions_df["owner"].to_numpy()]
+    keep_players, keep_sessions = selected, want.copy()
+    if dates is not None:
+        start, end = sessions_df["session_start"].to_numpy(), sessions_df["session_end"].to_numpy()
+        want &= (start < dates[1]) & (end >= dates[0])
+        first_seen = players_df["first_seen_at"].to_numpy(dtype="datetime64[us]")
+        keep_players = selected & (first_seen >= dates[0]) & (first_seen < dates[1])
+        keep_sessions &= (start >= dates[0]) & (start < dates[1])
+
+    events_df = _events(rng, sessions_df, plan, want, params)
+    range_start = np.datetime64(params["event_date_start"], "us")
+    range_end = np.datetime64(params["event_date_end"], "us") + np.timedelta64(1, "D")
+    if dates is not None:
+        range_start, range_end = max(range_start, dates[0]), min(range_end, dates[1])
+    event_time = events_df["event_time"].to_numpy()
+    events_df = events_df[(event_time >= range_start) & (event_time < range_end)].reset_index(drop=True)
+
+    return (
+        players_df[keep_players].reset_index(drop=True),
+        sessions_df.loc[keep_sessions, ["session_id", "player_id", "session_start", "session_end", "platform"]]
+        .reset_index(drop=True),
+        events_df,
+        len(sessions_df),
+        int(plan["events"].sum()),
+    )
+
+
+def _generate_block(args):
+    return generate_block(*args)
+
+
+def iter_shards(
+    n_players: int,
+    seed: int,
+    workers: int = 1,
+    shard_size: int = SHARD_SIZE,
+    first_player_id: int = 1,
+    first_session_id: int = 1,
+    first_event_id: int = 0,
+    params: dict = None,
+    selection: dict = None,
+    shard: tuple = None,
+):
+    """
+    gen/parallel.py iter_shards() for the keyed engine: yield (players_df, sessions_df,
+    events_df) per block of shard_size players, in order, with global integer IDs.
+
+    selection (make_selection()) limits the rows to a slice; blocks after the last listed
+    player are skipped, the ones before it only count their sessions and events.
+    shard (index, count) keeps the index-th of count player ranges (shard_range()); the
+    players before it are only counted, so its IDs are the ones a single run gives them.
+    """
+    if params is None:
+        params = {
+            "event_date_start": players.EVENT_DATE_START,
+            "event_date_end": players.EVENT_DATE_END,
+            "max_sessions_per_player": sessions.MAX_SESSIONS_PER_PLAYER,
+            "game_version": events.GAME_VERSION,
+            "properties_format": events.PROPERTIES_FORMAT,
+        }
+    if not (params["event_date_start"] and params["event_date_end"]):
+        # Without a fixed range timestamps would depend on the current time, and so would slices
+        raise ValueError("GEN_ENGINE=keyed needs EVENT_DATE_START and EVENT_DATE_END")
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+        def run(fn, tasks):
+            return _bounded_map(pool, fn, tasks, max_in_flight=2 * workers)
+    else:
+        pool = None
+        run = map
+
+    try:
+        if shard is not None:
+            shard_first, shard_players = shard_range(*shard, n_players, first_player_id)
+            counted = run(_count_block, [
+                (seed, first, min(shard_size, shard_first - first), params)
+                for first in range(first_player_id, shard_first, shard_size)
+            ])
+            for n_sessions, n_events in counted:
+                first_session_id += n_sessions
+                first_event_id += n_events
+            first_player_id, n_players = shard_first, shard_players
+
+        last_player = first_player_id + n_players - 1
+        if selection and selection["players"] is not None and len(selection["players"]):
+            last_player = min(last_player, int(selection["players"][-1]))
+        n_players = max(0, last_player - first_player_id + 1)
+        results = run(_generate_block, [
+            (seed, first, min(shard_size, first_player_id + n_players - first), params, selection)
+            for first in range(first_player_id, first_player_id + n_players, shard_size)
+        ])
+
+        next_session_id, next_event_id = first_session_id, first_event_id
+        for players_df, sessions_df, events_df, n_sessions, n_events in results:
+            sessions_df["session_id"] += next_session_id
+            events_df["event_id"] += next_event_id
+            next_session_id += n_sessions
+            next_event_id += n_events
+            yield players_df, sessions_df, events_df
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def merge_shards(count: int, output_dir: Path = OUTPUT_DIR, fmt: str = OUTPUT_FORMAT, batch_id: str = None):
+    """Concatenate output_dir/shard-*-of-<count>/ into output_dir; return {table: rows}."""
+    missing = [shard_dir(output_dir, i, count) for i in range(1, count + 1) if not shard_dir(output_dir, i, count).exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing shard outputs: {', '.join(str(m) for m in missing)}")
+    return {
+        table: merge_tables(
+            [table_path(shard_dir(output_dir, i, count), table, fmt) for i in range(1, count + 1)],
+            table_path(output_dir, table, fmt),
+            batch_id,
+        )
+        for table in TABLES
+    }
+
+
+# =====================
+# MAIN
+# =====================
+def main():
+    parser = argparse.ArgumentParser(description="Generate RAW data, or a slice of it, with the keyed engine.")
+    parser.add_argument("--players", metavar="LIST", help="Only these players, e.g. 1-100,250")
+    parser.add_argument("--sample", metavar="PCT", help="Only a deterministic sample of players, e.g. 1%%")
+    parser.add_argument("--date", metavar="DAY[..DAY]", help="Only rows of these days, e.g. 2011-01-20")
+    parser.add_argument("--shard", metavar="I/N", help="Only the I-th of N player ranges, into data/shard-I-of-N/")
+    parser.add_argument("--merge-shards", metavar="N", type=int, help="Merge data/shard-*-of-N/ into data/ and exit")
+    args = parser.parse_args()
+
+    if args.merge_shards:
+        for table, rows in merge_shards(args.merge_shards).items():
+            print(f"🧩 Merged {args.merge_shards} shards: {rows} rows → {table_path(OUTPUT_DIR, table)}")
+        return
+
+    seed = int(os.getenv("GAME_DATA_SEED", "42"))
+    player_offset = os.getenv("PLAYER_ID_OFFSET")
+    session_offset = os.getenv("SESSION_ID_OFFSET")
+    event_offset = os.getenv("EVENT_ID_OFFSET")
+    selection = make_selection(args.players, args.sample, args.date)
+    shard = parse_shard(args.shard) if args.shard else None
+
+    output_dir = shard_dir(OUTPUT_DIR, *shard) if shard else OUTPUT_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = [table_path(output_dir, table) for table in TABLES]
+
+    writers = [TableWriter(path) for path in paths]
+    shards = iter_shards(
+        players.N_PLAYERS,
+        seed,
+        workers=WORKERS,
+        first_player_id=int(player_offset) if player_offset else 1,
+        first_session_id=int(session_offset) if session_offset else 1,
+        first_event_id=int(event_offset) if event_offset else 0,
+        selection=selection,
+        shard=shard,
+    )
+    for block in shards:
+        for writer, df in zip(writers, format_ids(*block)):
+            writer.write(df)
+    for writer in writers:
+        writer.close()
+
+    players_writer, sessions_writer, events_writer = writers
+    shard_note = f", shard {shard[0]}/{shard[1]}" if shard else ""
+    print(f"🔑 Keyed generation: {describe_selection(selection)}{shard_note}")
+    print(f"🎮 Generated {players_writer.rows} players → {paths[0]}")
+    print(f"🕹 Generated {sessions_writer.rows} sessions → {paths[1]}")
+    print(f"Exported {events_writer.rows} events to {paths[2]} ({WORKERS} workers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Sharded multi-core generation for the numpy engine: players → sessions → events.
+
+Players are split into fixed-size shards of SHARD_SIZE players. Each shard runs the
+whole chain (generate_players_vectorized → generate_sessions_vectorized →
+generate_events_vectorized) in a worker process. Every (stage, shard) pair draws
+from its own RNG stream of GAME_DATA_SEED (stage_rng()), so the data depends on
+GAME_DATA_SEED and SHARD_SIZE only, never on WORKERS: any worker count writes
+byte-identical CSVs. players.py, sessions.py and events.py seed their numpy engine
+through stage_rng() too, so running the scripts one by one writes the same data.
+
+Session and event IDs are assigned when the shards are merged (in shard order),
+from prefix sums of the per-shard row counts, so they stay sequential and honour
+SESSION_ID_OFFSET / EVENT_ID_OFFSET like the single-process scripts.
+
+Usage (from app/):
+    GEN_ENGINE=numpy WORKERS=8 python gen/parallel.py
+    python main.py --workers 8
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen import events, players, sessions
+from gen.storage import TableWriter, format_id, table_path
+
+
+# =====================
+# CONFIG
+# =====================
+OUTPUT_DIR = Path("data")
+# .csv or .arrow (OUTPUT_FORMAT)
+PLAYERS_FILE = table_path(OUTPUT_DIR, "raw_players")
+SESSIONS_FILE = table_path(OUTPUT_DIR, "raw_sessions")
+EVENTS_FILE = table_path(OUTPUT_DIR, "raw_game_events")
+
+WORKERS = int(os.getenv("WORKERS", "1"))
+# Changing SHARD_SIZE changes the generated data (one RNG stream per shard and stage).
+# It also bounds memory: a shard of 5000 players is ~500k events (~300 MB to build).
+SHARD_SIZE = int(os.getenv("SHARD_SIZE", "5000"))
+
+
+# =====================
+# SHARD GENERATION
+# =====================
+def stage_rng(seed: int, shard: int, stream: int) -> np.random.Generator:
+    """RNG for one stage (its RNG_STREAM: players 0, sessions 1, events 2) of one shard."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(stream, int(shard))))
+
+
+def generate_shard(
+    seed: int,
+    shard: int,
+    first_player_id: int,
+    n_players: int,
+    params: dict,
+):
+    """
+    Generate one shard of players with its sessions and events.
+
+    Returns (players_df, sessions_df, events_df, n_events_generated). Session and
+    event IDs are shard-local (starting at 0); n_events_generated counts events
+    before the date-range filter so event IDs keep the gaps the filter leaves.
+    """
+    start, end = params["event_date_start"], params["event_date_end"]
+
+    players_df = players.generate_players_vectorized(
+        n_players, stage_rng(seed, shard, players.RNG_STREAM), first_player_id=first_player_id,
+        event_date_start=start, event_date_end=end,
+    )
+    sessions_df = sessions.generate_sessions_vectorized(
+        players_df, stage_rng(seed, shard, sessions.RNG_STREAM), first_session_id=0,
+        max_sessions_per_player=params["max_sessions_per_player"],
+        event_date_start=start, event_date_end=end,
+    )
+    difficulties = players_df["difficulty_selected"].to_numpy()[
+        sessions_df["player_id"].to_numpy() - first_player_id
+    ]
+    events_df = events.generate_events_vectorized(
+        sessions_df, difficulties, stage_rng(seed, shard, events.RNG_STREAM), first_event_id=0,
+        game_version=params["game_version"],
+        properties_format=params.get("properties_format", events.PROPERTIES_FORMAT),
+    )
+    n_events_generated = len(events_df)
+
+    if start and end:
+        range_start = datetime.strptime(start, "%Y-%m-%d")
+        range_end = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1)
+        events_df = events_df[
+            (events_df["event_time"] >= range_start) & (events_df["event_time"] < range_end)
+        ].reset_index(drop=True)
+
+    return players_df, sessions_df, events_df, n_events_generated
+
+
+def _generate_shard(args):
+    return generate_shard(*args)
+
+
+def _bounded_map(pool: ProcessPoolExecutor, fn, tasks, max_in_flight: int):
+    """Like pool.map(), but keeps at most max_in_flight shards submitted (results in task order)."""
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_shards(
+    n_players: int,
+    seed: int,
+    workers: int = 1,
+    shard_size: int = SHARD_SIZE,
+    first_player_id: int = 1,
+    first_session_id: int = 1,
+    first_event_id: int = 0,
+    params: dict = None,
+):
+    """
+    Yield merged-ready (players_df, sessions_df, events_df) per shard, in shard order,
+    with global IDs already applied (still integers; format them when writing).
+
+    At most 2 * workers shards are generated ahead of the consumer, so a streaming
+    consumer (e.g. a CSV sink) keeps memory bounded whatever N_PLAYERS is.
+    """
+    if params is None:
+        params = {
+            "event_date_start": players.EVENT_DATE_START,
+            "event_date_end": players.EVENT_DATE_END,
+            "max_sessions_per_player": sessions.MAX_SESSIONS_PER_PLAYER,
+            "game_version": events.GAME_VERSION,
+            "properties_format": events.PROPERTIES_FORMAT,
+        }
+    n_shards = max(1, -(-n_players // shard_size))
+    tasks = [
+        (
+            seed,
+            i,
+            first_player_id + i * shard_size,
+            min(shard_size, n_players - i * shard_size),
+            params,
+        )
+        for i in range(n_shards)
+    ]
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = _bounded_map(pool, _generate_shard, tasks, max_in_flight=2 * workers)
+    else:
+        pool = None
+        results = map(_generate_shard, tasks)
+
+    try:
+        next_session_id, next_event_id = first_session_id, first_event_id
+        for players_df, sessions_df, events_df, n_events_generated in results:
+            sessions_df["session_id"] += next_session_id
+            events_df["event_id"] += next_event_id
+            next_session_id += len(sessions_df)
+            next_event_id += n_events_generated
+            yield players_df, sessions_df, events_df
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def format_ids(players_df: pd.DataFrame, sessions_df: pd.DataFrame, events_df: pd.DataFrame):
+    """
+    Turn the integer IDs of one shard into the player_<n> / session_<n> / event_<n>
+    strings, with the integers kept as player_key / session_key / event_key.
+    """
+    format_id(players_df, "player_id")
+    format_id(format_id(sessions_df, "session_id"), "player_id")
+    format_id(format_id(events_df, "event_id"), "player_id")
+    return players_df, sessions_df, events_df
+
+
+# =====================
+# MAIN
+# =====================
+def main():
+    seed = int(os.getenv("GAME_DATA_SEED", "42"))
+    player_offset = os.getenv("PLAYER_ID_OFFSET")
+    session_offset = os.getenv("SESSION_ID_OFFSET")
+    event_offset = os.getenv("EVENT_ID_OFFSET")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    writers = [TableWriter(path) for path in (PLAYERS_FILE, SESSIONS_FILE, EVENTS_FILE)]
+    shards = iter_shards(
+        players.N_PLAYERS,
+        seed,
+        workers=WORKERS,
+        first_player_id=int(player_offset) if player_offset else 1,
+        first_session_id=int(session_offset) if session_offset else 1,
+        first_event_id=int(event_offset) if event_offset else 0,
+    )
+    for shard in shards:
+        for writer, df in zip(writers, format_ids(*shard)):
+            writer.write(df)
+    for writer in writers:
+        writer.close()
+
+    players_writer, sessions_writer, events_writer = writers
+    print(f"🎮 Generated {players_writer.rows} players → {PLAYERS_FILE}")
+    print(f"🕹 Generated {sessions_writer.rows} sessions → {SESSIONS_FILE}")
+    print(f"Exported {events_writer.rows} events to {EVENTS_FILE} ({WORKERS} workers, shards of {SHARD_SIZE} players)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+In-process generation pipeline for the numpy engine.
+
+Instead of running players.py, sessions.py and events.py as separate interpreters
+that hand data to each other through data/*.csv (and then having the loader parse
+the same CSVs again), run_pipeline() keeps everything in one process:
+
+- shards from gen/parallel.py (or gen/keyed.py for GEN_ENGINE=keyed) flow straight into sinks (CSV / Arrow files are just one sink);
+- the merged frames are returned so ingest.load_to_snowflake.load_frames() can load
+  them without another serialize/parse cycle.
+
+Usage (from app/):
+    from gen.pipeline import file_sink, run_pipeline
+    frames = run_pipeline(CONFIG, sinks=[file_sink(Path("data"))])
+    frames["raw_game_events"]  # pandas DataFrame, same columns as raw_game_events.csv
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable
+
+import pandas as pd
+
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen import keyed, parallel
+from gen.storage import OUTPUT_FORMAT, TableWriter, table_path
+
+
+# =====================
+# CONFIG
+# =====================
+TABLES = ("raw_players", "raw_sessions", "raw_game_events")
+
+# A sink receives (table name, shard frame, is first shard) for every shard
+Sink = Callable[[str, pd.DataFrame, bool], None]
+
+
+# =====================
+# SINKS
+# =====================
+class FileSink:
+    """Sink that writes output_dir/<table>.csv, .arrow or .parquet, appending shard by shard."""
+
+    def __init__(self, output_dir: Path, fmt: str = OUTPUT_FORMAT, batch_id: str = None):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.writers = {
+            table: TableWriter(table_path(output_dir, table, fmt), batch_id) for table in TABLES
+        }
+
+    def __call__(self, table: str, df: pd.DataFrame, first: bool) -> None:
+        self.writers[table].write(df)
+
+    def close(self) -> None:
+        for writer in self.writers.values():
+            writer.close()
+
+
+def file_sink(output_dir: Path, fmt: str = OUTPUT_FORMAT, batch_id: str = None) -> FileSink:
+    return FileSink(output_dir, fmt, batch_id)
+
+
+def csv_sink(output_dir: Path) -> FileSink:
+    return FileSink(output_dir, "csv")
+
+
+# =====================
+# PIPELINE
+# =====================
+def _offset(config: dict, key: str, default: int) -> int:
+    value = config.get(key) or os.getenv(key)
+    return int(value) if value else default
+
+
+def run_pipeline(
+    config: dict,
+    sinks: Iterable[Sink] = (),
+    collect: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Generate players → sessions → events in this process.
+
+    config: main.CONFIG-style dict (N_PLAYERS, MAX_SESSIONS_PER_PLAYER, GAME_VERSION,
+            EVENT_DATE_START, EVENT_DATE_END, GAME_DATA_SEED, WORKERS, PROPERTIES_FORMAT). ID offsets are
+            read from config or the PLAYER_ID_OFFSET / SESSION_ID_OFFSET /
+            EVENT_ID_OFFSET environment variables. With GEN_ENGINE=keyed, the
+            optional PLAYERS / SAMPLE / DATE keys generate only that slice and SHARD
+            ("i/N") only the i-th of N player ranges (gen/keyed.py).
+    sinks: called for every shard, in shard order; sinks with a close() method are
+           closed at the end.
+    collect: return the merged frames keyed by table name; with collect=False only
+             the sinks see the data and an empty dict is returned.
+    """
+    sinks = list(sinks)
+    params = {
+        "event_date_start": config["EVENT_DATE_START"],
+        "event_date_end": config["EVENT_DATE_END"],
+        "max_sessions_per_player": int(config["MAX_SESSIONS_PER_PLAYER"]),
+        "game_version": config["GAME_VERSION"],
+        "properties_format": config.get("PROPERTIES_FORMAT", "json"),
+    }
+    options = {}
+    engine = parallel
+    if config.get("GEN_ENGINE") == "keyed":
+        engine = keyed
+        options["selection"] = keyed.make_selection(config.get("PLAYERS"), config.get("SAMPLE"), config.get("DATE"))
+        if config.get("SHARD"):
+            options["shard"] = keyed.parse_shard(config["SHARD"])
+    shards = engine.iter_shards(
+        int(config["N_PLAYERS"]),
+        int(config["GAME_DATA_SEED"]),
+        workers=int(config.get("WORKERS", 1)),
+        first_player_id=_offset(config, "PLAYER_ID_OFFSET", 1),
+        first_session_id=_offset(config, "SESSION_ID_OFFSET", 1),
+        first_event_id=_offset(config, "EVENT_ID_OFFSET", 0),
+        params=params,
+        **options,
+    )
+
+    collected = {table: [] for table in TABLES}
+    counts = dict.fromkeys(TABLES, 0)
+    for i, shard in enumerate(shards):
+        for table, df in zip(TABLES, parallel.format_ids(*shard)):
+            for sink in sinks:
+                sink(table, df, i == 0)
+            if collect:
+                collected[table].append(df)
+            counts[table] += len(df)
+    for sink in sinks:
+        if hasattr(sink, "close"):
+            sink.close()
+
+    print(f"🎮 Generated {counts['raw_players']} players")
+    print(f"🕹 Generated {counts['raw_sessions']} sessions")
+    print(f"Generated {counts['raw_game_events']} events")
+
+    if not collect:
+        return {}
+    return {
+        table: pd.concat(frames, ignore_index=True)
+        for table, frames in collected.items()
+    }
@@ -1,16 +1,22 @@
 import os
 import random
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen.storage import format_id, table_path, write_table
+
 
 # =====================
 # CONFIG
 # =====================
 OUTPUT_DIR = Path("data")
-OUTPUT_CSV = OUTPUT_DIR / "raw_players.csv"
+OUTPUT_FILE = table_path(OUTPUT_DIR, "raw_players")  # .csv or .arrow (OUTPUT_FORMAT)
 
 # Read from environment variable or use default
 N_PLAYERS = int(os.getenv("N_PLAYERS", "1500"))
@@ -18,6 +24,10 @@ EVENT_DATE_START = os.getenv("EVENT_DATE_START")  # YYYY-MM-DD, optional
 EVENT_DATE_END = os.getenv("EVENT_DATE_END")  # YYYY-MM-DD, optional
 # Incremental: PLAYER_ID_OFFSET = max existing + 1 (e.g. 890 if max is player_889)
 PLAYER_ID_OFFSET = os.getenv("PLAYER_ID_OFFSET")
+# "python" = original per-row random loop, "numpy" = vectorized columnar generator
+GEN_ENGINE = os.getenv("GEN_ENGINE", "python")
+# numpy engine: each stage draws from its own streams of GAME_DATA_SEED (parallel.stage_rng)
+RNG_STREAM = 0
 
 # Countries and languages
 COUNTRIES = [
@@ -90,12 +100,10 @@ def generate_players(n_players: int) -> pd.DataFrame:
     for i in range(1, n_players + 1):
         country, language = random.choice(COUNTRIES)
         # Full load: player_1, player_2, ... Incremental: player_{offset}, player_{offset+1}, ...
-        if PLAYER_ID_OFFSET:
-            player_id = f"player_{int(PLAYER_ID_OFFSET) + i - 1}"
-        else:
-            player_id = f"player_{i}"
+        player_key = int(PLAYER_ID_OFFSET) + i - 1 if PLAYER_ID_OFFSET else i
         player = {
-            "player_id": player_id,
+            "player_id": f"player_{player_key}",
+            "player_key": player_key,
             "first_seen_at": random_timestamp_in_event_range(),
             "country": random_case_variant(country),
             "language": random_case_variant(language),
@@ -107,6 +115,73 @@ def generate_players(n_players: int) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
+# =====================
+# VECTORIZED PLAYER GENERATION (GEN_ENGINE=numpy)
+# =====================
+def _case_variant_table(values) -> np.ndarray:
+    """Return an (n_values, 3) table of lower/upper/title variants for fancy indexing."""
+    return np.array(
+        [[v.lower(), v.upper(), v.title()] for v in values],
+        dtype=object,
+    )
+
+
+def random_timestamps_in_event_range(
+    rng: np.random.Generator,
+    n: int,
+    event_date_start: str = EVENT_DATE_START,
+    event_date_end: str = EVENT_DATE_END,
+) -> np.ndarray:
+    """Vectorized random_timestamp_in_event_range(): n timestamps as datetime64."""
+    if event_date_start and event_date_end:
+        start = np.datetime64(event_date_start, "s")
+        end = np.datetime64(event_date_end, "s") + np.timedelta64(1, "D")
+        span = int((end - start) / np.timedelta64(1, "s"))
+        return start + rng.integers(0, max(1, span), size=n).astype("timedelta64[s]")
+    now = np.datetime64(datetime.utcnow(), "us")
+    back = (
+        rng.integers(0, 91, size=n) * 86400
+        + rng.integers(0, 24, size=n) * 3600
+        + rng.integers(0, 60, size=n) * 60
+    )
+    return now - back.astype("timedelta64[s]")
+
+
+def generate_players_vectorized(
+    n_players: int,
+    rng: np.random.Generator,
+    first_player_id: int = 1,
+    event_date_start: str = EVENT_DATE_START,
+    event_date_end: str = EVENT_DATE_END,
+) -> pd.DataFrame:
+    """
+    Columnar equivalent of generate_players(): every column is drawn as one array.
+
+    player_id is returned as the integer part (first_player_id, first_player_id + 1, ...);
+    callers format it to "player_<n>" when writing.
+    """
+    countries = _case_variant_table([c for c, _ in COUNTRIES])
+    languages = _case_variant_table([lang for _, lang in COUNTRIES])
+    difficulties = np.array([d for d, _ in DIFFICULTY_DISTRIBUTION], dtype=object)
+    weights = np.array([w for _, w in DIFFICULTY_DISTRIBUTION])
+
+    country_idx = rng.integers(0, len(COUNTRIES), size=n_players)
+
+    return pd.DataFrame(
+        {
+            "player_id": np.arange(first_player_id, first_player_id + n_players, dtype=np.int64),
+            "first_seen_at": random_timestamps_in_event_range(
+                rng, n_players, event_date_start, event_date_end
+            ),
+            "country": countries[country_idx, rng.integers(0, 3, size=n_players)],
+            "language": languages[country_idx, rng.integers(0, 3, size=n_players)],
+            "difficulty_selected": difficulties[
+                rng.choice(len(difficulties), size=n_players, p=weights / weights.sum())
+            ],
+        }
+    )
+
+
 # =====================
 # MAIN
 # =====================
@@ -116,12 +191,31 @@ def main():
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    df = generate_players(N_PLAYERS)
+    if GEN_ENGINE == "numpy":
+        from gen.parallel import SHARD_SIZE, stage_rng  # gen.parallel imports this module
+
+        # Shard by shard, like gen/parallel.py, so both write the same players
+        first_player_id = int(PLAYER_ID_OFFSET) if PLAYER_ID_OFFSET else 1
+        df = pd.concat(
+            [
+                generate_players_vectorized(
+                    min(SHARD_SIZE, N_PLAYERS - start),
+                    stage_rng(seed, shard, RNG_STREAM),
+                    first_player_id=first_player_id + start,
+                )
+                for shard, start in enumerate(range(0, N_PLAYERS, SHARD_SIZE))
+            ],
+            ignore_index=True,
+        )
+        df = format_id(df, "player_id")
+    else:
+        df = generate_players(N_PLAYERS)
 
     # Ensure deterministic column order
     df = df[
         [
             "player_id",
+            "player_key",
             "first_seen_at",
             "country",
             "language",
@@ -129,9 +223,9 @@ def main():
         ]
     ]
 
-    df.to_csv(OUTPUT_CSV, index=False)
+    write_table(df, OUTPUT_FILE)
 
-    print(f"🎮 Generated {len(df)} players → {OUTPUT_CSV}")
+    print(f"🎮 Generated {len(df)} players → {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
@@ -1,10 +1,16 @@
 import os
 import random
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+# Run from app/ so gen is a package
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen.storage import format_id, read_table, table_path, write_table
+
 
 # =====================
 # CONFIG
@@ -12,8 +18,9 @@ import pandas as pd
 INPUT_DIR = Path("data")
 OUTPUT_DIR = Path("data")
 
-PLAYERS_CSV = INPUT_DIR / "raw_players.csv"
-OUTPUT_CSV = OUTPUT_DIR / "raw_sessions.csv"
+# .csv or .arrow (OUTPUT_FORMAT)
+PLAYERS_FILE = table_path(INPUT_DIR, "raw_players")
+OUTPUT_FILE = table_path(OUTPUT_DIR, "raw_sessions")
 
 # Read from environment variable or use default
 MAX_SESSIONS_PER_PLAYER = int(os.getenv("MAX_SESSIONS_PER_PLAYER", "25"))
@@ -21,6 +28,10 @@ EVENT_DATE_START = os.getenv("EVENT_DATE_START")  # YYYY-MM-DD, optional
 EVENT_DATE_END = os.getenv("EVENT_DATE_END")  # YYYY-MM-DD, optional
 # Incremental: SESSION_ID_OFFSET = max existing + 1 (e.g. 6001 if max is session_6000)
 SESSION_ID_OFFSET = os.getenv("SESSION_ID_OFFSET")
+# "python" = original per-row random loop, "numpy" = vectorized columnar generator
+GEN_ENGINE = os.getenv("GEN_ENGINE", "python")
+# numpy engine: each stage draws from its own streams of GAME_DATA_SEED (parallel.stage_rng)
+RNG_STREAM = 1
 
 PLATFORMS = [
     ("ps3", 0.50),
@@ -110,11 +121,13 @@ def generate_sessions(players_df: pd.DataFrame) -> pd.DataFrame:
                 continue
 
             platform = weighted_choice(PLATFORMS)
-            session_id = f"session_{offset + session_counter - 1}" if offset else f"session_{session_counter}"
+            session_key = offset + session_counter - 1 if offset else session_counter
             sessions.append(
                 {
-                    "session_id": session_id,
+                    "session_id": f"session_{session_key}",
+                    "session_key": session_key,
                     "player_id": player["player_id"],
+                    "player_key": player["player_key"],
                     "session_start": session_start,
                     "session_end": session_end,
                     "platform": platform,
@@ -126,6 +139,110 @@ def generate_sessions(players_df: pd.DataFrame) -> pd.DataFrame:
     return pd.DataFrame(sessions)
 
 
+# =====================
+# VECTORIZED SESSION GENERATION (GEN_ENGINE=numpy)
+# =====================
+def _group_cumsum(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Inclusive cumsum of values within each group of counts consecutive rows."""
+    # cumsum over the whole array, minus the running total at the start of each group
+    total = np.cumsum(values)
+    group_first = np.cumsum(counts) - counts
+    return total - np.repeat(total[group_first] - values[group_first], counts)
+
+
+def session_timeline(counts: np.ndarray, gaps: np.ndarray, lengths: np.ndarray, limits: np.ndarray = None):
+    """
+    Start, end and keep mask of each drawn session, in seconds from its player's timeline origin.
+
+    Sessions are grouped by player (counts per player); each one starts gap seconds
+    after the previous kept one ended and lasts length seconds. limits (seconds from
+    the origin to the end of the event range, per session) drop the sessions that
+    start at or after it. As in generate_sessions(), a dropped session does not move
+    the timeline, so a later session with a shorter gap can still fit: each pass drops
+    the first out-of-range session of every player and recomputes the rest.
+    Ends are not clipped to limits here.
+    """
+    keep = np.ones(len(gaps), dtype=bool)
+    while True:
+        steps = np.where(keep, gaps + lengths, 0)
+        starts_rel = _group_cumsum(steps, counts) - steps + gaps
+        ends_rel = starts_rel + lengths
+        if limits is None:
+            return starts_rel, ends_rel, keep
+        late = keep & (starts_rel >= limits)
+        if not late.any():
+            return starts_rel, ends_rel, keep
+        keep[late & (_group_cumsum(late.astype(np.int64), counts) == 1)] = False
+
+
+def generate_sessions_vectorized(
+    players_df: pd.DataFrame,
+    rng: np.random.Generator,
+    first_session_id: int = 1,
+    max_sessions_per_player: int = MAX_SESSIONS_PER_PLAYER,
+    event_date_start: str = EVENT_DATE_START,
+    event_date_end: str = EVENT_DATE_END,
+) -> pd.DataFrame:
+    """
+    Columnar equivalent of generate_sessions().
+
+    Session counts are drawn for all players at once and expanded with np.repeat;
+    each player's timeline is a grouped cumulative sum of (gap + length) over the
+    sessions it keeps (session_timeline()), so a session dropped for starting after
+    the range does not push the next one out, as in the per-row loop. Range clipping
+    is a mask.
+
+    session_id is returned as the integer part; callers format it to "session_<n>".
+    """
+    n_players = len(players_df)
+    counts = np.maximum(1, rng.exponential(5, size=n_players).astype(np.int64))
+    counts = np.minimum(counts, max_sessions_per_player)
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(n_players), counts)
+
+    gaps = rng.integers(0, 6, size=total) * 86400 + rng.integers(0, 13, size=total) * 3600
+    categories = [c for c, _ in SESSION_LENGTH_DISTRIBUTION]
+    weights = np.array([w for _, w in SESSION_LENGTH_DISTRIBUTION])
+    category = rng.choice(len(categories), size=total, p=weights / weights.sum())
+    low = np.array([SESSION_LENGTH_MINUTES[c][0] for c in categories])[category]
+    high = np.array([SESSION_LENGTH_MINUTES[c][1] for c in categories])[category]
+    lengths = rng.integers(low, high + 1) * 60
+
+    platforms = np.array([p for p, _ in PLATFORMS], dtype=object)
+    platform_weights = np.array([w for _, w in PLATFORMS])
+    platform = platforms[
+        rng.choice(len(platforms), size=total, p=platform_weights / platform_weights.sum())
+    ]
+
+    origin = players_df["first_seen_at"].to_numpy(dtype="datetime64[us]")
+    if event_date_start and event_date_end:
+        range_start = np.datetime64(event_date_start, "us")
+        range_end = np.datetime64(event_date_end, "us") + np.timedelta64(1, "D")
+        origin = np.maximum(origin, range_start)
+    else:
+        range_end = None
+    origin = origin[owner]
+    limits = None if range_end is None else (range_end - origin) / np.timedelta64(1, "s")
+
+    starts_rel, ends_rel, keep = session_timeline(counts, gaps, lengths, limits)
+    session_start = origin + starts_rel.astype("timedelta64[s]")
+    session_end = origin + ends_rel.astype("timedelta64[s]")
+    if range_end is not None:
+        session_end = np.minimum(session_end, range_end)
+
+    return pd.DataFrame(
+        {
+            "session_id": np.arange(
+                first_session_id, first_session_id + int(keep.sum()), dtype=np.int64
+            ),
+            "player_id": players_df["player_id"].to_numpy()[owner[keep]],
+            "session_start": session_start[keep],
+            "session_end": session_end[keep],
+            "platform": platform[keep],
+        }
+    )
+
+
 # =====================
 # MAIN
 # =====================
@@ -135,29 +252,48 @@ def main():
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    players_df = pd.read_csv(
-        PLAYERS_CSV,
+    players_df = read_table(
+        PLAYERS_FILE,
         parse_dates=["first_seen_at"],
     )
 
-    sessions_df = generate_sessions(players_df)
+    if GEN_ENGINE == "numpy":
+        from gen.parallel import SHARD_SIZE, stage_rng  # gen.parallel imports this module
+
+        # Shard by shard, like gen/parallel.py; generate on the integer keys, then format both IDs
+        keyed_players = players_df.assign(player_id=players_df["player_key"])
+        next_session_id = int(SESSION_ID_OFFSET) if SESSION_ID_OFFSET else 1
+        shards = []
+        for shard, start in enumerate(range(0, len(keyed_players), SHARD_SIZE)):
+            shards.append(generate_sessions_vectorized(
+                keyed_players.iloc[start:start + SHARD_SIZE],
+                stage_rng(seed, shard, RNG_STREAM),
+                first_session_id=next_session_id,
+            ))
+            next_session_id += len(shards[-1])
+        sessions_df = pd.concat(shards, ignore_index=True)
+        sessions_df = format_id(format_id(sessions_df, "session_id"), "player_id")
+    else:
+        sessions_df = generate_sessions(players_df)
 
     # Enforce column order
     sessions_df = sessions_df[
         [
             "session_id",
+            "session_key",
             "player_id",
+            "player_key",
             "session_start",
             "session_end",
             "platform",
         ]
     ]
 
-    sessions_df.to_csv(OUTPUT_CSV, index=False)
+    write_table(sessions_df, OUTPUT_FILE)
 
     print(
         f"🕹 Generated {len(sessions_df)} sessions "
-        f"for {len(players_df)} players → {OUTPUT_CSV}"
+        f"for {len(players_df)} players → {OUTPUT_FILE}"
     )
 
 
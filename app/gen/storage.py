@@ -0,0 +1,461 @@
+"""
+File formats for the RAW handoff files under data/.
+
+OUTPUT_FORMAT selects what the generators write and the next stages read:
+- "csv"   (default): data/raw_players.csv, raw_sessions.csv, raw_game_events.csv
+- "arrow": the same tables as Arrow IPC files (Feather v2, uncompressed), e.g.
+           data/raw_game_events.arrow. They keep column types (timestamps stay
+           timestamps) and are opened memory-mapped, so readers do not parse text
+           and numeric / timestamp columns are read zero-copy.
+- "parquet": data/raw_players.parquet, and raw_sessions / raw_game_events as
+           Hive-partitioned datasets keyed by day (see PARTITION_COLUMNS):
+           data/raw_game_events.parquet/date=2011-01-13/part-00000.parquet, sorted
+           by time within each file, with min/max statistics per row group. A full
+           run (LOAD_BATCH_ID 1 or unset) starts the dataset over; batch 2+ rewrites
+           only the days it writes, so an incremental batch adds partitions.
+           read_parquet() prunes by date; a whole dataset reads back in ID order,
+           which is the order the generators wrote it in.
+
+read_arrow_table() is the loader's pandas-free read path (LOAD_READER=arrow): CSV
+is parsed by pyarrow.csv on all cores with every RAW column typed as a string, so
+timestamps are kept as text, the way the RAW tables store them (the integer
+player_key / session_key / event_key columns, see KEY_COLUMNS, stay int64).
+
+TableWriter also writes a zone map next to each output (see gen/zonemap.py).
+merge_tables() concatenates RAW files of one table, e.g. the shards of a
+distributed run (gen/keyed.py --shard), into the file a single run writes.
+
+Used by gen/*.py and ingest/load_to_snowflake.py.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from gen.zonemap import (
+    ZONE_MAPS, ZoneMap, combine, read_zone_map, write_dataset_zone_map, write_file_zone_map,
+)
+
+
+# =====================
+# CONFIG
+# =====================
+OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "csv")
+
+FORMAT_SUFFIXES = {
+    "csv": ".csv",
+    "arrow": ".arrow",
+    "parquet": ".parquet",
+}
+
+# Parquet: tables written as datasets partitioned by the day of this column
+# (<table>.parquet/date=YYYY-MM-DD/), rows sorted by it within each file
+PARTITION_COLUMNS = {
+    "raw_sessions": "session_start",
+    "raw_game_events": "event_time",
+}
+PARTITION_KEY = "date"
+
+# Numeric IDs follow the generation order (events are generated session by session)
+ID_COLUMNS = {
+    "raw_players": "player_id",
+    "raw_sessions": "session_id",
+    "raw_game_events": "event_id",
+}
+
+# BIGINT surrogate key written next to each string ID (player_889 -> player_key 889),
+# so readers, the loader and the warehouse take MAX / sort / join on integers
+KEY_COLUMNS = {
+    "player_id": "player_key",
+    "session_id": "session_key",
+    "event_id": "event_key",
+}
+
+# Rows buffered per partition before a Parquet file is written, and per row group
+PARQUET_FILE_ROWS = int(os.getenv("PARQUET_FILE_ROWS", "1000000"))
+PARQUET_ROW_GROUP_ROWS = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "131072"))
+
+# Columns that hold timestamps in each RAW table (only CSV needs them parsed)
+DATE_COLUMNS = {
+    "raw_players": ["first_seen_at"],
+    "raw_sessions": ["session_start", "session_end"],
+    "raw_game_events": ["event_time"],
+}
+
+# Columns of each RAW table, all read as strings by read_arrow_table() except the
+# KEY_COLUMNS (int64; typed prop_<key> columns of PROPERTIES_FORMAT=columns are inferred)
+STRING_COLUMNS = {
+    "raw_players": ["player_id", "first_seen_at", "country", "language", "difficulty_selected"],
+    "raw_sessions": ["session_id", "player_id", "session_start", "session_end", "platform"],
+    "raw_game_events": [
+        "event_id", "event_time", "player_id", "event_name", "platform", "game_version", "properties",
+    ],
+}
+
+# How timestamps are written as text (matches the CSV files)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# =====================
+# PATHS
+# =====================
+def table_path(directory: Path, table: str, fmt: str = OUTPUT_FORMAT) -> Path:
+    """Return data/<table>.csv, .arrow or .parquet (a directory for partitioned tables)."""
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown OUTPUT_FORMAT {fmt!r}, expected one of {sorted(FORMAT_SUFFIXES)}")
+    return directory / f"{table}{FORMAT_SUFFIXES[fmt]}"
+
+
+def format_id(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Turn the integer IDs in column into player_<n> strings, keeping the integers as its key column next to it."""
+    keys = df[column].to_numpy()
+    df[column] = column[: -len("id")] + df[column].astype(str)
+    df.insert(df.columns.get_loc(column) + 1, KEY_COLUMNS[column], keys)
+    return df
+
+
+def is_partition(path: Path) -> bool:
+    """True for one partition directory of a dataset (.../date=YYYY-MM-DD)."""
+    return path.name.startswith(f"{PARTITION_KEY}=")
+
+
+def is_dataset(path: Path) -> bool:
+    """True for a partitioned Parquet dataset directory (data/<table>.parquet/)."""
+    return path.suffix == FORMAT_SUFFIXES["parquet"] and path.is_dir()
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix == FORMAT_SUFFIXES["parquet"] or is_partition(path)
+
+
+def _table_name(path: Path) -> str:
+    """raw_game_events for data/raw_game_events.csv and for its dataset partitions."""
+    return path.parent.stem if is_partition(path) else path.stem
+
+
+def dataset_partitions(path: Path) -> Dict[str, Path]:
+    """{YYYY-MM-DD: partition directory} of a dataset, in date order."""
+    return {
+        d.name.split("=", 1)[1]: d
+        for d in sorted(path.iterdir())
+        if d.is_dir() and is_partition(d)
+    }
+
+
+def _date_columns(path: Path, parse_dates) -> List[str]:
+    if parse_dates is not None:
+        return parse_dates
+    return DATE_COLUMNS.get(_table_name(path), [])
+
+
+# =====================
+# READ
+# =====================
+def open_arrow(path: Path) -> pa.Table:
+    """Open an Arrow IPC file memory-mapped; the returned table does not copy the data."""
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def _id_order(table: pa.Table, table_name: str) -> pa.Table:
+    """Sort rows by their key (player_889 -> 889), i.e. back into generation order."""
+    column = ID_COLUMNS.get(table_name)
+    if column not in table.column_names or table.num_rows == 0:
+        return table
+    if KEY_COLUMNS[column] in table.column_names:
+        return table.sort_by(KEY_COLUMNS[column])
+    numbers = pc.struct_field(pc.extract_regex(table[column], r"(?P<n>\d+)"), "n")
+    return table.take(pc.sort_indices(pc.cast(numbers, pa.int64())))
+
+
+def read_parquet(path: Path, start: str = None, end: str = None, columns: List[str] = None) -> pa.Table:
+    """
+    Read a Parquet RAW file, a partitioned dataset or one of its partitions.
+
+    start / end (YYYY-MM-DD, inclusive) prune a dataset to those days: the other
+    partitions are never opened. A dataset comes back in ID order (see ID_COLUMNS),
+    a single partition in time order.
+    """
+    if not path.is_dir():
+        return pq.read_table(path, columns=columns)
+    if is_partition(path):
+        return ds.dataset(str(path), format="parquet").to_table(columns=columns)
+
+    dataset = ds.dataset(
+        str(path),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([(PARTITION_KEY, pa.string())]), flavor="hive"),
+    )
+    # Files of different batches may differ in optional columns (prop_<key>)
+    fragments = list(dataset.get_fragments())
+    if fragments:
+        schema = pa.unify_schemas([f.physical_schema for f in fragments] + [dataset.schema])
+        dataset = ds.dataset(str(path), format="parquet", schema=schema, partitioning=dataset.partitioning)
+
+    day = ds.field(PARTITION_KEY)
+    condition = None
+    for bound in ((day >= start) if start else None, (day <= end) if end else None):
+        if bound is not None:
+            condition = bound if condition is None else condition & bound
+    names = columns or [name for name in dataset.schema.names if name != PARTITION_KEY]
+    return _id_order(dataset.to_table(columns=names, filter=condition), _table_name(path))
+
+
+def _timestamps_as_text(table: pa.Table) -> pa.Table:
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            seconds = pc.cast(table.column(i), pa.timestamp("s"), safe=False)
+            table = table.set_column(i, field.name, pc.strftime(seconds, format=TIMESTAMP_FORMAT))
+    return table
+
+
+def read_arrow_table(path: Path) -> pa.Table:
+    """
+    Read a whole RAW file (or dataset / partition) as an Arrow table without going through pandas.
+
+    CSV is parsed multithreaded with the RAW columns typed as strings (no datetime
+    parsing; empty fields are null like in read_table) and the key columns as int64. Timestamp columns of Arrow
+    and Parquet files are formatted back to TIMESTAMP_FORMAT text.
+    """
+    if path.suffix == FORMAT_SUFFIXES["arrow"]:
+        return _timestamps_as_text(open_arrow(path))
+    if _is_parquet(path):
+        return _timestamps_as_text(read_parquet(path))
+    columns = STRING_COLUMNS.get(path.stem, [])
+    column_types = {column: pa.string() for column in columns}
+    column_types.update({KEY_COLUMNS[column]: pa.int64() for column in columns if column in KEY_COLUMNS})
+    return pa_csv.read_csv(
+        path,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def read_table(path: Path, parse_dates: List[str] = None) -> pd.DataFrame:
+    """Read a whole RAW file as a DataFrame (CSV date columns are parsed to datetimes)."""
+    if path.suffix == FORMAT_SUFFIXES["arrow"]:
+        return open_arrow(path).to_pandas()
+    if _is_parquet(path):
+        return read_parquet(path).to_pandas()
+    return pd.read_csv(path, parse_dates=_date_columns(path, parse_dates))
+
+
+def iter_table_chunks(
+    path: Path, chunk_rows: int, parse_dates: List[str] = None, start_row: int = 0,
+) -> Iterator[pd.DataFrame]:
+    """Yield a RAW file as DataFrames of at most chunk_rows rows, from data row start_row on."""
+    if path.suffix == FORMAT_SUFFIXES["arrow"] or _is_parquet(path):
+        table = open_arrow(path) if path.suffix == FORMAT_SUFFIXES["arrow"] else read_parquet(path)
+        for offset in range(start_row, table.num_rows, chunk_rows):
+            yield table.slice(offset, chunk_rows).to_pandas()
+        return
+    yield from pd.read_csv(
+        path,
+        chunksize=chunk_rows,
+        parse_dates=_date_columns(path, parse_dates),
+        skiprows=range(1, start_row + 1) if start_row else None,
+    )
+
+
+# =====================
+# WRITE
+# =====================
+class TableWriter:
+    """
+    Append DataFrames to one CSV, Arrow IPC or Parquet file (or partitioned dataset), chunk by chunk.
+
+    Usage:
+        with TableWriter(table_path(OUTPUT_DIR, "raw_game_events")) as writer:
+            for df in chunks:
+                writer.write(df)
+    """
+
+    def __init__(self, path: Path, batch_id: str = None):
+        self.path = path
+        self.batch_id = batch_id or os.getenv("LOAD_BATCH_ID") or "1"
+        self.rows = 0
+        self._first = True
+        self._arrow_writer = None
+        self._parquet_writer = None
+        self._schema = None
+        self._partition_column = PARTITION_COLUMNS.get(path.stem) if path.suffix == ".parquet" else None
+        self._buffers: Dict[str, List[pa.Table]] = {}  # day -> tables not written yet
+        self._files: Dict[str, int] = {}  # day -> files written by this writer
+        self._dataset_ready = False
+        time_columns = DATE_COLUMNS.get(_table_name(path), [])
+        self._zonemap = ZoneMap(time_columns) if ZONE_MAPS else None
+        self._day_zonemaps: Dict[str, ZoneMap] = {}  # partitioned datasets: one per day written
+
+    def _to_batch(self, df: pd.DataFrame) -> pa.RecordBatch:
+        batch = pa.RecordBatch.from_pandas(df, schema=self._schema, preserve_index=False)
+        if self._schema is None:
+            # An all-None object column (e.g. a sparse property absent from the
+            # first chunk) infers as null; object columns here are strings
+            self._schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in batch.schema
+            ], metadata=batch.schema.metadata)
+            batch = batch.cast(self._schema)
+        return batch
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.path.suffix != FORMAT_SUFFIXES["csv"]:
+            return self.write_arrow(pa.Table.from_batches([self._to_batch(df)]))
+        if self._zonemap is not None:
+            self._zonemap.update(df)
+        df.to_csv(self.path, index=False, header=self._first, mode="w" if self._first else "a")
+        self._first = False
+        self.rows += len(df)
+
+    def write_arrow(self, table: pa.Table) -> None:
+        """Append an Arrow table with this writer's columns (Arrow and Parquet targets only)."""
+        if self.path.suffix == FORMAT_SUFFIXES["csv"]:
+            raise ValueError(f"write_arrow() cannot write CSV ({self.path}); use write()")
+        if self._schema is None:
+            self._schema = table.schema
+        table = table.select(self._schema.names).cast(self._schema)
+        if self._zonemap is not None and not self._partition_column:
+            self._zonemap.update(table)
+        if self.path.suffix == FORMAT_SUFFIXES["arrow"]:
+            if self._arrow_writer is None:
+                self._arrow_writer = pa.ipc.new_file(str(self.path), self._schema)
+            self._arrow_writer.write_table(table)
+        elif self._partition_column:
+            self._write_partitioned(table)
+        else:
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(str(self.path), self._schema, compression="snappy")
+            self._parquet_writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_ROWS)
+        self._first = False
+        self.rows += table.num_rows
+
+    def _prepare_dataset(self) -> None:
+        if self._dataset_ready:
+            return
+        if self.batch_id == "1" and self.path.exists():
+            # Full run: drop the days of earlier batches
+            if self.path.is_dir():
+                shutil.rmtree(self.path)
+            else:
+                self.path.unlink()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._dataset_ready = True
+
+    def _write_partitioned(self, table: pa.Table) -> None:
+        """Buffer table's rows per day; write a day's file once PARQUET_FILE_ROWS rows are buffered."""
+        self._prepare_dataset()
+        times = table[self._partition_column]
+        if pa.types.is_timestamp(times.type):
+            days = pc.strftime(times, format="%Y-%m-%d")
+        else:
+            days = pc.utf8_slice_codeunits(times, 0, 10)
+        for day in pc.unique(days).to_pylist():
+            rows = table.filter(pc.equal(days, day))
+            if self._zonemap is not None:
+                self._day_zonemaps.setdefault(day, ZoneMap(self._zonemap.time_columns)).update(rows)
+            self._buffers.setdefault(day, []).append(rows)
+            if sum(t.num_rows for t in self._buffers[day]) >= PARQUET_FILE_ROWS:
+                self._flush(day)
+        # Bound memory when rows are spread over many days
+        while sum(t.num_rows for tables in self._buffers.values() for t in tables) > 4 * PARQUET_FILE_ROWS:
+            self._flush(max(self._buffers, key=lambda d: sum(t.num_rows for t in self._buffers[d])))
+
+    def _flush(self, day: str) -> None:
+        table = pa.concat_tables(self._buffers.pop(day)).sort_by(self._partition_column)
+        directory = self.path / f"{PARTITION_KEY}={day}"
+        if day not in self._files:
+            # First file of this day in this run: replace whatever an earlier run wrote there
+            directory.mkdir(parents=True, exist_ok=True)
+            for old in directory.glob("*.parquet"):
+                old.unlink()
+            self._files[day] = 0
+        pq.write_table(
+            table, str(directory / f"part-{self._files[day]:05d}.parquet"),
+            row_group_size=PARQUET_ROW_GROUP_ROWS, compression="snappy",
+        )
+        self._files[day] += 1
+
+    def close(self) -> None:
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+            self._arrow_writer = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        for day in sorted(self._buffers):
+            self._flush(day)
+        if self._partition_column:
+            self._prepare_dataset()  # readers expect the dataset even if empty
+        if self._zonemap is not None:
+            if self._partition_column:
+                days = {day: zonemap.to_dict() for day, zonemap in self._day_zonemaps.items()}
+                write_dataset_zone_map(self.path, _table_name(self.path), days)
+            elif self.path.exists():
+                write_file_zone_map(self.path, _table_name(self.path), self._zonemap.to_dict())
+            self._zonemap = None  # written once, even if close() is called again
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_table(df: pd.DataFrame, path: Path) -> None:
+    """Write one DataFrame as a whole RAW file (format from the path suffix)."""
+    with TableWriter(path) as writer:
+        writer.write(df)
+
+
+def merge_tables(sources: List[Path], target: Path, batch_id: str = None) -> int:
+    """
+    Concatenate RAW files of one table, in order, into target (same format); return its rows.
+
+    CSV files are joined byte for byte (one header). Arrow and Parquet files go through
+    TableWriter; a partitioned dataset is merged day by day, each day's rows in source
+    order, so the days come out as a single writer fed the same rows would write them.
+    Missing sources count as empty.
+    """
+    sources = [source for source in sources if source.exists()]
+    if target.suffix == FORMAT_SUFFIXES["csv"]:
+        rows = 0
+        with open(target, "wb") as out:
+            for i, source in enumerate(sources):
+                with open(source, "rb") as f:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    for block in iter(lambda: f.read(1 << 20), b""):
+                        out.write(block)
+                        rows += block.count(b"\n")
+        entries = [read_zone_map(source) for source in sources]
+        if ZONE_MAPS and sources and all(entries):
+            write_file_zone_map(target, _table_name(target), combine(entries))
+        return rows
+
+    with TableWriter(target, batch_id) as writer:
+        if writer._partition_column:
+            days = sorted({day for source in sources for day in dataset_partitions(source)})
+            for day in days:
+                parts = [dataset_partitions(source).get(day) for source in sources]
+                tables = [read_parquet(part) for part in parts if part is not None]
+                writer.write_arrow(pa.concat_tables(tables, promote_options="permissive"))
+        else:
+            for source in sources:
+                if source.suffix == FORMAT_SUFFIXES["arrow"]:
+                    batches = open_arrow(source).to_batches()
+                else:
+                    batches = pq.ParquetFile(source).iter_batches(batch_size=PARQUET_ROW_GROUP_ROWS)
+                for batch in batches:
+                    writer.write_arrow(pa.Table.from_batches([batch]))
+        return writer.rows
@@ -0,0 +1,238 @@
+"""
+Zone maps: a small JSON summary written next to every RAW output file.
+
+TableWriter (gen/storage.py) collects the statistics while it writes and saves them
+when it closes:
+
+- data/raw_game_events.csv  -> data/raw_game_events.csv.zonemap.json
+- data/raw_game_events.parquet/ (dataset) -> data/raw_game_events.parquet/_zonemap.json,
+  one entry per day partition plus the totals ("_" files are ignored by Parquet readers)
+
+    {"table": "raw_game_events", "rows": 228220,
+     "time": {"event_time": ["2011-01-13 07:29:33", "2011-02-12 23:59:59"]},
+     "ids": {"event_key": [1, 228275], "player_key": [1, 2000]},
+     "event_names": {"level_start": 41234, ...},
+     "content_hash": "sha256:...", "size": 57154384, "mtime_ns": 1700000000000000000}
+
+The content hash is the one the load manifest uses (ingest/manifest.py), so the loader
+can skip a file it already loaded without reading it, and get_next_incremental.py
+--offline plans the next batch from the zone maps without touching the warehouse or
+the data. An entry only counts while the file still has the size and mtime it records.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# =====================
+# CONFIG
+# =====================
+# Set ZONE_MAPS=0 to skip writing them (saves re-reading each output file for its hash)
+ZONE_MAPS = os.getenv("ZONE_MAPS", "1") == "1"
+
+FILE_SUFFIX = ".zonemap.json"
+DATASET_FILE = "_zonemap.json"
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Columns that get a key range: the RAW keys, and their string IDs for files written
+# without the keys (older batches). Other *_id columns (prop_chapter_id, ...) are not IDs.
+ID_ENTITIES = ("player", "session", "event")
+
+
+# =====================
+# CONTENT HASH
+# =====================
+def _files(path: Path) -> List[Path]:
+    path = Path(path)
+    if not path.is_dir():
+        return [path]
+    return sorted(p for p in path.rglob("*") if p.is_file() and not p.name.startswith(("_", ".")))
+
+
+def content_hash(path: Path) -> str:
+    """sha256 of the file bytes, read in 1 MB blocks (of every file, with its name, for a directory)."""
+    path = Path(path)
+    digest = hashlib.sha256()
+    for file in _files(path):
+        if file != path:
+            digest.update(file.relative_to(path).as_posix().encode() + b"\0")
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return "sha256:" + digest.hexdigest()
+
+
+def _stat(path: Path) -> dict:
+    stats = [f.stat() for f in _files(path)]
+    return {"size": sum(s.st_size for s in stats), "mtime_ns": max((s.st_mtime_ns for s in stats), default=0)}
+
+
+# =====================
+# STATISTICS
+# =====================
+class ZoneMap:
+    """Row count, time ranges, key (numeric ID) ranges and event-name counts of the rows written so far."""
+
+    def __init__(self, time_columns: Iterable[str] = ()):
+        self.time_columns = list(time_columns)
+        self.rows = 0
+        self.time: Dict[str, list] = {}
+        self.ids: Dict[str, list] = {}
+        self.event_names: Counter = Counter()
+
+    def update(self, data) -> None:
+        """Fold a DataFrame or Arrow table into the statistics."""
+        if isinstance(data, pa.Table):
+            table = data
+        else:
+            wanted = [c for c in data.columns if c in self.time_columns or _is_id(c, data.columns) or c == "event_name"]
+            table = pa.Table.from_pandas(data[wanted], preserve_index=False)
+        self.rows += table.num_rows
+        if table.num_rows == 0:
+            return
+        for column in self.time_columns:
+            if column in table.column_names:
+                _widen(self.time, column, _time_range(table[column]))
+        for column in table.column_names:
+            if _is_id(column, table.column_names):
+                _widen(self.ids, column, _id_range(table[column]))
+        if "event_name" in table.column_names:
+            for item in pc.value_counts(table["event_name"]).to_pylist():
+                if item["values"] is not None:
+                    self.event_names[item["values"]] += item["counts"]
+
+    def to_dict(self) -> dict:
+        entry = {"rows": self.rows, "time": self.time, "ids": self.ids}
+        if self.event_names:
+            entry["event_names"] = dict(sorted(self.event_names.items()))
+        return entry
+
+
+def _is_id(column: str, columns) -> bool:
+    """player/session/event _key columns, and their _id columns in files written without the key."""
+    entity, _, suffix = column.rpartition("_")
+    if entity not in ID_ENTITIES:
+        return False
+    return suffix == "key" or (suffix == "id" and f"{entity}_key" not in columns)
+
+
+def _widen(ranges: dict, column: str, bounds: Optional[list]) -> None:
+    if bounds is None:
+        return
+    if column not in ranges:
+        ranges[column] = list(bounds)
+    else:
+        ranges[column] = [min(ranges[column][0], bounds[0]), max(ranges[column][1], bounds[1])]
+
+
+def _time_range(column) -> Optional[list]:
+    if pa.types.is_timestamp(column.type):
+        bounds = pc.min_max(column).as_py()
+        values = [bounds["min"], bounds["max"]]
+        return None if values[0] is None else [v.strftime(_TIME_FORMAT) for v in values]
+    # Text timestamps (YYYY-MM-DD HH:MM:SS) sort like the times they encode
+    bounds = pc.min_max(pc.utf8_slice_codeunits(pc.cast(column, pa.string()), 0, 19)).as_py()
+    return None if bounds["min"] is None else [bounds["min"], bounds["max"]]
+
+
+def _id_range(column) -> Optional[list]:
+    """Range of an integer key, or of the first number in IDs like player_889."""
+    if pa.types.is_integer(column.type):
+        numbers = column
+    else:
+        ids = pc.cast(column, pa.string())
+        ids = pc.filter(ids, pc.match_substring_regex(ids, r"\d"))
+        if len(ids) == 0:
+            return None
+        numbers = pc.cast(pc.struct_field(pc.extract_regex(ids, r"(?P<n>\d+)"), "n"), pa.int64())
+    bounds = pc.min_max(numbers).as_py()
+    return None if bounds["min"] is None else [bounds["min"], bounds["max"]]
+
+
+def combine(entries: Iterable[dict]) -> dict:
+    """Totals of several entries (the partitions of a dataset)."""
+    total = {"rows": 0, "time": {}, "ids": {}}
+    names: Counter = Counter()
+    for entry in entries:
+        total["rows"] += entry["rows"]
+        for key in ("time", "ids"):
+            for column, bounds in entry.get(key, {}).items():
+                _widen(total[key], column, bounds)
+        names.update(entry.get("event_names", {}))
+    if names:
+        total["event_names"] = dict(sorted(names.items()))
+    return total
+
+
+# =====================
+# FILES
+# =====================
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def write_file_zone_map(path: Path, table: str, entry: dict) -> None:
+    """Save entry (ZoneMap.to_dict()) for a finished file, with its content hash, size and mtime."""
+    path = Path(path)
+    _write_json(
+        path.with_name(path.name + FILE_SUFFIX),
+        {"table": table, "file": path.name, **entry, "content_hash": content_hash(path), **_stat(path)},
+    )
+
+
+def write_dataset_zone_map(path: Path, table: str, partitions: Dict[str, dict]) -> None:
+    """
+    Save the zone map of a partitioned dataset. partitions ({day: ZoneMap.to_dict()})
+    replace the entries of those days; entries of days no longer on disk are dropped.
+    """
+    path = Path(path)
+    existing = (_read_json(path / DATASET_FILE) or {}).get("partitions", {})
+    merged = {}
+    for directory in sorted(path.glob("date=*")):
+        day = directory.name.split("=", 1)[1]
+        if day in partitions:
+            merged[day] = {**partitions[day], "content_hash": content_hash(directory), **_stat(directory)}
+        elif day in existing:
+            merged[day] = existing[day]
+    _write_json(path / DATASET_FILE, {"table": table, **combine(merged.values()), "partitions": merged})
+
+
+def read_zone_map(path: Path) -> Optional[dict]:
+    """Zone map of a RAW file, dataset or dataset partition (None if missing or out of date)."""
+    path = Path(path)
+    if path.name.startswith("date="):
+        entry = ((_read_json(path.parent / DATASET_FILE) or {}).get("partitions") or {}).get(path.name.split("=", 1)[1])
+    elif path.is_dir():
+        entry = _read_json(path / DATASET_FILE)
+        partitions = (entry or {}).get("partitions", {})
+        if entry is None or any(read_zone_map(path / f"date={day}") is None for day in partitions):
+            return None
+        return entry
+    else:
+        entry = _read_json(path.with_name(path.name + FILE_SUFFIX))
+    if entry is None or not path.exists() or _stat(path) != {"size": entry.get("size"), "mtime_ns": entry.get("mtime_ns")}:
+        return None
+    return entry
+
+
+def max_time(entry: dict, column: str) -> Optional[datetime]:
+    bounds = entry.get("time", {}).get(column)
+    return datetime.strptime(bounds[1], _TIME_FORMAT) if bounds else None
@@ -0,0 +1,175 @@
+"""
+Upload autotuner: per-table write_pandas / PUT settings picked from measured throughput.
+
+With LOAD_AUTOTUNE=1 (or load_to_snowflake.py --autotune) the first rows of every
+table are uploaded as probes of LOAD_AUTOTUNE_PROBE_ROWS rows, each with the next
+candidate from CANDIDATES (Parquet compression x PUT parallelism; every probe is
+split into `parallel` files so the parallelism is actually exercised). Rows/sec and
+bytes/sec are measured per probe. The rest of the table is uploaded with the fastest
+candidate, in files of about TARGET_FILE_BYTES of data, and at least one file per PUT
+thread.
+
+Chunked loads (--chunk-rows) use their first chunks as the probes, whole (a chunk
+stays one COPY for its checkpoint). Tables too small for all probes keep the best
+of the probes they got; report() says so.
+"""
+
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+# =====================
+# CONFIG
+# =====================
+LOAD_AUTOTUNE = os.getenv("LOAD_AUTOTUNE", "0") == "1"
+LOAD_AUTOTUNE_PROBE_ROWS = int(os.getenv("LOAD_AUTOTUNE_PROBE_ROWS", "100000"))
+
+# write_pandas keyword arguments tried in order (the first one is write_pandas' default)
+CANDIDATES = [
+    {"compression": "gzip", "parallel": 4},
+    {"compression": "snappy", "parallel": 4},
+    {"compression": "snappy", "parallel": 8},
+    {"compression": "snappy", "parallel": 16},
+]
+
+# In-memory bytes per Parquet file after tuning (~100-250 MB compressed, the
+# file size Snowflake recommends for COPY)
+TARGET_FILE_BYTES = 512 * 1024 * 1024
+MIN_CHUNK_ROWS = 10_000
+
+
+# =====================
+# HELPERS
+# =====================
+def data_bytes(data) -> int:
+    """In-memory size of a DataFrame or an Arrow table."""
+    if hasattr(data, "nbytes") and hasattr(data, "column_names"):
+        return int(data.nbytes)
+    return int(data.memory_usage(deep=True).sum())
+
+
+def slice_rows(data, offset: int, length: int):
+    """Rows [offset, offset + length) of a DataFrame or an Arrow table."""
+    if hasattr(data, "column_names"):
+        return data.slice(offset, length)
+    return data.iloc[offset:offset + length].reset_index(drop=True)
+
+
+# =====================
+# TUNER
+# =====================
+class UploadTuner:
+    """Probe CANDIDATES on the first pieces of one table, then upload with the fastest (thread-safe)."""
+
+    def __init__(self, table_name: str, probe_rows: int = LOAD_AUTOTUNE_PROBE_ROWS):
+        self.table_name = table_name
+        self.probe_rows = probe_rows
+        self.results: Dict[int, dict] = {}  # candidate index -> measurement
+        self.chosen: Optional[dict] = None  # options of the last non-probe write
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return len(self.results) == len(CANDIDATES)
+
+    def _claim_candidate(self) -> Optional[int]:
+        with self._lock:
+            if self._next >= len(CANDIDATES):
+                return None
+            self._next += 1
+            return self._next - 1
+
+    def best(self) -> dict:
+        """Measured candidate with the highest rows/sec (write_pandas defaults before any probe)."""
+        with self._lock:
+            if not self.results:
+                return {"candidate": 0, "bytes_per_row": None}
+            return max(self.results.values(), key=lambda r: r["rows_per_sec"])
+
+    def _probe_options(self, candidate: int, rows: int) -> dict:
+        # One file per PUT thread, so the probe measures the parallelism
+        options = dict(CANDIDATES[candidate])
+        options["chunk_size"] = max(1, math.ceil(rows / options["parallel"]))
+        return options
+
+    def _upload_options(self, rows: int) -> dict:
+        best = self.best()
+        options = dict(CANDIDATES[best["candidate"]])
+        files = options["parallel"]
+        if best["bytes_per_row"]:
+            files = max(files, math.ceil(rows * best["bytes_per_row"] / TARGET_FILE_BYTES))
+        options["chunk_size"] = max(MIN_CHUNK_ROWS, math.ceil(rows / files))
+        with self._lock:
+            self.chosen = options
+        return options
+
+    def plan(self, data, split: bool = True):
+        """
+        Yield (piece, upload options, candidate index or None) covering all rows of data:
+        probes while candidates are left, then the remainder with the best settings.
+        split=False (chunked loads) keeps data in one piece, a probe if a candidate is left.
+        """
+        rows, offset = len(data), 0
+        while offset < rows:
+            rest = rows - offset
+            candidate = self._claim_candidate() if rest >= self.probe_rows or not split else None
+            if candidate is not None:
+                # Probe; a piece smaller than two probes is probed as a whole
+                length = self.probe_rows if split and rest >= 2 * self.probe_rows else rest
+                yield slice_rows(data, offset, length), self._probe_options(candidate, length), candidate
+            else:
+                length = rest
+                yield slice_rows(data, offset, length), self._upload_options(length), None
+            offset += length
+
+    def record(self, candidate: Optional[int], rows: int, nbytes: int, seconds: float) -> None:
+        if candidate is None:
+            return
+        seconds = max(seconds, 1e-9)
+        with self._lock:
+            self.results[candidate] = {
+                "candidate": candidate,
+                "rows": rows,
+                "rows_per_sec": rows / seconds,
+                "bytes_per_sec": nbytes / seconds,
+                "bytes_per_row": nbytes / rows if rows else None,
+            }
+
+    def report(self) -> List[str]:
+        """Lines for the run output: each probe's throughput and the chosen settings."""
+        lines = []
+        for index in sorted(self.results):
+            r = self.results[index]
+            c = CANDIDATES[index]
+            lines.append(
+                f"   probe {c['compression']:<6} parallel={c['parallel']:<3} {r['rows']:>9,} rows  "
+                f"{r['rows_per_sec']:>10,.0f} rows/s  {r['bytes_per_sec'] / 1e6:7.1f} MB/s"
+            )
+        chosen = self.chosen or CANDIDATES[self.best()["candidate"]]
+        chunk = f" chunk_size={chosen['chunk_size']:,}" if "chunk_size" in chosen else ""
+        status = "" if self.done else f" ({len(self.results)} of {len(CANDIDATES)} candidates probed, table too small)"
+        lines.append(
+            f"🎛  {self.table_name} upload settings: compression={chosen['compression']} "
+            f"parallel={chosen['parallel']}{chunk}{status}"
+        )
+        return lines
+
+
+_TUNERS: Dict[str, UploadTuner] = {}
+_TUNERS_LOCK = threading.Lock()
+
+
+def get_tuner(table_name: str) -> UploadTuner:
+    """This run's tuner for table_name."""
+    with _TUNERS_LOCK:
+        if table_name not in _TUNERS:
+            _TUNERS[table_name] = UploadTuner(table_name)
+        return _TUNERS[table_name]
+
+
+def reset_tuners() -> None:
+    with _TUNERS_LOCK:
+        _TUNERS.clear()
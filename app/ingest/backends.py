@@ -0,0 +1,577 @@
+"""
+Warehouse backends for the RAW load and the incremental watermark queries.
+
+WAREHOUSE_BACKEND selects where ingest/ writes and reads:
+- "snowflake" (default): the course account from the SNOWFLAKE_* env vars
+- "duckdb": a local DuckDB file (WAREHOUSE_PATH, default data/warehouse.duckdb);
+            needs `pip install duckdb`
+- "sqlite": a local SQLite file (WAREHOUSE_PATH, default data/warehouse.sqlite)
+
+The local backends need no credentials and cost nothing per run, so the whole load
+path (DDL, bulk load, watermark queries, row counts) can be run and timed on a
+laptop or CI runner:
+
+    WAREHOUSE_BACKEND=duckdb python ingest/load_to_snowflake.py --mode recreate
+    WAREHOUSE_BACKEND=duckdb python ingest/get_next_incremental.py
+
+pandas and the drivers are imported when first needed, so the watermark lookup
+(get_next_incremental.py) starts without them.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+# =====================
+# CONFIG
+# =====================
+WAREHOUSE_BACKEND = os.getenv("WAREHOUSE_BACKEND", "snowflake")
+WAREHOUSE_PATH = os.getenv("WAREHOUSE_PATH")
+
+# RAW table layout (see load_to_snowflake.py): "string" = timestamps stored as text,
+# "typed" = TIMESTAMP_NTZ columns, sessions / events clustered by date
+RAW_LAYOUT = os.getenv("RAW_LAYOUT", "string")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+# =====================
+# HELPERS
+# =====================
+class InvalidJSONError(Exception):
+    """
+    Rows whose JSON text the warehouse could not parse (found in one set-based check).
+
+    Not a ValueError: the loader reports ValueError as a configuration problem.
+    """
+
+    def __init__(self, table_name: str, count: int, sample_keys: list):
+        self.table_name = table_name
+        self.count = count
+        self.sample_keys = sample_keys
+        super().__init__(
+            f"{count} rows in {table_name} have invalid JSON (e.g. {', '.join(map(str, sample_keys))}); nothing of this batch was loaded"
+        )
+
+
+def _to_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _stage_name(table_name: str) -> str:
+    """Unique scratch table name per write_frame_json() call, so concurrent loads of one table
+    (partitions, pipelined chunks) do not overwrite or drop each other's stage."""
+    return f"{table_name}_STAGE_{uuid.uuid4().hex[:8].upper()}"
+
+
+def _sql_type(field) -> str:
+    """Snowflake type an Arrow column is staged / copied as: integer keys stay numbers, the rest is text."""
+    import pyarrow as pa
+
+    return "NUMBER" if pa.types.is_integer(field.type) else "STRING"
+
+
+def _column_names(data) -> list:
+    """Column names of a DataFrame or an Arrow table."""
+    return list(data.column_names) if hasattr(data, "column_names") else list(data.columns)
+
+
+def _to_pandas(data) -> pd.DataFrame:
+    return data.to_pandas() if hasattr(data, "column_names") else data
+
+
+def _variant_columns_as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """Local backends store VARIANT as JSON text: dump dict / list columns."""
+    for column in df.columns:
+        if df[column].dtype != object or df.empty:
+            continue
+        first = df[column].iloc[0]
+        if isinstance(first, (dict, list)):
+            df[column] = [None if v is None else json.dumps(v) for v in df[column]]
+    return df
+
+
+# =====================
+# BACKENDS
+# =====================
+class WarehouseBackend:
+    """
+    What ingest/ needs from a warehouse: DDL, bulk load, watermark queries, row counts.
+
+    create_table() takes the Snowflake DDL templates from load_to_snowflake.py
+    ("CREATE OR REPLACE TABLE {database}.{schema}.RAW_..."); each backend adapts them.
+    """
+
+    name = ""
+    # write_frame() wants VARIANT columns as Python objects (True) or JSON text (False)
+    variant_objects = False
+    # Writes honour `upload` settings (write_pandas chunk_size / compression / parallel)
+    tunable_upload = False
+
+    def connect(self):
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return self.name
+
+    def qualify(self, table: str) -> str:
+        return table
+
+    def table_ddl(self, schema_sql: str) -> str:
+        # Clustering keys are Snowflake-only
+        ddl = re.sub(r"\s*CLUSTER BY .*", "\n", schema_sql, flags=re.S)
+        return ddl.replace("{database}.{schema}.", "")
+
+    def create_table(self, conn, schema_sql: str, table_name: str) -> None:
+        self.execute(conn, self.table_ddl(schema_sql))
+
+    def write_frame(self, conn, df: pd.DataFrame, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        """
+        Bulk load df into an existing table; overwrite replaces its rows. Returns rows written.
+        upload: write_pandas chunk_size / compression / parallel (see ingest/autotune.py),
+        ignored by backends without tunable_upload.
+        """
+        raise NotImplementedError
+
+    def write_arrow(self, conn, table: pa.Table, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        """Bulk load an Arrow table (see write_frame); backends without an Arrow path convert it to pandas."""
+        return self.write_frame(conn, table.to_pandas(), table_name, overwrite, upload)
+
+    def write_frame_json(
+        self, conn, df, table_name: str, json_columns, overwrite: bool, upload: dict = None,
+    ) -> int:
+        """
+        Bulk load df (a DataFrame or an Arrow table) with json_columns still as JSON
+        text; the warehouse parses them.
+
+        df goes to a stage table first; one query counts unparseable values (raising
+        InvalidJSONError with a few sample keys from the first column), then one
+        INSERT ... SELECT converts the JSON columns set-based. Returns rows written.
+        """
+        columns = _column_names(df)
+        stage = self.create_stage(conn, df, table_name, upload)
+        try:
+            invalid = " OR ".join(
+                f"({c} IS NOT NULL AND NOT ({self.json_valid_sql(c)}))" for c in json_columns
+            )
+            count = int(self.scalar(conn, f"SELECT COUNT(*) FROM {stage} WHERE {invalid}") or 0)
+            if count:
+                sample = self.fetchall(conn, f"SELECT {columns[0]} FROM {stage} WHERE {invalid} LIMIT 5")
+                raise InvalidJSONError(table_name, count, [row[0] for row in sample])
+
+            target = self.qualify(table_name)
+            if overwrite:
+                self.execute(conn, f"DELETE FROM {target}")
+            select = ", ".join(self.parse_json_sql(c) if c in json_columns else c for c in columns)
+            self.execute(conn, f"INSERT INTO {target} ({', '.join(columns)}) SELECT {select} FROM {stage}")
+        finally:
+            self.drop_stage(conn, stage)
+        return len(df)
+
+    def create_stage(self, conn, df, table_name: str, upload: dict = None) -> str:
+        """Upload df (DataFrame or Arrow table) as-is to a scratch table; returns its name for write_frame_json()."""
+        raise NotImplementedError
+
+    def drop_stage(self, conn, stage: str) -> None:
+        self.execute(conn, f"DROP TABLE IF EXISTS {stage}")
+
+    def json_valid_sql(self, column: str) -> str:
+        return f"json_valid({column})"
+
+    def parse_json_sql(self, column: str) -> str:
+        return column
+
+    def execute(self, conn, sql: str) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def fetchall(self, conn, sql: str) -> list:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def scalar(self, conn, sql: str):
+        rows = self.fetchall(conn, sql)
+        return rows[0][0] if rows else None
+
+    def max_date(self, conn, table: str, column: str) -> Optional[date]:
+        """Latest YYYY-MM-DD date in a timestamp-as-string column (None for an empty table)."""
+        raise NotImplementedError
+
+    def column_names(self, conn, table: str) -> list:
+        """Upper-case column names of table (raises if it does not exist)."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {self.qualify(table)} LIMIT 0")
+            return [d[0].upper() for d in cursor.description]
+        finally:
+            cursor.close()
+
+    def max_key(self, conn, table: str, column: str) -> int:
+        """
+        Largest value of a BIGINT key column like PLAYER_KEY (0 for an empty table).
+
+        RAW tables loaded before the key columns existed only have the string IDs: their
+        numbers are scanned instead (PLAYER_ID for PLAYER_KEY), so offsets never restart.
+        """
+        if column.upper() not in self.column_names(conn, table):
+            return self.max_numeric_id(conn, table, column.upper().replace("_KEY", "_ID"))
+        value = self.scalar(conn, f"SELECT MAX({column}) FROM {self.qualify(table)}")
+        return int(value) if value is not None else 0
+
+    def max_numeric_id(self, conn, table: str, column: str) -> int:
+        """Largest number in IDs like player_889 (0 for an empty table)."""
+        raise NotImplementedError
+
+    def row_count(self, conn, table: str) -> int:
+        return int(self.scalar(conn, f"SELECT COUNT(*) FROM {self.qualify(table)}") or 0)
+
+    def default_schema(self) -> str:
+        """Schema the RAW tables are loaded into."""
+        raise NotImplementedError(f"The {self.name} backend has no schemas")
+
+    def create_schema(self, conn, schema: str) -> None:
+        raise NotImplementedError(f"The {self.name} backend has no schemas")
+
+    def clone_table(self, conn, table: str, schema: str) -> None:
+        """Replace schema.table with a copy of the loaded table."""
+        raise NotImplementedError(f"The {self.name} backend has no schemas")
+
+
+class SnowflakeBackend(WarehouseBackend):
+    name = "snowflake"
+    tunable_upload = True
+    variant_objects = True
+
+    def __init__(self, database: str = None, schema: str = None):
+        self.database = database or os.getenv("SNOWFLAKE_DATABASE", "GAME_ANALYTICS")
+        self.schema = schema or os.getenv("SNOWFLAKE_SCHEMA", "RAW")
+
+    def connect(self):
+        import snowflake.connector
+
+        user = os.getenv("SNOWFLAKE_USER")
+        password = os.getenv("SNOWFLAKE_PASSWORD")
+        authenticator = os.getenv("SNOWFLAKE_AUTHENTICATOR")
+        if not user or not (password or authenticator):
+            raise ValueError(
+                "SNOWFLAKE_USER and SNOWFLAKE_PASSWORD environment variables must be set"
+            )
+        conn_params = {
+            "user": user,
+            "password": password,
+            "account": os.getenv("SNOWFLAKE_ACCOUNT"),
+            "warehouse": os.getenv("SNOWFLAKE_WAREHOUSE"),
+            "database": self.database,
+            "schema": self.schema,
+            # Heartbeats keep a shared session (ingest/connection.py) from expiring
+            # while data is generated between the watermark lookup and the load
+            "client_session_keep_alive": True,
+        }
+        if os.getenv("SNOWFLAKE_ROLE"):
+            conn_params["role"] = os.getenv("SNOWFLAKE_ROLE")
+        if authenticator:
+            # externalbrowser / username_password_mfa: cache the SSO or MFA token
+            # locally so the next script run does not authenticate interactively again
+            conn_params["authenticator"] = authenticator
+            conn_params["client_store_temporary_credential"] = True
+            conn_params["client_request_mfa_token"] = True
+        return snowflake.connector.connect(**conn_params)
+
+    def describe(self) -> str:
+        return f"Snowflake {self.database}.{self.schema}"
+
+    def qualify(self, table: str) -> str:
+        return f"{self.database}.{self.schema}.{table}"
+
+    def table_ddl(self, schema_sql: str) -> str:
+        return schema_sql.format(database=self.database, schema=self.schema)
+
+    def write_frame(self, conn, df: pd.DataFrame, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        # Needs the [pandas] extra; import after pandas (see load_to_snowflake.py)
+        from snowflake.connector.pandas_tools import write_pandas
+        success, _, nrows, _ = write_pandas(
+            conn=conn,
+            df=df,
+            table_name=table_name,
+            database=self.database,
+            schema=self.schema,
+            auto_create_table=False,
+            overwrite=overwrite,
+            # Parquet logical timestamp types, so datetimes land intact in TIMESTAMP_NTZ
+            use_logical_type=(RAW_LAYOUT == "typed") or None,
+            **(upload or {}),
+        )
+        if not success:
+            raise RuntimeError(f"write_pandas reported a failed load into {table_name}")
+        return nrows
+
+    def write_arrow(self, conn, table: pa.Table, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        # Parquet straight from Arrow, then PUT + COPY (what write_pandas does, minus pandas)
+        if overwrite:
+            self.execute(conn, f"TRUNCATE TABLE {self.qualify(table_name)}")
+        self.copy_parquet(conn, table, table_name, upload)
+        return table.num_rows
+
+    def copy_parquet(self, conn, table: pa.Table, table_name: str, upload: dict = None) -> None:
+        """
+        Write table as Parquet files (upload["chunk_size"] rows each, default one file),
+        PUT them to a temporary stage and COPY them into table_name.
+        """
+        import pyarrow.parquet as pq
+
+        upload = upload or {}
+        stage = self.qualify(f"{table_name}_ARROW_{uuid.uuid4().hex[:8].upper()}")
+        columns = table.column_names
+        chunk_size = upload.get("chunk_size") or max(table.num_rows, 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, offset in enumerate(range(0, max(table.num_rows, 1), chunk_size)):
+                pq.write_table(
+                    table.slice(offset, chunk_size), os.path.join(tmp, f"part_{i}.parquet"),
+                    compression=upload.get("compression", "snappy"),
+                )
+            self.execute(conn, f"CREATE TEMPORARY STAGE {stage}")
+            try:
+                self.execute(
+                    conn,
+                    f"PUT 'file://{Path(tmp).as_posix()}/*.parquet' @{stage} "
+                    f"PARALLEL={int(upload.get('parallel', 4))} AUTO_COMPRESS=FALSE",
+                )
+                select = ", ".join(f'$1:"{f.name}"::{_sql_type(f)}' for f in table.schema)
+                self.execute(
+                    conn,
+                    f"COPY INTO {self.qualify(table_name)} ({', '.join(columns)}) "
+                    f"FROM (SELECT {select} FROM @{stage}) FILE_FORMAT = (TYPE = PARQUET) PURGE = TRUE",
+                )
+            finally:
+                self.execute(conn, f"DROP STAGE IF EXISTS {stage}")
+
+    def create_stage(self, conn, df, table_name: str, upload: dict = None) -> str:
+        stage = _stage_name(table_name)
+        if hasattr(df, "column_names"):
+            columns = ", ".join(f"{f.name} {_sql_type(f)}" for f in df.schema)
+            self.execute(conn, f"CREATE OR REPLACE TEMPORARY TABLE {self.qualify(stage)} ({columns})")
+            self.copy_parquet(conn, df, stage, upload)
+            return self.qualify(stage)
+
+        from snowflake.connector.pandas_tools import write_pandas
+        write_pandas(
+            conn=conn,
+            df=df,
+            table_name=stage,
+            database=self.database,
+            schema=self.schema,
+            auto_create_table=True,
+            table_type="temporary",
+            overwrite=True,
+            **(upload or {}),
+        )
+        return self.qualify(stage)
+
+    def json_valid_sql(self, column: str) -> str:
+        return f"TRY_PARSE_JSON({column}) IS NOT NULL"
+
+    def parse_json_sql(self, column: str) -> str:
+        return f"PARSE_JSON({column})"
+
+    def max_date(self, conn, table: str, column: str) -> Optional[date]:
+        if RAW_LAYOUT == "typed":
+            # MAX of a TIMESTAMP_NTZ column comes from micro-partition metadata
+            return _to_date(self.scalar(conn, f"SELECT MAX({column}) FROM {self.qualify(table)}"))
+        return _to_date(self.scalar(
+            conn,
+            f"SELECT MAX(TRY_TO_DATE(SUBSTR({column}, 1, 10))) FROM {self.qualify(table)}",
+        ))
+
+    def max_numeric_id(self, conn, table: str, column: str) -> int:
+        value = self.scalar(
+            conn,
+            f"SELECT MAX(TRY_CAST(REGEXP_SUBSTR({column}, '[0-9]+', 1, 1) AS INT)) FROM {self.qualify(table)}",
+        )
+        return int(value) if value is not None else 0
+
+    def default_schema(self) -> str:
+        return self.schema
+
+    def create_schema(self, conn, schema: str) -> None:
+        self.execute(conn, f"CREATE SCHEMA IF NOT EXISTS {self.database}.{schema}")
+
+    def clone_table(self, conn, table: str, schema: str) -> None:
+        # Zero-copy clone: shares the loaded micro-partitions, no data is uploaded again
+        self.execute(
+            conn, f"CREATE OR REPLACE TABLE {self.database}.{schema}.{table} CLONE {self.qualify(table)}"
+        )
+
+
+class DuckDBBackend(WarehouseBackend):
+    name = "duckdb"
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path or WAREHOUSE_PATH or DATA_DIR / "warehouse.duckdb")
+
+    def connect(self):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("WAREHOUSE_BACKEND=duckdb needs the duckdb package: pip install duckdb") from e
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        return duckdb.connect(str(self.path))
+
+    def describe(self) -> str:
+        return f"DuckDB {self.path}"
+
+    def table_ddl(self, schema_sql: str) -> str:
+        return super().table_ddl(schema_sql).replace("VARIANT", "JSON").replace("TIMESTAMP_NTZ", "TIMESTAMP")
+
+    def write_frame(self, conn, df: pd.DataFrame, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        df = _variant_columns_as_text(df)
+        if overwrite:
+            conn.execute(f"DELETE FROM {table_name}")
+        conn.register("_frame", df)
+        try:
+            conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM _frame")
+        finally:
+            conn.unregister("_frame")
+        return len(df)
+
+    def write_arrow(self, conn, table: pa.Table, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        # DuckDB scans Arrow tables in place
+        if overwrite:
+            conn.execute(f"DELETE FROM {table_name}")
+        conn.register("_frame", table)
+        try:
+            conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM _frame")
+        finally:
+            conn.unregister("_frame")
+        return table.num_rows
+
+    def create_stage(self, conn, df, table_name: str, upload: dict = None) -> str:
+        stage = _stage_name(table_name)
+        conn.register(stage, df)
+        return stage
+
+    # conn.cursor() is a separate DuckDB connection that cannot see registered frames
+    def execute(self, conn, sql: str) -> None:
+        conn.execute(sql)
+
+    def fetchall(self, conn, sql: str) -> list:
+        return conn.execute(sql).fetchall()
+
+    def drop_stage(self, conn, stage: str) -> None:
+        conn.unregister(stage)
+
+    def column_names(self, conn, table: str) -> list:
+        return [d[0].upper() for d in conn.execute(f"SELECT * FROM {table} LIMIT 0").description]
+
+    def max_date(self, conn, table: str, column: str) -> Optional[date]:
+        if RAW_LAYOUT == "typed":
+            return _to_date(self.scalar(conn, f"SELECT MAX({column}) FROM {table}"))
+        return _to_date(self.scalar(
+            conn, f"SELECT MAX(TRY_CAST(SUBSTR({column}, 1, 10) AS DATE)) FROM {table}",
+        ))
+
+    def max_numeric_id(self, conn, table: str, column: str) -> int:
+        value = self.scalar(
+            conn,
+            f"SELECT MAX(TRY_CAST(NULLIF(REGEXP_EXTRACT({column}, '[0-9]+'), '') AS BIGINT)) FROM {table}",
+        )
+        return int(value) if value is not None else 0
+
+    def default_schema(self) -> str:
+        return "main"
+
+    def create_schema(self, conn, schema: str) -> None:
+        conn.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+    def clone_table(self, conn, table: str, schema: str) -> None:
+        # No zero-copy clones in DuckDB: a local copy of the table
+        conn.execute(f"CREATE OR REPLACE TABLE {schema}.{table} AS SELECT * FROM main.{table}")
+
+
+class SQLiteBackend(WarehouseBackend):
+    name = "sqlite"
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path or WAREHOUSE_PATH or DATA_DIR / "warehouse.sqlite")
+
+    def connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Pooled connections are handed between loader threads
+        return sqlite3.connect(str(self.path), timeout=60, check_same_thread=False)
+
+    def describe(self) -> str:
+        return f"SQLite {self.path}"
+
+    def create_table(self, conn, schema_sql: str, table_name: str) -> None:
+        # No CREATE OR REPLACE in SQLite; column types are kept as declared
+        conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        conn.execute(self.table_ddl(schema_sql).replace("CREATE OR REPLACE TABLE", "CREATE TABLE"))
+        conn.commit()
+
+    def write_frame(self, conn, df: pd.DataFrame, table_name: str, overwrite: bool, upload: dict = None) -> int:
+        df = _variant_columns_as_text(df)
+        if overwrite:
+            conn.execute(f"DELETE FROM {table_name}")
+        df.to_sql(table_name, conn, if_exists="append", index=False, chunksize=50_000)
+        conn.commit()
+        return len(df)
+
+    def create_stage(self, conn, df, table_name: str, upload: dict = None) -> str:
+        stage = _stage_name(table_name)
+        _to_pandas(df).to_sql(stage, conn, if_exists="replace", index=False, chunksize=50_000)
+        return stage
+
+    def execute(self, conn, sql: str) -> None:
+        conn.execute(sql)
+        conn.commit()
+
+    def max_date(self, conn, table: str, column: str) -> Optional[date]:
+        return _to_date(self.scalar(conn, f"SELECT MAX(DATE(SUBSTR({column}, 1, 10))) FROM {table}"))
+
+    def max_numeric_id(self, conn, table: str, column: str) -> int:
+        # IDs are <prefix>_<n>[_...]: the first number follows the first underscore
+        value = self.scalar(
+            conn,
+            f"SELECT MAX(CAST(SUBSTR({column}, INSTR({column}, '_') + 1) AS INTEGER)) FROM {table}",
+        )
+        return int(value) if value is not None else 0
+
+
+BACKENDS = {
+    "snowflake": SnowflakeBackend,
+    "duckdb": DuckDBBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def get_backend(name: str = None) -> WarehouseBackend:
+    """Return the backend named by name or WAREHOUSE_BACKEND."""
+    name = name or WAREHOUSE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown WAREHOUSE_BACKEND {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
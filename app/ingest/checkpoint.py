@@ -0,0 +1,78 @@
+"""
+Local checkpoint files for resumable chunked loads.
+
+A chunked load writes data/.checkpoints/<table>.json after every committed chunk:
+
+    {"source": "data/raw_game_events.csv", "size": 123, "mtime": 1700000000.0,
+     "chunk_rows": 500000, "warehouse": "Snowflake GAME_ANALYTICS.RAW",
+     "mode": "append", "base_rows": 0, "rows_done": 1500000, "chunks_done": 3,
+     "watermark": {"max_date": "2011-02-12", "max_id": 1500023}}
+
+If the load crashes, the next run with the same source file, chunk size and
+warehouse continues after rows_done instead of starting from zero. A finished
+table is marked "complete" so a rerun skips it; the files are removed once every
+table of the run is loaded.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+# =====================
+# CONFIG
+# =====================
+CHECKPOINT_DIR = Path(
+    os.getenv("LOAD_CHECKPOINT_DIR", str(Path(__file__).parent.parent / "data" / ".checkpoints"))
+)
+
+# Keys that must match for a checkpoint to apply to this run
+_IDENTITY_KEYS = ("source", "size", "mtime", "chunk_rows", "warehouse")
+
+
+# =====================
+# CHECKPOINT
+# =====================
+class LoadCheckpoint:
+    """Progress of one table's chunked load, persisted after every chunk."""
+
+    def __init__(self, table: str, source: Path, chunk_rows: int, warehouse: str):
+        self.path = CHECKPOINT_DIR / f"{table.lower()}.json"
+        stat = source.stat()
+        self.identity = {
+            "source": str(source.resolve()),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chunk_rows": chunk_rows,
+            "warehouse": warehouse,
+        }
+
+    def load(self) -> Optional[dict]:
+        """Return the saved state if it belongs to this source file / chunk size / warehouse."""
+        if not self.path.exists():
+            return None
+        try:
+            state = json.loads(self.path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if any(state.get(key) != self.identity[key] for key in _IDENTITY_KEYS):
+            return None
+        return state
+
+    def save(self, **progress) -> None:
+        """Write identity + progress atomically (a crash never leaves a half-written file)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({**self.identity, **progress}, indent=2))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
+
+    @staticmethod
+    def clear_all() -> None:
+        """Forget every saved checkpoint (next chunked load starts from zero)."""
+        for path in CHECKPOINT_DIR.glob("*.json"):
+            path.unlink()
@@ -0,0 +1,65 @@
+"""
+Shared warehouse sessions for the ingest scripts.
+
+get_next_incremental.py and load_to_snowflake.py open their connection through
+session(), so one process that plans a batch and then loads it (main.py
+--incremental) authenticates once and reuses the same session for the watermark
+lookup and the load. Snowflake sessions are opened with keep-alive heartbeats and,
+for SSO / MFA authenticators, a cached token (see SnowflakeBackend.connect).
+
+This module only imports ingest.backends, which imports pandas and the Snowflake
+connector lazily, so a watermark lookup does not pay for them.
+
+Usage (from app/):
+    from ingest.connection import session
+    conn = session()                 # WAREHOUSE_BACKEND, opened on first use
+    conn = session()                 # same connection
+"""
+
+import atexit
+import threading
+
+from ingest.backends import WarehouseBackend, get_backend
+
+
+# =====================
+# SESSIONS
+# =====================
+# backend.describe() -> open connection
+_SESSIONS = {}
+_LOCK = threading.Lock()
+
+
+def _is_closed(conn) -> bool:
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+def session(backend: WarehouseBackend = None):
+    """
+    Return this process's connection to backend (default: WAREHOUSE_BACKEND),
+    opening it on first use or if it was closed. Do not close it yourself;
+    close_sessions() runs at exit.
+    """
+    backend = backend or get_backend()
+    key = backend.describe()
+    with _LOCK:
+        conn = _SESSIONS.get(key)
+        if conn is None or _is_closed(conn):
+            conn = backend.connect()
+            _SESSIONS[key] = conn
+        return conn
+
+
+def close_sessions() -> None:
+    """Close every shared session (registered with atexit)."""
+    with _LOCK:
+        for conn in _SESSIONS.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _SESSIONS.clear()
+
+
+atexit.register(close_sessions)
@@ -1,23 +1,40 @@
 """
 Compute next incremental batch params from Snowflake RAW tables.
 
-Queries max date and max numeric IDs from existing data, returns:
+Reads max date and max keys of the loaded data, returns:
   - START_DATE: day after max session/event date
   - END_DATE: start + 31 days
-  - PLAYER_ID_OFFSET: max(player_id number) + 1 (e.g. max player_889 → 890)
-  - SESSION_ID_OFFSET: max(session_id number) + 1
-  - EVENT_ID_OFFSET: max(event_id number) + 1
+  - PLAYER_ID_OFFSET: max(player_key) + 1 (e.g. max player_889 → 890)
+  - SESSION_ID_OFFSET: max(session_key) + 1
+  - EVENT_ID_OFFSET: max(event_key) + 1
+
+The keys are the BIGINT PLAYER_KEY / SESSION_KEY / EVENT_KEY columns the generators
+write next to the string IDs, so a fallback scan is a plain MAX (no string parsing).
+RAW tables loaded before those columns existed are scanned on their *_ID strings
+instead; appending to them needs a recreate (--mode recreate) or the migration in
+README.md, since new batches carry the key columns.
 
 Uses sequential IDs (player_890, player_891, ...) instead of batch-prefixed (player_2_1).
 
+The values come from RAW_LOAD_WATERMARKS, which the loader keeps up to date (one
+small query, see ingest/watermarks.py). Tables it does not cover yet (loaded before it
+existed) are scanned instead.
+
+With --offline (plan_from_zone_maps) the same values come from the zone maps the
+generators wrote next to data/ (see gen/zonemap.py): no warehouse, no data read.
+
 If tables are empty or missing, uses defaults: 2011-02-13..2011-03-15, offsets 1/1/0.
 
+Reads from WAREHOUSE_BACKEND (snowflake by default, or the local duckdb / sqlite
+file, see ingest/backends.py) over the shared session of ingest/connection.py, so a
+process that loads afterwards (main.py --incremental) reuses the same connection.
+
 Output: KEY=value lines for shell eval.
 """
 
-import os
+import argparse
 import sys
-from datetime import datetime, timedelta
+from datetime import timedelta
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -26,93 +43,128 @@ load_dotenv(Path(__file__).parent.parent / ".env")
 
 # Run from app/ so ingest is a package
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from ingest.load_to_snowflake import get_snowflake_connection
-
-SNOWFLAKE_DATABASE = os.getenv("SNOWFLAKE_DATABASE", "GAME_ANALYTICS")
-SNOWFLAKE_SCHEMA = os.getenv("SNOWFLAKE_SCHEMA", "RAW")
+from ingest.backends import get_backend
+from ingest.connection import session
+from ingest.watermarks import WATERMARK_COLUMNS, WatermarkTable
 
 DEFAULT_START = "2011-02-13"
 DEFAULT_END = "2011-03-15"
 INCREMENT_DAYS = 31
+DATA_DIR = Path(__file__).parent.parent / "data"
 
 
-def _query_max_numeric_id(cursor, table: str, id_col: str) -> int:
-    """Extract max numeric part from IDs like player_889, player_2_1, session_1234."""
+def _query_max_key(backend, conn, table: str, key_col: str) -> int:
+    """MAX of a key column like PLAYER_KEY (0 if the table is missing; other errors raise)."""
     try:
-        cursor.execute(
-            f"""
-            SELECT MAX(TRY_CAST(REGEXP_SUBSTR({id_col}, '[0-9]+', 1, 1) AS INT))
-            FROM {SNOWFLAKE_DATABASE}.{SNOWFLAKE_SCHEMA}.{table}
-            """
-        )
-        row = cursor.fetchone()
-        return int(row[0]) if row and row[0] is not None else 0
+        backend.column_names(conn, table)
     except Exception:
         return 0
+    return backend.max_key(conn, table, key_col)
 
 
-def get_next_incremental_params():
-    """Query Snowflake for max date and max IDs; return next params."""
-    conn = None
+def _read_watermarks(backend, conn) -> dict:
+    """{table: (max date, max key)} from RAW_LOAD_WATERMARKS ({} if it does not exist)."""
     try:
-        conn = get_snowflake_connection()
-        cursor = conn.cursor()
-
-        # Max date from RAW_SESSIONS (SESSION_END) or RAW_GAME_EVENTS (EVENT_TIME)
-        max_date = None
-        for table, col in [
-            ("RAW_SESSIONS", "SESSION_END"),
-            ("RAW_GAME_EVENTS", "EVENT_TIME"),
-        ]:
-            try:
-                cursor.execute(
-                    f"""
-                    SELECT MAX(TRY_TO_DATE(SUBSTR({col}, 1, 10)))
-                    FROM {SNOWFLAKE_DATABASE}.{SNOWFLAKE_SCHEMA}.{table}
-                    """
-                )
-                row = cursor.fetchone()
-                if row and row[0]:
-                    d = row[0]
-                    if isinstance(d, str):
-                        d = datetime.strptime(d[:10], "%Y-%m-%d").date()
-                    if max_date is None or d > max_date:
-                        max_date = d
-            except Exception:
-                pass
-
-        # Max numeric IDs for sequential generation (player_889 → next is player_890)
-        max_player = _query_max_numeric_id(cursor, "RAW_PLAYERS", "PLAYER_ID")
-        max_session = _query_max_numeric_id(cursor, "RAW_SESSIONS", "SESSION_ID")
-        max_event = _query_max_numeric_id(cursor, "RAW_GAME_EVENTS", "EVENT_ID")
-
-        cursor.close()
-
-        if max_date:
-            start_d = max_date + timedelta(days=1)
-            end_d = start_d + timedelta(days=INCREMENT_DAYS)
-            start_str = start_d.strftime("%Y-%m-%d")
-            end_str = end_d.strftime("%Y-%m-%d")
-        else:
-            start_str = DEFAULT_START
-            end_str = DEFAULT_END
-
-        player_offset = max_player + 1
-        session_offset = max_session + 1
-        event_offset = max_event + 1
-
-        return start_str, end_str, player_offset, session_offset, event_offset
+        return WatermarkTable(backend).read(conn)
+    except Exception:
+        return {}
 
+
+def _scan_watermark(backend, conn, table: str, with_date: bool = True):
+    """(max date, max key) of table from full scans (None / 0 if missing)."""
+    date_col, key_col = WATERMARK_COLUMNS[table]
+    max_date = None
+    try:
+        if with_date:
+            max_date = backend.max_date(conn, table, date_col)
+    except Exception:
+        pass
+    return max_date, _query_max_key(backend, conn, table, key_col)
+
+
+def _params_from_watermarks(watermarks: dict):
+    """Next batch params from {table: (max date, max key)} of the three RAW tables."""
+    # Max date from RAW_SESSIONS (SESSION_END) or RAW_GAME_EVENTS (EVENT_TIME)
+    max_date = None
+    for table in ("RAW_SESSIONS", "RAW_GAME_EVENTS"):
+        d = watermarks[table][0]
+        if d and (max_date is None or d > max_date):
+            max_date = d
+
+    # Max keys for sequential generation (player_889 → next is player_890)
+    max_player = watermarks["RAW_PLAYERS"][1]
+    max_session = watermarks["RAW_SESSIONS"][1]
+    max_event = watermarks["RAW_GAME_EVENTS"][1]
+
+    if max_date:
+        start_d = max_date + timedelta(days=1)
+        end_d = start_d + timedelta(days=INCREMENT_DAYS)
+        start_str = start_d.strftime("%Y-%m-%d")
+        end_str = end_d.strftime("%Y-%m-%d")
+    else:
+        start_str = DEFAULT_START
+        end_str = DEFAULT_END
+
+    player_offset = max_player + 1
+    session_offset = max_session + 1
+    event_offset = max_event + 1
+
+    return start_str, end_str, player_offset, session_offset, event_offset
+
+
+def get_next_incremental_params(backend=None):
+    """Query the warehouse (default: WAREHOUSE_BACKEND) for max date and max IDs; return next params."""
+    try:
+        backend = backend or get_backend()
+        conn = session(backend)
     except Exception as e:
         print(f"# Warning: {e}", file=sys.stderr)
         return DEFAULT_START, DEFAULT_END, 1, 1, 0
-    finally:
-        if conn:
-            conn.close()
+
+    # One query against RAW_LOAD_WATERMARKS; scan only the tables it does not cover.
+    # A failed scan of an existing table raises: defaulting its offset would reuse IDs.
+    watermarks = _read_watermarks(backend, conn)
+    for table in ("RAW_PLAYERS", "RAW_SESSIONS", "RAW_GAME_EVENTS"):
+        if table not in watermarks:
+            watermarks[table] = _scan_watermark(backend, conn, table, with_date=table != "RAW_PLAYERS")
+
+    return _params_from_watermarks(watermarks)
+
+
+def plan_from_zone_maps(data_dir: Path = DATA_DIR, fmt: str = None):
+    """Next batch params from the zone maps of data_dir's RAW files (the last batch generated)."""
+    # Imported here: gen.storage loads pandas / pyarrow, which the warehouse lookup does not need
+    from gen.storage import OUTPUT_FORMAT, table_path
+    from gen.zonemap import max_time, read_zone_map
+
+    fmt = fmt or OUTPUT_FORMAT
+    watermarks = {}
+    for table in ("RAW_PLAYERS", "RAW_SESSIONS", "RAW_GAME_EVENTS"):
+        path = table_path(data_dir, table.lower(), fmt)
+        entry = read_zone_map(path)
+        if entry is None:
+            raise FileNotFoundError(f"No up-to-date zone map for {path} (generate with ZONE_MAPS=1)")
+        date_col, key_col = (c.lower() for c in WATERMARK_COLUMNS[table])
+        max_dt = max_time(entry, date_col)
+        # Zone maps of files written before the key columns cover the string IDs
+        ids = entry.get("ids", {})
+        id_bounds = ids.get(key_col) or ids.get(key_col.replace("_key", "_id"))
+        watermarks[table] = (max_dt.date() if max_dt else None, id_bounds[1] if id_bounds else 0)
+    return _params_from_watermarks(watermarks)
 
 
 def main():
-    start, end, player_offset, session_offset, event_offset = get_next_incremental_params()
+    parser = argparse.ArgumentParser(description="Print the next incremental batch params (KEY=value).")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Plan from the zone maps of data/ (gen/zonemap.py) instead of querying the warehouse",
+    )
+    args = parser.parse_args()
+    if args.offline:
+        start, end, player_offset, session_offset, event_offset = plan_from_zone_maps()
+    else:
+        start, end, player_offset, session_offset, event_offset = get_next_incremental_params()
     print(f"INC_START={start}")
     print(f"INC_END={end}")
     print(f"INC_PLAYER_OFFSET={player_offset}")
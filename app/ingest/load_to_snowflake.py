@@ -31,6 +31,15 @@ Usage:
     python load_to_snowflake.py --mode recreate
     python load_to_snowflake.py --mode append
 
+    # Load the three tables in parallel over a small connection pool
+    python load_to_snowflake.py --mode recreate --workers 3
+
+    # Load once, then clone the tables into more schemas (one per environment)
+    python load_to_snowflake.py --mode recreate --fanout-schemas DEV_ALICE,DEV_BOB,CI_1
+
+    # Probe upload settings on each table's first rows, then use the fastest
+    python load_to_snowflake.py --mode recreate --autotune
+
 The script will:
 1. Either create/replace or reuse existing tables in GAME_ANALYTICS.RAW schema,
    depending on the chosen mode.
@@ -42,8 +51,14 @@ Note: The [pandas] extra is REQUIRED for write_pandas() to work properly.
 
 import argparse
 import os
+import queue
 import sys
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 from pathlib import Path
 from typing import Literal
 from dotenv import load_dotenv
@@ -59,6 +74,9 @@ import pandas as pd
 import pandas.core.indexes.range as pd_range
 _ = pd.DataFrame, pd.RangeIndex, pd_range.RangeIndex
 
+# Arrow tables for the LOAD_READER=arrow path
+import pyarrow as pa
+
 # Now import snowflake connector
 import snowflake.connector
 
@@ -73,7 +91,23 @@ except Exception:
     pass
 
 # Import write_pandas - this should work now that pandas is fully loaded
-from snowflake.connector.pandas_tools import write_pandas
+# (the Snowflake backend in ingest/backends.py uses it)
+from snowflake.connector.pandas_tools import write_pandas  # noqa: F401
+
+# Shared RAW file formats (CSV / Arrow IPC) live in gen/storage.py
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from gen.events import PROPERTY_COLUMNS, properties_from_columns
+from gen.storage import (
+    OUTPUT_FORMAT, dataset_partitions, is_dataset, is_partition, iter_table_chunks, read_arrow_table,
+    read_table, table_path,
+)
+from ingest.autotune import LOAD_AUTOTUNE, data_bytes, get_tuner, reset_tuners
+from ingest.checkpoint import LoadCheckpoint
+from ingest.connection import session
+from ingest.manifest import MANIFEST_TABLE, LoadManifest, file_hash, frame_hash
+from ingest.watermarks import WATERMARK_TABLE, Watermark, WatermarkTable
+from ingest import backends
+from ingest.backends import BACKENDS, RAW_LAYOUT, WAREHOUSE_BACKEND, InvalidJSONError, SnowflakeBackend, get_backend
 
 # =====================
 # CONFIG
@@ -87,11 +121,44 @@ SNOWFLAKE_DATABASE = os.getenv("SNOWFLAKE_DATABASE")
 SNOWFLAKE_SCHEMA = os.getenv("SNOWFLAKE_SCHEMA")
 SNOWFLAKE_ROLE = os.getenv("SNOWFLAKE_ROLE")
 
-# File paths
+# Tables loaded in parallel (1 = one after another over a single connection)
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "1"))
+
+# Where the RAW tables go: snowflake (default), duckdb or sqlite (see ingest/backends.py)
+BACKEND = get_backend(WAREHOUSE_BACKEND)
+
+# Who turns the properties JSON text into VARIANT: "client" = json.loads per row
+# before write_pandas, "server" = uploaded as text and parsed with PARSE_JSON
+PROPERTIES_PARSE = os.getenv("PROPERTIES_PARSE", "client")
+
+# How whole RAW files are read: "pandas" (pd.read_csv, dates parsed) or "arrow"
+# (pyarrow.csv on all cores, columns kept as text, uploaded without pandas)
+LOAD_READER = os.getenv("LOAD_READER", "pandas")
+
+# Load the RAW files in chunks of this many rows, checkpointing after each one
+# so a failed load resumes where it stopped (0 = whole file in one write)
+LOAD_CHUNK_ROWS = int(os.getenv("LOAD_CHUNK_ROWS", "0"))
+
+# Chunked loads: threads uploading chunks while the next ones are parsed, and how
+# many parsed chunks may wait for an upload thread (memory ~ threads + depth chunks)
+LOAD_UPLOAD_THREADS = int(os.getenv("LOAD_UPLOAD_THREADS", "1"))
+LOAD_QUEUE_DEPTH = int(os.getenv("LOAD_QUEUE_DEPTH", "2"))
+
+# Batch recorded in RAW_LOAD_MANIFEST next to each loaded file (main.py --batch)
+LOAD_BATCH_ID = os.getenv("LOAD_BATCH_ID")
+
+# Partitions of a Parquet dataset (OUTPUT_FORMAT=parquet) loaded in parallel
+LOAD_PARTITION_WORKERS = int(os.getenv("LOAD_PARTITION_WORKERS", "4"))
+
+# Extra schemas that get a clone of the loaded tables (comma-separated, see fan_out)
+LOAD_FANOUT_SCHEMAS = [s.strip() for s in os.getenv("LOAD_FANOUT_SCHEMAS", "").split(",") if s.strip()]
+LOAD_FANOUT_WORKERS = int(os.getenv("LOAD_FANOUT_WORKERS", "8"))
+
+# File paths (.csv or .arrow, see OUTPUT_FORMAT / --format)
 DATA_DIR = Path(__file__).parent.parent / "data"
-PLAYERS_CSV = DATA_DIR / "raw_players.csv"
-SESSIONS_CSV = DATA_DIR / "raw_sessions.csv"
-GAME_EVENTS_CSV = DATA_DIR / "raw_game_events.csv"
+PLAYERS_FILE = table_path(DATA_DIR, "raw_players")
+SESSIONS_FILE = table_path(DATA_DIR, "raw_sessions")
+GAME_EVENTS_FILE = table_path(DATA_DIR, "raw_game_events")
 
 
 # =====================
@@ -100,6 +167,7 @@ GAME_EVENTS_CSV = DATA_DIR / "raw_game_events.csv"
 RAW_PLAYERS_SCHEMA = """
 CREATE OR REPLACE TABLE {database}.{schema}.RAW_PLAYERS (
     PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
     FIRST_SEEN_AT STRING NOT NULL,
     COUNTRY VARCHAR(10),
     LANGUAGE VARCHAR(10),
@@ -110,7 +178,9 @@ CREATE OR REPLACE TABLE {database}.{schema}.RAW_PLAYERS (
 RAW_SESSIONS_SCHEMA = """
 CREATE OR REPLACE TABLE {database}.{schema}.RAW_SESSIONS (
     SESSION_ID VARCHAR(255) NOT NULL,
+    SESSION_KEY BIGINT NOT NULL,
     PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
     SESSION_START STRING NOT NULL,
     SESSION_END STRING NOT NULL,
     PLATFORM VARCHAR(10)
@@ -120,8 +190,10 @@ CREATE OR REPLACE TABLE {database}.{schema}.RAW_SESSIONS (
 RAW_GAME_EVENTS_SCHEMA = """
 CREATE OR REPLACE TABLE {database}.{schema}.RAW_GAME_EVENTS (
     EVENT_ID VARCHAR(255) NOT NULL,
+    EVENT_KEY BIGINT NOT NULL,
     EVENT_TIME STRING NOT NULL,
     PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
     EVENT_NAME VARCHAR(100) NOT NULL,
     PLATFORM VARCHAR(10),
     GAME_VERSION VARCHAR(20),
@@ -129,6 +201,61 @@ CREATE OR REPLACE TABLE {database}.{schema}.RAW_GAME_EVENTS (
 )
 """
 
+# RAW_LAYOUT=typed: timestamps as TIMESTAMP_NTZ, sessions / events clustered by day
+# and sorted by that key before upload, so date filters (incremental models, the
+# watermark lookup) prune micro-partitions. Chunked loads sort within each chunk.
+TYPED_SCHEMAS = {
+    "RAW_PLAYERS": """
+CREATE OR REPLACE TABLE {database}.{schema}.RAW_PLAYERS (
+    PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
+    FIRST_SEEN_AT TIMESTAMP_NTZ NOT NULL,
+    COUNTRY VARCHAR(10),
+    LANGUAGE VARCHAR(10),
+    DIFFICULTY_SELECTED VARCHAR(20)
+)
+""",
+    "RAW_SESSIONS": """
+CREATE OR REPLACE TABLE {database}.{schema}.RAW_SESSIONS (
+    SESSION_ID VARCHAR(255) NOT NULL,
+    SESSION_KEY BIGINT NOT NULL,
+    PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
+    SESSION_START TIMESTAMP_NTZ NOT NULL,
+    SESSION_END TIMESTAMP_NTZ NOT NULL,
+    PLATFORM VARCHAR(10)
+)
+CLUSTER BY (TO_DATE(SESSION_START))
+""",
+    "RAW_GAME_EVENTS": """
+CREATE OR REPLACE TABLE {database}.{schema}.RAW_GAME_EVENTS (
+    EVENT_ID VARCHAR(255) NOT NULL,
+    EVENT_KEY BIGINT NOT NULL,
+    EVENT_TIME TIMESTAMP_NTZ NOT NULL,
+    PLAYER_ID VARCHAR(255) NOT NULL,
+    PLAYER_KEY BIGINT NOT NULL,
+    EVENT_NAME VARCHAR(100) NOT NULL,
+    PLATFORM VARCHAR(10),
+    GAME_VERSION VARCHAR(20),
+    PROPERTIES VARIANT
+)
+CLUSTER BY (TO_DATE(EVENT_TIME))
+""",
+}
+
+# Column each typed table is clustered (and sorted) by
+CLUSTER_COLUMNS = {
+    "RAW_SESSIONS": "SESSION_START",
+    "RAW_GAME_EVENTS": "EVENT_TIME",
+}
+
+# DDL by table, for loads that create the table outside its loader (see load_partitions)
+RAW_SCHEMAS = {
+    "RAW_PLAYERS": RAW_PLAYERS_SCHEMA,
+    "RAW_SESSIONS": RAW_SESSIONS_SCHEMA,
+    "RAW_GAME_EVENTS": RAW_GAME_EVENTS_SCHEMA,
+}
+
 
 # =====================
 # HELPERS
@@ -138,23 +265,44 @@ LoadMode = Literal["recreate", "append"]
 
 def get_snowflake_connection():
     """Create and return a Snowflake connection."""
-    if not SNOWFLAKE_USER or not SNOWFLAKE_PASSWORD:
-        raise ValueError(
-            "SNOWFLAKE_USER and SNOWFLAKE_PASSWORD environment variables must be set"
-        )
-    
-    conn_params = {
-        "user": SNOWFLAKE_USER,
-        "password": SNOWFLAKE_PASSWORD,
-        "account": SNOWFLAKE_ACCOUNT,
-        "warehouse": SNOWFLAKE_WAREHOUSE,
-        "database": SNOWFLAKE_DATABASE,
-        "schema": SNOWFLAKE_SCHEMA,
-    }
-    if SNOWFLAKE_ROLE:
-        conn_params["role"] = SNOWFLAKE_ROLE
-    conn = snowflake.connector.connect(**conn_params)
-    return conn
+    return SnowflakeBackend(SNOWFLAKE_DATABASE, SNOWFLAKE_SCHEMA).connect()
+
+
+class ConnectionPool:
+    """
+    At most `size` warehouse connections, opened on first use and reused.
+
+    Usage:
+        pool = ConnectionPool(3)
+        with pool.connection() as conn:
+            load_players(conn, mode)
+        pool.close()
+    """
+
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = BACKEND.connect()
+                with self._lock:
+                    self._opened.append(conn)
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        for conn in self._opened:
+            conn.close()
+        self._opened = []
 
 
 def create_table(conn, schema_sql: str, table_name: str, mode: LoadMode):
@@ -168,19 +316,66 @@ def create_table(conn, schema_sql: str, table_name: str, mode: LoadMode):
         # In append mode we never touch table DDL here.
         return
 
+    if RAW_LAYOUT == "typed":
+        schema_sql = TYPED_SCHEMAS.get(table_name, schema_sql)
+
     print(f"Creating/replacing table: {table_name}...")
-    cursor = conn.cursor()
     try:
-        cursor.execute(schema_sql.format(
-            database=SNOWFLAKE_DATABASE,
-            schema=SNOWFLAKE_SCHEMA
-        ))
+        BACKEND.create_table(conn, schema_sql, table_name)
         print(f"✅ Table {table_name} created successfully")
     except Exception as e:
         print(f"❌ Error creating table {table_name}: {e}")
         raise
-    finally:
-        cursor.close()
+
+
+def sort_for_layout(data, table_name: str):
+    """RAW_LAYOUT=typed: sort a DataFrame or Arrow table (upper-case columns) by the table's cluster column."""
+    column = CLUSTER_COLUMNS.get(table_name)
+    if RAW_LAYOUT != "typed" or column is None:
+        return data
+    if isinstance(data, pa.Table):
+        return data.sort_by(column)
+    return data.sort_values(column, kind="stable", ignore_index=True)
+
+
+def write_rows(conn, data, table_name: str, overwrite: bool, json_columns: list = None, split: bool = True) -> int:
+    """
+    Bulk write a DataFrame or Arrow table (upper-case columns) with the backend.
+
+    With LOAD_AUTOTUNE on a backend with tunable uploads (Snowflake) the write goes
+    through the table's UploadTuner (see ingest/autotune.py): the first rows are
+    probes with different write_pandas / PUT settings, the rest uses the fastest.
+    split=False keeps data in one write (a chunk of a checkpointed load).
+    """
+    def write(piece, first: bool, upload: dict) -> int:
+        replace = overwrite and first
+        if json_columns:
+            return BACKEND.write_frame_json(conn, piece, table_name, json_columns, overwrite=replace, upload=upload)
+        if isinstance(piece, pa.Table):
+            return BACKEND.write_arrow(conn, piece, table_name, overwrite=replace, upload=upload)
+        return BACKEND.write_frame(conn, piece, table_name, overwrite=replace, upload=upload)
+
+    if not (LOAD_AUTOTUNE and BACKEND.tunable_upload) or len(data) == 0:
+        return write(data, True, None)
+
+    tuner = get_tuner(table_name)
+    nrows = 0
+    for index, (piece, upload, candidate) in enumerate(tuner.plan(data, split)):
+        started = time.perf_counter()
+        nrows += write(piece, index == 0, upload)
+        tuner.record(candidate, len(piece), data_bytes(piece), time.perf_counter() - started)
+    return nrows
+
+
+def report_invalid_json(e: InvalidJSONError, mode: LoadMode) -> None:
+    """Print an InvalidJSONError, saying what RECREATE already did to the table."""
+    print(f"❌ Error loading data into {e.table_name}: {e}")
+    if mode == "recreate":
+        print(
+            f"   {e.table_name} was already recreated before the JSON was checked: it only holds "
+            "the rows loaded before this batch (none for a single-batch load).\n"
+            "   Fix the data and run --mode recreate again."
+        )
 
 
 def load_dataframe_to_snowflake(
@@ -188,6 +383,9 @@ def load_dataframe_to_snowflake(
     df: pd.DataFrame,
     table_name: str,
     mode: LoadMode,
+    json_columns: list = None,
+    watermark: Watermark = None,
+    split: bool = True,
 ):
     """
     Load a pandas DataFrame into Snowflake.
@@ -197,6 +395,10 @@ def load_dataframe_to_snowflake(
         df: DataFrame to load
         table_name: Target table name
         mode: "recreate" (overwrite table contents) or "append" (add new rows)
+        json_columns: columns holding JSON text that the warehouse should parse
+            into VARIANT (staged, validated and converted set-based)
+        watermark: updated with the max date / ID of the written rows
+        split: see write_rows (False for the chunks of a chunked load)
     """
     print(f"\nLoading {len(df)} rows into {table_name}...")
     
@@ -206,22 +408,20 @@ def load_dataframe_to_snowflake(
             df = df.reset_index(drop=True)
 
         df.columns = [c.upper() for c in df.columns]
+        df = sort_for_layout(df, table_name)
 
-        success, nchunks, nrows, _ = write_pandas(
-            conn=conn,
-            df=df,
-            table_name=table_name,
-            database=SNOWFLAKE_DATABASE,
-            schema=SNOWFLAKE_SCHEMA,
-            auto_create_table=False,
-            overwrite=(mode == "recreate"),
+        nrows = write_rows(
+            conn, df, table_name, mode == "recreate",
+            json_columns=[c.upper() for c in json_columns] if json_columns else None, split=split,
         )
-        
-        if success:
-            print(f"✅ Successfully loaded {nrows} rows into {table_name}")
-        else:
-            print(f"❌ Failed to load data into {table_name}")
-            
+        if watermark is not None:
+            watermark.update(df)
+        print(f"✅ Successfully loaded {nrows} rows into {table_name}")
+        return nrows
+
+    except InvalidJSONError as e:
+        report_invalid_json(e, mode)
+        raise
     except snowflake.connector.errors.ProgrammingError as e:
         # Common failure when tables do not exist in append mode
         if "does not exist" in str(e) and mode == "append":
@@ -248,56 +448,154 @@ def load_dataframe_to_snowflake(
         raise
 
 
-def load_players(conn, mode: LoadMode):
-    """Load players data."""
+def load_arrow_to_snowflake(
+    conn,
+    table: pa.Table,
+    table_name: str,
+    mode: LoadMode,
+    json_columns: list = None,
+    watermark: Watermark = None,
+) -> int:
+    """
+    Load an Arrow table (see gen.storage.read_arrow_table) without converting it to pandas.
+
+    json_columns are uploaded as text and parsed by the warehouse (see
+    load_dataframe_to_snowflake); the other columns are loaded as they are.
+    """
+    print(f"\nLoading {table.num_rows} rows into {table_name} (Arrow)...")
+    table = sort_for_layout(table.rename_columns([c.upper() for c in table.column_names]), table_name)
+    try:
+        nrows = write_rows(
+            conn, table, table_name, mode == "recreate",
+            json_columns=[c.upper() for c in json_columns] if json_columns else None,
+        )
+    except InvalidJSONError as e:
+        report_invalid_json(e, mode)
+        raise
+    except Exception as e:
+        print(f"❌ Error loading data into {table_name}: {e}")
+        raise
+    if watermark is not None:
+        watermark.update(table)
+    print(f"✅ Successfully loaded {nrows} rows into {table_name}")
+    return nrows
+
+
+def load_players(
+    conn, mode: LoadMode, df: pd.DataFrame = None, path: Path = PLAYERS_FILE, watermark: Watermark = None,
+):
+    """Load players data (from data/raw_players.* unless an in-memory frame is given)."""
     print("\n" + "="*60)
     print("Loading RAW_PLAYERS")
     print("="*60)
     
+    if df is None and LOAD_CHUNK_ROWS > 0 and not is_partition(path):
+        return load_table_chunked(
+            conn, mode, "RAW_PLAYERS", RAW_PLAYERS_SCHEMA, path, LOAD_CHUNK_ROWS,
+            parse_dates=["first_seen_at"], watermark=watermark,
+        )
+
     # Create or reuse table depending on mode
     create_table(conn, RAW_PLAYERS_SCHEMA, "RAW_PLAYERS", mode)
     
     # Load data
-    df = pd.read_csv(PLAYERS_CSV, parse_dates=["first_seen_at"])
+    if df is None and LOAD_READER == "arrow":
+        return load_arrow_to_snowflake(conn, read_arrow_table(path), "RAW_PLAYERS", mode, watermark=watermark)
+    if df is None:
+        df = read_table(path, parse_dates=["first_seen_at"])
 
-    load_dataframe_to_snowflake(conn, df, "RAW_PLAYERS", mode)
+    return load_dataframe_to_snowflake(conn, df, "RAW_PLAYERS", mode, watermark=watermark)
 
 
-def load_sessions(conn, mode: LoadMode):
-    """Load sessions data."""
+def load_sessions(
+    conn, mode: LoadMode, df: pd.DataFrame = None, path: Path = SESSIONS_FILE, watermark: Watermark = None,
+):
+    """Load sessions data (from data/raw_sessions.* unless an in-memory frame is given)."""
     print("\n" + "="*60)
     print("Loading RAW_SESSIONS")
     print("="*60)
     
+    if df is None and LOAD_CHUNK_ROWS > 0 and not is_partition(path):
+        return load_table_chunked(
+            conn, mode, "RAW_SESSIONS", RAW_SESSIONS_SCHEMA, path, LOAD_CHUNK_ROWS,
+            parse_dates=["session_start", "session_end"], watermark=watermark,
+        )
+
     # Create or reuse table depending on mode
     create_table(conn, RAW_SESSIONS_SCHEMA, "RAW_SESSIONS", mode)
     
     # Load data
-    df = pd.read_csv(
-        SESSIONS_CSV,
-        parse_dates=["session_start", "session_end"]
-    )
-    load_dataframe_to_snowflake(conn, df, "RAW_SESSIONS", mode)
+    if df is None and LOAD_READER == "arrow":
+        return load_arrow_to_snowflake(conn, read_arrow_table(path), "RAW_SESSIONS", mode, watermark=watermark)
+    if df is None:
+        df = read_table(
+            path,
+            parse_dates=["session_start", "session_end"]
+        )
+    return load_dataframe_to_snowflake(conn, df, "RAW_SESSIONS", mode, watermark=watermark)
 
 
-def load_game_events(conn, mode: LoadMode):
-    """Load game events data."""
+def load_game_events(
+    conn, mode: LoadMode, df: pd.DataFrame = None, path: Path = GAME_EVENTS_FILE, watermark: Watermark = None,
+):
+    """Load game events data (from data/raw_game_events.* unless an in-memory frame is given)."""
     print("\n" + "="*60)
     print("Loading RAW_GAME_EVENTS")
     print("="*60)
+
+    if df is None and LOAD_CHUNK_ROWS > 0 and not is_partition(path):
+        return load_table_chunked(
+            conn, mode, "RAW_GAME_EVENTS", RAW_GAME_EVENTS_SCHEMA, path, LOAD_CHUNK_ROWS,
+            parse_dates=["event_time"], prepare=prepare_game_events, watermark=watermark,
+        )
     
     # Create or reuse table depending on mode
     create_table(conn, RAW_GAME_EVENTS_SCHEMA, "RAW_GAME_EVENTS", mode)
     
     # Load data
-    df = pd.read_csv(
-        GAME_EVENTS_CSV,
-        parse_dates=["event_time"]
+    if df is None and LOAD_READER == "arrow":
+        table = read_arrow_table(path)
+        if not any(c in PROPERTY_COLUMNS for c in table.column_names):
+            # The warehouse parses the properties JSON text (as with PROPERTIES_PARSE=server)
+            return load_arrow_to_snowflake(
+                conn, table, "RAW_GAME_EVENTS", mode, json_columns=["properties"], watermark=watermark
+            )
+        # PROPERTIES_FORMAT=columns: the VARIANT is rebuilt in pandas below
+        df = table.to_pandas()
+    if df is None:
+        df = read_table(
+            path,
+            parse_dates=["event_time"]
+        )
+
+    df, json_columns = prepare_game_events(df)
+    return load_dataframe_to_snowflake(
+        conn, df, "RAW_GAME_EVENTS", mode, json_columns=json_columns, watermark=watermark
     )
-    
+
+
+def prepare_game_events(df: pd.DataFrame):
+    """
+    Get the properties column ready for the VARIANT load.
+
+    Returns (df, json_columns): json_columns lists the columns the warehouse should
+    parse itself (PROPERTIES_PARSE=server), otherwise it is None.
+    """
+    # PROPERTIES_FORMAT=columns: rebuild the VARIANT dicts from the typed
+    # prop_<key> columns (no JSON to parse)
+    prop_columns = [c for c in PROPERTY_COLUMNS if c in df.columns]
+    if prop_columns:
+        df = df.drop(columns=prop_columns).assign(properties=properties_from_columns(df))
+
+    # PROPERTIES_PARSE=server: ship the JSON text unchanged, the warehouse parses it
+    # in bulk and reports invalid rows instead of loading them as {}
+    elif "properties" in df.columns and PROPERTIES_PARSE == "server":
+        return df, ["properties"]
+
     # For VARIANT type, convert JSON string to dict/object
     # Snowflake's write_pandas expects Python objects for VARIANT columns
-    if "properties" in df.columns:
+    # (the local backends store the JSON text as is)
+    elif "properties" in df.columns and BACKEND.variant_objects:
         def parse_properties(x):
             if pd.isna(x) or x == "":
                 return {}
@@ -309,8 +607,182 @@ def load_game_events(conn, mode: LoadMode):
             return x if isinstance(x, dict) else {}
         
         df["properties"] = df["properties"].apply(parse_properties)
-    
-    load_dataframe_to_snowflake(conn, df, "RAW_GAME_EVENTS", mode)
+
+    return df, None
+
+
+def load_table_chunked(
+    conn,
+    mode: LoadMode,
+    table_name: str,
+    schema_sql: str,
+    path: Path,
+    chunk_rows: int,
+    parse_dates: list,
+    prepare=None,
+    watermark: Watermark = None,
+):
+    """
+    Load one RAW file chunk by chunk with a local checkpoint (see ingest/checkpoint.py).
+
+    Each chunk is one write (one COPY on Snowflake), and the checkpoint is written after
+    it commits. A rerun with the same file, chunk size and warehouse skips the chunks
+    already loaded (without parsing them again, also those committed out of order)
+    instead of starting over, and skips the table entirely if it finished. The table
+    is only created / replaced on a fresh start, never when resuming. run_load() removes the checkpoints once every table
+    is loaded.
+
+    With LOAD_UPLOAD_THREADS > 1 chunks are parsed here and uploaded by a thread pool
+    (see _upload_pipelined), so they may commit out of order: rows_done / chunks_done
+    is the contiguous prefix, "committed" lists the chunks committed beyond it.
+
+    A crash between a chunk's commit and its checkpoint write is detected from the table
+    row count, so that chunk is not loaded twice (as long as nothing else writes to the
+    table meanwhile and only one chunk was in flight).
+
+    prepare: optional df -> (df, json_columns) applied to every chunk
+    watermark: updated chunk by chunk; its state is checkpointed with the progress
+    """
+    checkpoint = LoadCheckpoint(table_name, path, chunk_rows, BACKEND.describe())
+    state = checkpoint.load()
+    watermark = watermark if watermark is not None else Watermark(table_name)
+    if state is not None:
+        watermark.restore(state.get("watermark"))
+
+    if state is None:
+        create_table(conn, schema_sql, table_name, mode)
+        base_rows = 0 if mode == "recreate" else BACKEND.row_count(conn, table_name)
+        rows_done = chunks_done = 0
+        committed = {}
+    elif state["complete"]:
+        print(f"✅ {table_name} already loaded by the interrupted run ({state['rows_done']:,} rows), skipping")
+        return state["rows_done"]
+    else:
+        mode = state["mode"]
+        base_rows, rows_done, chunks_done = state["base_rows"], state["rows_done"], state["chunks_done"]
+        committed = {int(index): nrows for index, nrows in state.get("committed", {}).items()}
+        surplus = BACKEND.row_count(conn, table_name) - base_rows - rows_done - sum(committed.values())
+        if surplus > 0 and not committed and surplus <= chunk_rows:
+            # Last chunk committed but its checkpoint was not written
+            print(f"   {surplus:,} rows beyond the checkpoint are already in {table_name}")
+            committed[chunks_done] = surplus
+        elif surplus > 0:
+            print(
+                f"⚠️  {surplus:,} rows in {table_name} are not in the checkpoint (several uploads were "
+                "in flight); their chunks will be loaded again, check for duplicate IDs"
+            )
+        print(f"↩️  Resuming {table_name} after chunk {chunks_done} ({rows_done:,} rows already loaded)")
+
+    progress = {"rows_done": rows_done, "chunks_done": chunks_done}
+    lock = threading.Lock()
+
+    def save(complete=False):
+        checkpoint.save(
+            mode=mode, base_rows=base_rows, complete=complete, watermark=watermark.state(),
+            committed={str(index): nrows for index, nrows in committed.items()}, **progress,
+        )
+
+    def commit(index: int, nrows: int):
+        """Record a committed chunk and advance the contiguous prefix."""
+        with lock:
+            committed[index] = nrows
+            while progress["chunks_done"] in committed:
+                progress["rows_done"] += committed.pop(progress["chunks_done"])
+                progress["chunks_done"] += 1
+            save()
+            print(f"💾 Checkpoint: chunk {index + 1} committed ({progress['rows_done']:,} rows contiguous)")
+
+    save()
+    chunks = _pending_chunks(path, chunk_rows, parse_dates, chunks_done, set(committed))
+
+    def upload(conn, index: int, df: pd.DataFrame) -> int:
+        json_columns = None
+        if prepare is not None:
+            df, json_columns = prepare(df)
+        # The table was created / replaced above; every chunk appends to it
+        return load_dataframe_to_snowflake(
+            conn, df, table_name, "append", json_columns=json_columns, watermark=watermark, split=False
+        )
+
+    if LOAD_UPLOAD_THREADS > 1:
+        _upload_pipelined(chunks, upload, commit, LOAD_UPLOAD_THREADS, LOAD_QUEUE_DEPTH)
+    else:
+        for index, df in chunks:
+            commit(index, upload(conn, index, df))
+
+    save(complete=True)
+    print(f"✅ {table_name}: {progress['rows_done']:,} rows loaded in {progress['chunks_done']} chunks")
+    return progress["rows_done"]
+
+
+def _pending_chunks(path: Path, chunk_rows: int, parse_dates: list, first: int, skip: set):
+    """
+    (index, df) of the chunks of path from chunk first on, except those in skip.
+
+    Chunk i covers data rows [i * chunk_rows, (i + 1) * chunk_rows). Each run of chunks
+    to load is read from its first row, so skipped chunks are never parsed.
+    """
+    index = first
+    while True:
+        while index in skip:
+            index += 1
+        stop = min((i for i in skip if i > index), default=None)
+        reader = iter_table_chunks(path, chunk_rows, parse_dates=parse_dates, start_row=index * chunk_rows)
+        for df in islice(reader, None if stop is None else stop - index):
+            if len(df) == 0:
+                return  # started past the end of the file
+            yield index, df
+            index += 1
+        if index != stop:
+            return  # end of the file
+
+
+def _upload_pipelined(chunks, upload, commit, threads: int, queue_depth: int):
+    """
+    Producer / consumer chunk load: this thread reads (parses) chunks into a bounded
+    queue, `threads` upload threads take them off it, each with its own pooled
+    connection, so parsing the next chunk overlaps with the uploads of the previous ones.
+    At most threads + queue_depth parsed chunks are in memory. The first upload error
+    stops the producer and is re-raised once the threads have finished.
+    """
+    pending = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    errors = []
+    pool = ConnectionPool(threads)
+
+    def consume():
+        with pool.connection() as conn:
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                if stop.is_set():
+                    continue  # drain after an error so the producer never blocks
+                index, df = item
+                try:
+                    commit(index, upload(conn, index, df))
+                except Exception as e:
+                    errors.append(e)
+                    stop.set()
+
+    print(f"   Pipelined load: {threads} upload threads, queue depth {queue_depth}")
+    workers = [threading.Thread(target=consume, daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    try:
+        for item in chunks:
+            if stop.is_set():
+                break
+            pending.put(item)
+    finally:
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+        pool.close()
+
+    if errors:
+        raise errors[0]
 
 
 def _prompt_load_mode() -> LoadMode:
@@ -347,7 +819,7 @@ def _prompt_load_mode() -> LoadMode:
 def main():
     """Main function to load all data into Snowflake."""
     parser = argparse.ArgumentParser(
-        description="Load CSV data into Snowflake RAW_* tables."
+        description="Load CSV / Arrow data into Snowflake RAW_* tables."
     )
     parser.add_argument(
         "--mode",
@@ -359,40 +831,225 @@ def main():
             "If omitted, you will be prompted interactively."
         ),
     )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "arrow", "parquet"],
+        default=OUTPUT_FORMAT,
+        help="Format of the data/ files to load (default: OUTPUT_FORMAT env or csv).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=LOAD_WORKERS,
+        help="Load up to N tables in parallel, one pooled connection each (default: LOAD_WORKERS env or 1).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=sorted(BACKENDS),
+        default=None,
+        help="Warehouse to load into (default: WAREHOUSE_BACKEND env or snowflake). "
+        "duckdb / sqlite write a local file, no credentials needed.",
+    )
+    parser.add_argument(
+        "--parse-json",
+        choices=["client", "server"],
+        default=None,
+        help="Where properties JSON becomes VARIANT: 'client' (json.loads per row, default) "
+        "or 'server' (upload the text, PARSE_JSON in one INSERT ... SELECT).",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=["string", "typed"],
+        default=None,
+        help="RAW table layout (default: RAW_LAYOUT env or string). 'typed' creates TIMESTAMP_NTZ "
+        "columns, clusters RAW_SESSIONS / RAW_GAME_EVENTS by date and sorts rows by it before "
+        "upload. Use it with --mode recreate and keep it for later appends.",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=["pandas", "arrow"],
+        default=None,
+        help="How whole RAW files are read (default: LOAD_READER env or pandas). 'arrow' parses "
+        "CSV with pyarrow on all cores, keeps timestamps as text and uploads the Arrow table "
+        "without pandas (properties JSON is parsed by the warehouse). Chunked loads use pandas.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Load each RAW file in chunks of N rows with a resumable checkpoint "
+        "in data/.checkpoints/ (default: LOAD_CHUNK_ROWS env or 0 = one write).",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore existing chunk checkpoints and load every table from the start.",
+    )
+    parser.add_argument(
+        "--upload-threads",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Chunked load: upload N chunks concurrently while the next ones are parsed "
+        "(default: LOAD_UPLOAD_THREADS env or 1). Needs --chunk-rows.",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Chunked load: parsed chunks that may wait for an upload thread (default: LOAD_QUEUE_DEPTH env or 2).",
+    )
+    parser.add_argument(
+        "--batch-id",
+        default=LOAD_BATCH_ID,
+        help=f"Batch recorded in {MANIFEST_TABLE} for the loaded files (default: LOAD_BATCH_ID env).",
+    )
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help="Probe Parquet compression / PUT parallelism on each table's first rows and upload the rest "
+        "with the fastest settings, printed per table (default: LOAD_AUTOTUNE env; Snowflake only).",
+    )
+    parser.add_argument(
+        "--fanout-schemas",
+        default=None,
+        help="Comma-separated schemas that get a clone of the loaded tables after the load "
+        "(default: LOAD_FANOUT_SCHEMAS env; see fan_out).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=f"Append files even if {MANIFEST_TABLE} says the same content was already loaded.",
+    )
     args = parser.parse_args()
 
+    global LOAD_CHUNK_ROWS, LOAD_UPLOAD_THREADS, LOAD_QUEUE_DEPTH, PROPERTIES_PARSE, LOAD_READER, LOAD_AUTOTUNE
+    if args.chunk_rows is not None:
+        LOAD_CHUNK_ROWS = args.chunk_rows
+    if args.upload_threads:
+        LOAD_UPLOAD_THREADS = args.upload_threads
+    if args.queue_depth:
+        LOAD_QUEUE_DEPTH = args.queue_depth
+    if LOAD_UPLOAD_THREADS > 1 and LOAD_CHUNK_ROWS <= 0:
+        parser.error("--upload-threads needs --chunk-rows (the pipeline uploads chunks)")
+    if args.restart:
+        LoadCheckpoint.clear_all()
+    if args.parse_json:
+        PROPERTIES_PARSE = args.parse_json
+    if args.reader:
+        LOAD_READER = args.reader
+    if args.autotune:
+        LOAD_AUTOTUNE = True
+    if args.layout:
+        set_layout(args.layout)
+    if args.backend:
+        set_backend(args.backend)
     mode: LoadMode = args.mode or _prompt_load_mode()
+    fanout_schemas = None
+    if args.fanout_schemas is not None:
+        fanout_schemas = [s.strip() for s in args.fanout_schemas.split(",") if s.strip()]
+    run_load(
+        mode, fmt=args.format, workers=args.workers, batch_id=args.batch_id, force=args.force,
+        fanout_schemas=fanout_schemas,
+    )
+
+
+def set_layout(name: str):
+    """Switch the RAW table layout ("string" or "typed", see TYPED_SCHEMAS) here and in ingest/backends.py."""
+    global RAW_LAYOUT
+    RAW_LAYOUT = name
+    backends.RAW_LAYOUT = name
+
+
+def set_backend(name: str):
+    """Switch the warehouse backend used by this module (snowflake, duckdb or sqlite)."""
+    global BACKEND
+    BACKEND = get_backend(name)
+
+
+def run_load(
+    mode: LoadMode,
+    frames: dict = None,
+    fmt: str = OUTPUT_FORMAT,
+    workers: int = LOAD_WORKERS,
+    batch_id: str = LOAD_BATCH_ID,
+    force: bool = False,
+    fanout_schemas: list = None,
+):
+    """
+    Connect and load RAW_PLAYERS, RAW_SESSIONS and RAW_GAME_EVENTS.
+
+    frames: optional in-memory frames keyed by table ("raw_players", "raw_sessions",
+    "raw_game_events"), e.g. from gen.pipeline.run_pipeline(); tables missing from it
+    are read from data/ as usual.
+    fmt: "csv" or "arrow"; Arrow IPC files are opened memory-mapped instead of parsed.
+    workers: > 1 loads the tables concurrently (see load_tables_concurrently).
+    batch_id / force: see load_table_once (RAW_LOAD_MANIFEST).
+    fanout_schemas: schemas that get a clone of the loaded tables afterwards (see
+    fan_out; default LOAD_FANOUT_SCHEMAS).
+    """
+    frames = frames or {}
+    if fanout_schemas is None:
+        fanout_schemas = LOAD_FANOUT_SCHEMAS
+    if fanout_schemas:
+        BACKEND.default_schema()  # fail before loading if the backend has no schemas
+    reset_tuners()
 
     print("\n" + "="*60)
     print("🚀 Starting Snowflake Data Load")
     print("="*60)
-    print(f"Database: {SNOWFLAKE_DATABASE}")
-    print(f"Schema: {SNOWFLAKE_SCHEMA}")
-    print(f"Account: {SNOWFLAKE_ACCOUNT}")
+    if BACKEND.name == "snowflake":
+        print(f"Database: {SNOWFLAKE_DATABASE}")
+        print(f"Schema: {SNOWFLAKE_SCHEMA}")
+        print(f"Account: {SNOWFLAKE_ACCOUNT}")
+    else:
+        print(f"Warehouse: {BACKEND.describe()}")
     print(f"Load mode: {mode.upper()}")
+    if LOAD_AUTOTUNE:
+        print("Upload autotune: on" if BACKEND.tunable_upload else f"Upload autotune: nothing to tune on {BACKEND.name}")
     print("="*60)
     
     # Verify files exist
-    for file_path, name in [
-        (PLAYERS_CSV, "raw_players.csv"),
-        (SESSIONS_CSV, "raw_sessions.csv"),
-        (GAME_EVENTS_CSV, "raw_game_events.csv"),
-    ]:
+    files = {
+        table: table_path(DATA_DIR, table, fmt)
+        for table in ("raw_players", "raw_sessions", "raw_game_events")
+    }
+    for table, file_path in files.items():
+        if table in frames:
+            print(f"✅ Using in-memory {table}")
+            continue
 
         if not file_path.exists():
             raise FileNotFoundError(f"❌ File not found: {file_path}")
-        print(f"✅ Found {name}")
+        print(f"✅ Found {file_path.name}")
     
-    # Connect to Snowflake
-    print("\nConnecting to Snowflake...")
-    conn = get_snowflake_connection()
+    if workers > 1:
+        load_tables_concurrently(mode, frames, files, workers, batch_id, force)
+        fan_out(fanout_schemas)
+        return
+
+    # Connect to Snowflake (or the local backend); the session is shared with an
+    # earlier watermark lookup in this process and closed at exit
+    print(f"\nConnecting to {BACKEND.describe()}...")
+    conn = session(BACKEND)
     print("✅ Connected successfully")
     
     try:
-        # Load each table
-        load_players(conn, mode)
-        load_sessions(conn, mode)
-        load_game_events(conn, mode)
+        # Load each table (files already listed in RAW_LOAD_MANIFEST are skipped in append mode)
+        LoadManifest(BACKEND).ensure(conn)
+        WatermarkTable(BACKEND).ensure(conn)
+        for table_name, loader, table in (
+            ("RAW_PLAYERS", load_players, "raw_players"),
+            ("RAW_SESSIONS", load_sessions, "raw_sessions"),
+            ("RAW_GAME_EVENTS", load_game_events, "raw_game_events"),
+        ):
+            load_table_once(
+                conn, mode, table_name, loader, frames.get(table), files[table], batch_id, force
+            )
+        LoadCheckpoint.clear_all()
+        print_row_counts(conn)
         
         print("\n" + "="*60)
         print("✨ All data loaded successfully!")
@@ -401,9 +1058,283 @@ def main():
     except Exception as e:
         print(f"\n❌ Error during data load: {e}")
         raise
+
+    fan_out(fanout_schemas)
+
+
+def load_table_once(
+    conn,
+    mode: LoadMode,
+    table_name: str,
+    loader,
+    df: pd.DataFrame,
+    path: Path,
+    batch_id: str = LOAD_BATCH_ID,
+    force: bool = False,
+) -> int:
+    """
+    Run loader(conn, mode, df, path) and record the load in RAW_LOAD_MANIFEST and
+    RAW_LOAD_WATERMARKS (see ingest/watermarks.py).
+
+    In append mode, a file (or in-memory frame) whose content hash is already in the
+    manifest for table_name is skipped without being read or uploaded, unless force.
+    Recreate replaces the table, so its earlier manifest and watermark rows are dropped.
+    A partitioned Parquet dataset is loaded by load_partitions.
+    """
+    if df is None and is_dataset(path):
+        return load_partitions(conn, mode, table_name, loader, path, batch_id, force)
+
+    manifest = LoadManifest(BACKEND)
+    source = "<in-memory frame>" if df is not None else str(path)
+    content_hash = frame_hash(df) if df is not None else file_hash(path)
+
+    if mode == "append" and not force:
+        previous = manifest.find(conn, table_name, content_hash)
+        if previous is not None:
+            rows, previous_batch, loaded_at = previous
+            print(
+                f"\n⏭  {table_name}: {Path(source).name} already loaded "
+                f"({rows:,} rows, batch {previous_batch}, {loaded_at}) - skipping"
+            )
+            return 0
+
+    watermarks = WatermarkTable(BACKEND)
+    watermark = _starting_watermark(conn, mode, table_name)
+
+    rows = loader(conn, mode, df, path, watermark=watermark)
+    if LOAD_AUTOTUNE and BACKEND.tunable_upload:
+        print("\n".join(get_tuner(table_name).report()))
+    if mode == "recreate":
+        manifest.reset(conn, table_name)
+        watermarks.reset(conn, table_name)
+    manifest.record(conn, table_name, content_hash, source, rows, batch_id, mode)
+    watermarks.upsert(conn, table_name, batch_id, watermark)
+    return rows
+
+
+def _starting_watermark(conn, mode: LoadMode, table_name: str) -> Watermark:
+    watermark = Watermark(table_name)
+    if mode == "append" and not WatermarkTable(BACKEND).has(conn, table_name):
+        # Rows loaded before RAW_LOAD_WATERMARKS existed: scan them once
+        try:
+            watermark = WatermarkTable(BACKEND).scan(conn, table_name)
+        except Exception:
+            pass
+    return watermark
+
+
+def load_partitions(
+    conn,
+    mode: LoadMode,
+    table_name: str,
+    loader,
+    path: Path,
+    batch_id: str = LOAD_BATCH_ID,
+    force: bool = False,
+    workers: int = LOAD_PARTITION_WORKERS,
+) -> int:
+    """
+    Load a date-partitioned Parquet dataset (see gen/storage.py) one partition per write.
+
+    Every partition is recorded in RAW_LOAD_MANIFEST as a file of its own, so in append
+    mode the partitions already loaded are skipped: a dataset that a --batch 2 run
+    extended loads only its new days, and a failed load resumes with the partitions
+    that are missing. Recreate replaces the table first. Up to `workers` partitions
+    load at once, over pooled connections; the watermark is upserted for whatever
+    loaded, then the first error is re-raised.
+    """
+    manifest, watermarks = LoadManifest(BACKEND), WatermarkTable(BACKEND)
+    partitions = dataset_partitions(path)
+    if mode == "recreate":
+        create_table(conn, RAW_SCHEMAS[table_name], table_name, mode)
+        manifest.reset(conn, table_name)
+        watermarks.reset(conn, table_name)
+
+    pending = []
+    for day, partition in partitions.items():
+        content_hash = file_hash(partition)
+        if mode == "append" and not force and manifest.find(conn, table_name, content_hash):
+            continue
+        pending.append((partition, content_hash))
+    print(
+        f"\n📂 {table_name}: {len(pending)} of {len(partitions)} partitions of {path.name} to load "
+        f"({len(partitions) - len(pending)} already loaded)"
+    )
+
+    watermark = _starting_watermark(conn, mode, table_name)
+    pool = ConnectionPool(workers) if workers > 1 else None
+
+    def load(partition: Path, content_hash: str) -> int:
+        with (pool.connection() if pool else nullcontext(conn)) as c:
+            # The table exists (created above in recreate mode): every partition appends
+            rows = loader(c, "append", None, partition, watermark=watermark)
+            manifest.record(c, table_name, content_hash, str(partition), rows, batch_id, mode)
+            return rows
+
+    total, errors = 0, []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(load, *item) for item in pending]
+            for future in futures:
+                try:
+                    total += future.result()
+                except Exception as e:
+                    errors.append(e)
     finally:
-        conn.close()
-        print("\nConnection closed")
+        if pool:
+            pool.close()
+
+    watermarks.upsert(conn, table_name, batch_id, watermark)
+    if errors:
+        print(f"❌ {len(errors)} of {len(pending)} partitions of {table_name} failed to load")
+        raise errors[0]
+    print(f"✅ {table_name}: {total:,} rows loaded from {len(pending)} partitions")
+    return total
+
+
+def print_row_counts(conn):
+    """Print the row count of each RAW table after the load."""
+    print()
+    for table_name in ("RAW_PLAYERS", "RAW_SESSIONS", "RAW_GAME_EVENTS"):
+        print(f"   {table_name}: {BACKEND.row_count(conn, table_name):,} rows")
+
+
+def load_tables_concurrently(
+    mode: LoadMode,
+    frames: dict,
+    files: dict,
+    workers: int,
+    batch_id: str = LOAD_BATCH_ID,
+    force: bool = False,
+):
+    """
+    Load RAW_PLAYERS, RAW_SESSIONS and RAW_GAME_EVENTS in parallel threads.
+
+    Each table gets a connection from a ConnectionPool of `workers` connections, so
+    the small tables load while the events file is still being read. A failing table
+    does not stop the others; a summary is printed and the first error is re-raised
+    at the end.
+    """
+    # Largest table first so it starts as early as possible
+    loaders = [
+        ("RAW_GAME_EVENTS", load_game_events, "raw_game_events"),
+        ("RAW_PLAYERS", load_players, "raw_players"),
+        ("RAW_SESSIONS", load_sessions, "raw_sessions"),
+    ]
+    pool = ConnectionPool(workers)
+    with pool.connection() as conn:
+        LoadManifest(BACKEND).ensure(conn)
+        WatermarkTable(BACKEND).ensure(conn)
+
+    def load(table_name, loader, table):
+        started = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                rows = load_table_once(
+                    conn, mode, table_name, loader, frames.get(table), files[table], batch_id, force
+                )
+            return table_name, rows, time.perf_counter() - started, None
+        except Exception as e:
+            return table_name, None, time.perf_counter() - started, e
+
+    print(f"\nLoading {len(loaders)} tables with {workers} parallel connections...")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda args: load(*args), loaders))
+        with pool.connection() as conn:
+            print_row_counts(conn)
+    finally:
+        pool.close()
+        print("\nConnections closed")
+
+    print("\n" + "="*60)
+    print("📊 Load summary")
+    print("="*60)
+    for table_name, rows, seconds, error in results:
+        if error is None:
+            print(f"✅ {table_name:<16} {rows:>12,} rows  {seconds:7.1f}s")
+        else:
+            print(f"❌ {table_name:<16} {'failed':>12}       {seconds:7.1f}s  {error}")
+    print(f"   Wall clock: {time.perf_counter() - started:.1f}s")
+
+    errors = [error for _, _, _, error in results if error is not None]
+    if errors:
+        print(f"\n❌ {len(errors)} of {len(results)} tables failed to load")
+        raise errors[0]
+    LoadCheckpoint.clear_all()
+
+    print("\n" + "="*60)
+    print("✨ All data loaded successfully!")
+    print("="*60)
+
+
+# Tables copied into every fan-out schema (manifest + watermarks so appends and
+# get_next_incremental.py work there as well)
+FANOUT_TABLES = ("RAW_PLAYERS", "RAW_SESSIONS", "RAW_GAME_EVENTS", MANIFEST_TABLE, WATERMARK_TABLE)
+
+
+def fan_out(schemas: list, workers: int = LOAD_FANOUT_WORKERS):
+    """
+    Mirror the just-loaded tables into each of `schemas` (created if missing).
+
+    The data is uploaded once, into the backend's own schema; every other schema gets
+    server-side copies of FANOUT_TABLES (zero-copy CLONE on Snowflake, so 100 schemas
+    cost one upload plus 500 metadata operations). Existing tables there are replaced,
+    whatever the load mode: a fan-out schema is a copy of the loaded one. Schemas are
+    processed concurrently over a ConnectionPool of `workers` connections; failures are
+    summarized and the first one is re-raised.
+    """
+    if not schemas:
+        return
+    source = BACKEND.default_schema()
+    schemas = [s for s in dict.fromkeys(schemas) if s.upper() != source.upper()]
+    if not schemas:
+        return
+
+    pool = ConnectionPool(min(workers, len(schemas)))
+
+    def clone(schema):
+        started = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                BACKEND.create_schema(conn, schema)
+                for table in FANOUT_TABLES:
+                    BACKEND.clone_table(conn, table, schema)
+            return schema, time.perf_counter() - started, None
+        except Exception as e:
+            return schema, time.perf_counter() - started, e
+
+    print(f"\n🌱 Cloning {len(FANOUT_TABLES)} tables from {source} into {len(schemas)} schemas...")
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(schemas))) as executor:
+            results = list(executor.map(clone, schemas))
+    finally:
+        pool.close()
+
+    for schema, seconds, error in results:
+        if error is None:
+            print(f"✅ {schema:<24} {seconds:6.1f}s")
+        else:
+            print(f"❌ {schema:<24} {seconds:6.1f}s  {error}")
+    print(f"   Wall clock: {time.perf_counter() - started:.1f}s")
+
+    errors = [error for _, _, error in results if error is not None]
+    if errors:
+        print(f"\n❌ {len(errors)} of {len(results)} schemas failed to clone")
+        raise errors[0]
+
+
+def load_frames(
+    frames: dict,
+    mode: LoadMode = None,
+    workers: int = LOAD_WORKERS,
+    batch_id: str = LOAD_BATCH_ID,
+    fmt: str = OUTPUT_FORMAT,
+):
+    """Load in-memory frames (see run_load); prompts for the mode like the CLI when not given."""
+    run_load(mode or _prompt_load_mode(), frames, fmt=fmt, workers=workers, batch_id=batch_id)
 
 
 if __name__ == "__main__":
@@ -421,6 +1352,12 @@ if __name__ == "__main__":
         # Optionally also show the low‑level message for debugging
         print(f"\n   Raw error from driver: {e}")
         sys.exit(1)
+    except InvalidJSONError as e:
+        # Bad event properties in the data, not a configuration problem
+        print(f"\n❌ Invalid JSON in the data: {e}")
+        print("   Check the properties of the generated events (regenerate data/ with main.py);")
+        print("   the warehouse settings are not the problem.")
+        sys.exit(1)
     except ValueError as e:
         # Missing required env vars / misconfiguration
         print(f"\n❌ Configuration error: {e}")
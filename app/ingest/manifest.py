@@ -0,0 +1,106 @@
+"""
+Load manifest: which RAW files were already loaded into which table.
+
+The loader records one row per loaded file in RAW_LOAD_MANIFEST, in the same
+warehouse as the RAW tables:
+
+    TABLE_NAME | CONTENT_HASH | SOURCE_FILE | ROW_COUNT | LOAD_BATCH_ID | LOAD_MODE | LOADED_AT
+
+In APPEND mode a file whose content hash is already listed for its table is skipped
+without being read or uploaded, so re-running an incremental batch by mistake does
+not double it. RECREATE replaces the table, so it also resets that table's rows.
+Each partition of a Parquet dataset (see gen/storage.py) is recorded as a file.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# =====================
+# CONFIG
+# =====================
+MANIFEST_TABLE = "RAW_LOAD_MANIFEST"
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    TABLE_NAME VARCHAR(100) NOT NULL,
+    CONTENT_HASH VARCHAR(100) NOT NULL,
+    SOURCE_FILE VARCHAR(1000),
+    ROW_COUNT BIGINT,
+    LOAD_BATCH_ID VARCHAR(20),
+    LOAD_MODE VARCHAR(20),
+    LOADED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+# =====================
+# HELPERS
+# =====================
+def _quote(value) -> str:
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def file_hash(path: Path) -> str:
+    """
+    Content hash of a RAW file or dataset partition (gen.zonemap.content_hash), taken
+    from its zone map when that is up to date, so the file is not read.
+    """
+    from gen.zonemap import content_hash, read_zone_map  # loads pyarrow
+
+    entry = read_zone_map(path)
+    if entry is not None and entry.get("content_hash"):
+        return entry["content_hash"]
+    return content_hash(path)
+
+
+def frame_hash(df: "pd.DataFrame") -> str:
+    """Content hash of an in-memory frame (column names + row hashes)."""
+    import pandas as pd
+
+    digest = hashlib.sha256(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return "frame:" + digest.hexdigest()
+
+
+# =====================
+# MANIFEST
+# =====================
+class LoadManifest:
+    """RAW_LOAD_MANIFEST in the warehouse of `backend` (see ingest/backends.py)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.table = backend.qualify(MANIFEST_TABLE)
+
+    def ensure(self, conn) -> None:
+        self.backend.execute(conn, MANIFEST_SCHEMA.format(table=self.table))
+
+    def find(self, conn, table_name: str, content_hash: str) -> Optional[tuple]:
+        """Return (ROW_COUNT, LOAD_BATCH_ID, LOADED_AT) of an earlier load of this content, if any."""
+        rows = self.backend.fetchall(
+            conn,
+            f"SELECT ROW_COUNT, LOAD_BATCH_ID, LOADED_AT FROM {self.table} "
+            f"WHERE TABLE_NAME = {_quote(table_name)} AND CONTENT_HASH = {_quote(content_hash)} LIMIT 1",
+        )
+        return rows[0] if rows else None
+
+    def record(
+        self, conn, table_name: str, content_hash: str, source: str, rows: int, batch_id: str, mode: str,
+    ) -> None:
+        self.backend.execute(
+            conn,
+            f"INSERT INTO {self.table} (TABLE_NAME, CONTENT_HASH, SOURCE_FILE, ROW_COUNT, LOAD_BATCH_ID, LOAD_MODE) "
+            f"VALUES ({_quote(table_name)}, {_quote(content_hash)}, {_quote(source)}, {int(rows)}, "
+            f"{_quote(batch_id)}, {_quote(mode)})",
+        )
+
+    def reset(self, conn, table_name: str) -> None:
+        """Forget every load of table_name (its contents were replaced)."""
+        self.backend.execute(conn, f"DELETE FROM {self.table} WHERE TABLE_NAME = {_quote(table_name)}")
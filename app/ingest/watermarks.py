@@ -0,0 +1,161 @@
+"""
+Load watermarks: latest date and largest key (player_key, ...) per RAW table and batch.
+
+The loader tracks both while rows pass through it (no extra warehouse scan) and
+upserts one row per table and batch into RAW_LOAD_WATERMARKS:
+
+    TABLE_NAME | LOAD_BATCH_ID | MAX_DATE | MAX_NUMERIC_ID | UPDATED_AT
+
+get_next_incremental.py plans the next batch from this table with one query
+instead of scanning RAW_SESSIONS / RAW_GAME_EVENTS / RAW_PLAYERS.
+"""
+
+import threading
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from ingest.backends import _to_date
+from ingest.manifest import _quote
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+# =====================
+# CONFIG
+# =====================
+WATERMARK_TABLE = "RAW_LOAD_WATERMARKS"
+
+# (date column, BIGINT key column) tracked per RAW table; the key is the number
+# in the string ID (PLAYER_KEY 889 for player_889)
+WATERMARK_COLUMNS = {
+    "RAW_PLAYERS": ("FIRST_SEEN_AT", "PLAYER_KEY"),
+    "RAW_SESSIONS": ("SESSION_END", "SESSION_KEY"),
+    "RAW_GAME_EVENTS": ("EVENT_TIME", "EVENT_KEY"),
+}
+
+WATERMARK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    TABLE_NAME VARCHAR(100) NOT NULL,
+    LOAD_BATCH_ID VARCHAR(20) NOT NULL,
+    MAX_DATE DATE,
+    MAX_NUMERIC_ID BIGINT,
+    UPDATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Batch key for loads without a batch id
+NO_BATCH = "-"
+
+
+# =====================
+# TRACKING
+# =====================
+class Watermark:
+    """Running max date / key of the rows loaded into one table (thread-safe)."""
+
+    def __init__(self, table_name: str):
+        self.date_column, self.id_column = WATERMARK_COLUMNS[table_name]
+        self.max_date: Optional[date] = None
+        self.max_id = 0
+        self._lock = threading.Lock()
+
+    def update(self, df: "pd.DataFrame") -> None:
+        """Fold a frame about to be written (upper-case column names) into the watermark."""
+        if hasattr(df, "column_names"):
+            return self.update_arrow(df)
+        import pandas as pd
+
+        max_date = max_id = None
+        if self.date_column in df.columns:
+            value = pd.to_datetime(df[self.date_column], errors="coerce").max()
+            max_date = None if pd.isna(value) else value.date()
+        if self.id_column in df.columns:
+            value = pd.to_numeric(df[self.id_column], errors="coerce").max()
+            max_id = None if pd.isna(value) else int(value)
+        self.merge(max_date, max_id)
+
+    def update_arrow(self, table: "pa.Table") -> None:
+        """update() for an Arrow table whose columns are strings and int64 keys (see gen.storage.read_arrow_table)."""
+        import pyarrow.compute as pc
+
+        max_date = max_id = None
+        if self.date_column in table.column_names:
+            value = pc.max(pc.utf8_slice_codeunits(table[self.date_column], 0, 10)).as_py()
+            max_date = _to_date(value) if value else None
+        if self.id_column in table.column_names:
+            max_id = pc.max(table[self.id_column]).as_py()
+        self.merge(max_date, max_id)
+
+    def merge(self, max_date: Optional[date], max_id: Optional[int]) -> None:
+        with self._lock:
+            if max_date is not None and (self.max_date is None or max_date > self.max_date):
+                self.max_date = max_date
+            if max_id is not None and max_id > self.max_id:
+                self.max_id = max_id
+
+    def state(self) -> dict:
+        """JSON-friendly form, saved in chunk checkpoints so a resumed load keeps it."""
+        return {"max_date": self.max_date.isoformat() if self.max_date else None, "max_id": self.max_id}
+
+    def restore(self, state: Optional[dict]) -> None:
+        if state:
+            self.merge(_to_date(state.get("max_date")), state.get("max_id"))
+
+
+# =====================
+# WATERMARK TABLE
+# =====================
+class WatermarkTable:
+    """RAW_LOAD_WATERMARKS in the warehouse of `backend` (see ingest/backends.py)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.table = backend.qualify(WATERMARK_TABLE)
+
+    def ensure(self, conn) -> None:
+        self.backend.execute(conn, WATERMARK_SCHEMA.format(table=self.table))
+
+    def read(self, conn) -> Dict[str, Tuple[Optional[date], int]]:
+        """{table: (max date, max key)} over all batches, in one query (raises if the table is missing)."""
+        rows = self.backend.fetchall(
+            conn,
+            f"SELECT TABLE_NAME, MAX(MAX_DATE), MAX(MAX_NUMERIC_ID) FROM {self.table} GROUP BY TABLE_NAME",
+        )
+        return {name: (_to_date(max_date), int(max_id or 0)) for name, max_date, max_id in rows}
+
+    def upsert(self, conn, table_name: str, batch_id: str, watermark: Watermark) -> None:
+        """Replace the (table, batch) row, keeping the larger values if the batch was loaded before."""
+        batch = _quote(batch_id or NO_BATCH)
+        where = f"TABLE_NAME = {_quote(table_name)} AND LOAD_BATCH_ID = {batch}"
+        for max_date, max_id in self.backend.fetchall(
+            conn, f"SELECT MAX_DATE, MAX_NUMERIC_ID FROM {self.table} WHERE {where}"
+        ):
+            watermark.merge(_to_date(max_date), max_id)
+        max_date = _quote(watermark.max_date.isoformat() if watermark.max_date else None)
+        self.backend.execute(conn, f"DELETE FROM {self.table} WHERE {where}")
+        self.backend.execute(
+            conn,
+            f"INSERT INTO {self.table} (TABLE_NAME, LOAD_BATCH_ID, MAX_DATE, MAX_NUMERIC_ID) "
+            f"VALUES ({_quote(table_name)}, {batch}, {max_date}, {int(watermark.max_id)})",
+        )
+
+    def has(self, conn, table_name: str) -> bool:
+        return bool(self.backend.fetchall(
+            conn, f"SELECT 1 FROM {self.table} WHERE TABLE_NAME = {_quote(table_name)} LIMIT 1"
+        ))
+
+    def reset(self, conn, table_name: str) -> None:
+        """Forget table_name's watermarks (its contents were replaced)."""
+        self.backend.execute(conn, f"DELETE FROM {self.table} WHERE TABLE_NAME = {_quote(table_name)}")
+
+    def scan(self, conn, table_name: str) -> Watermark:
+        """Watermark of the rows already in table_name, from a full scan (tables loaded before this table existed)."""
+        watermark = Watermark(table_name)
+        date_column, id_column = WATERMARK_COLUMNS[table_name]
+        watermark.merge(
+            self.backend.max_date(conn, table_name, date_column),
+            self.backend.max_key(conn, table_name, id_column),
+        )
+        return watermark
@@ -2,7 +2,9 @@
 Main script: generate raw game data (CSVs) and load them into Snowflake.
 
 1. Generation (gen/): players → sessions → events (writes to data/*.csv).
+   The numpy and keyed engines run all three in this process (gen/pipeline.py), sharded by player.
 2. Ingest (ingest/): loads data/ CSVs into Snowflake RAW_* tables.
+   With the numpy engine the generated frames are handed to the loader in memory.
 
 Sessions and events are constrained to EVENT_DATE_START..EVENT_DATE_END.
 
@@ -11,6 +13,13 @@ Usage:
     python main.py --start 2024-01-01 --end 2024-12-31
     python main.py --no-ingest               # generate only
     python main.py --batch 2 --start 2011-02-13 --end 2011-03-15  # incremental: new users, sessions, events
+    python main.py --batch 2 --incremental   # plan dates / ID offsets from the warehouse, generate, append
+    python main.py --engine numpy            # vectorized generators (for large N_PLAYERS)
+    python main.py --workers 8               # numpy engine sharded over 8 processes
+    python main.py --engine numpy --no-csv   # generate + load in memory, no data/*.csv round trip
+    python main.py --players 1-100 --date 2011-01-20 --no-ingest  # keyed engine: only that slice
+    python main.py --shard 2/4               # keyed engine, node 2 of 4: writes data/shard-2-of-4/, no load
+    python main.py --merge-shards 4          # merge data/shard-*-of-4/ into data/ and load it
 """
 
 import argparse
@@ -32,6 +41,12 @@ CONFIG = {
     "EVENT_DATE_END": DEFAULT_END,
     "GAME_DATA_SEED": "42",  # Fixed seed so every run produces the same data for all users
     "LOAD_BATCH_ID": "1",  # Batch 2+ = new users/sessions/events for incremental APPEND testing
+    "GEN_ENGINE": "python",  # "python" = original random loop (course data), "numpy" = vectorized,
+    # "keyed" = vectorized with per-player RNG keys (any slice reproduces the full run's rows)
+    "WORKERS": 1,  # numpy / keyed engines: generator processes (output does not depend on it)
+    "LOAD_WORKERS": 1,  # RAW tables loaded into Snowflake in parallel (one connection each)
+    "OUTPUT_FORMAT": "csv",  # "csv", "arrow" (Arrow IPC files) or "parquet" (date-partitioned datasets)
+    "PROPERTIES_FORMAT": "json",  # "json" = properties JSON column, "columns" = typed prop_<key> columns
 }
 
 SCRIPTS = [
@@ -43,6 +58,7 @@ SCRIPTS = [
             "EVENT_DATE_END": CONFIG["EVENT_DATE_END"],
             "GAME_DATA_SEED": CONFIG["GAME_DATA_SEED"],
             "LOAD_BATCH_ID": CONFIG["LOAD_BATCH_ID"],
+            "GEN_ENGINE": CONFIG["GEN_ENGINE"],
         },
     },
     {
@@ -53,6 +69,7 @@ SCRIPTS = [
             "EVENT_DATE_END": CONFIG["EVENT_DATE_END"],
             "GAME_DATA_SEED": CONFIG["GAME_DATA_SEED"],
             "LOAD_BATCH_ID": CONFIG["LOAD_BATCH_ID"],
+            "GEN_ENGINE": CONFIG["GEN_ENGINE"],
         },
     },
     {
@@ -63,6 +80,8 @@ SCRIPTS = [
             "EVENT_DATE_END": CONFIG["EVENT_DATE_END"],
             "GAME_DATA_SEED": CONFIG["GAME_DATA_SEED"],
             "LOAD_BATCH_ID": CONFIG["LOAD_BATCH_ID"],
+            "GEN_ENGINE": CONFIG["GEN_ENGINE"],
+            "PROPERTIES_FORMAT": CONFIG["PROPERTIES_FORMAT"],
         },
     },
 ]
@@ -110,6 +129,50 @@ def run_generation(project_root: Path, gen_dir: Path) -> None:
     print("✨ Generation done.\n")
 
 
+def run_generation_in_process(
+    project_root: Path, write_csv: bool = True, collect: bool = True, output_dir: Path = None
+) -> dict:
+    """numpy / keyed engines: run gen/pipeline.py in this process and return the RAW_* frames."""
+    from gen.pipeline import file_sink, run_pipeline
+
+    print("\n" + "=" * 60)
+    print("🎮 Step 1: Data generation (in-process)")
+    print("=" * 60)
+    print("\n📊 Configuration:")
+    for key, value in CONFIG.items():
+        print(f"   {key}: {value}")
+    print()
+
+    output_dir = output_dir or project_root / "data"
+    sinks = [file_sink(output_dir, CONFIG["OUTPUT_FORMAT"], CONFIG["LOAD_BATCH_ID"])] if write_csv else []
+    try:
+        frames = run_pipeline(CONFIG, sinks=sinks, collect=collect)
+    except Exception as e:
+        print(f"\n❌ Error during generation: {e}\n")
+        sys.exit(1)
+
+    print("✨ Generation done.\n")
+    return frames
+
+
+def merge_generated_shards(project_root: Path, count: int) -> None:
+    """Concatenate data/shard-*-of-<count>/ (written by --shard i/<count>) into data/."""
+    from gen.keyed import merge_shards
+
+    print("\n" + "=" * 60)
+    print(f"🧩 Step 1: Merge {count} generation shards")
+    print("=" * 60 + "\n")
+
+    try:
+        rows = merge_shards(count, project_root / "data", CONFIG["OUTPUT_FORMAT"], CONFIG["LOAD_BATCH_ID"])
+    except Exception as e:
+        print(f"\n❌ Merge failed: {e}\n")
+        sys.exit(1)
+    for table, n in rows.items():
+        print(f"   {table}: {n} rows")
+    print("✨ Merge done.\n")
+
+
 def run_ingest(project_root: Path) -> None:
     """Run ingest/load_to_snowflake.py to load data/ CSVs into Snowflake."""
     ingest_script = project_root / "ingest" / "load_to_snowflake.py"
@@ -123,7 +186,12 @@ def run_ingest(project_root: Path) -> None:
 
     try:
         subprocess.run(
-            [sys.executable, str(ingest_script)],
+            [
+                sys.executable, str(ingest_script),
+                "--format", CONFIG["OUTPUT_FORMAT"],
+                "--workers", str(CONFIG["LOAD_WORKERS"]),
+                "--batch-id", CONFIG["LOAD_BATCH_ID"],
+            ],
             check=True,
             cwd=project_root,
         )
@@ -136,6 +204,53 @@ def run_ingest(project_root: Path) -> None:
         sys.exit(1)
 
 
+def plan_incremental_batch(offline: bool = False) -> None:
+    """Take the next batch's dates and ID offsets from the warehouse (ingest/get_next_incremental.py),
+    or with offline=True from the zone maps of data/."""
+    from ingest.get_next_incremental import get_next_incremental_params, plan_from_zone_maps
+
+    if offline:
+        print("\n🔎 Planning incremental batch from the data/ zone maps...")
+        try:
+            start, end, player_offset, session_offset, event_offset = plan_from_zone_maps(
+                fmt=CONFIG["OUTPUT_FORMAT"]
+            )
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    else:
+        print("\n🔎 Planning incremental batch from the warehouse watermarks...")
+        start, end, player_offset, session_offset, event_offset = get_next_incremental_params()
+    CONFIG["EVENT_DATE_START"] = start
+    CONFIG["EVENT_DATE_END"] = end
+    # Read by the generator scripts and gen/pipeline.py
+    os.environ["PLAYER_ID_OFFSET"] = str(player_offset)
+    os.environ["SESSION_ID_OFFSET"] = str(session_offset)
+    os.environ["EVENT_ID_OFFSET"] = str(event_offset)
+    print(f"   Dates {start}..{end}")
+    print(f"   IDs from player_{player_offset}, session_{session_offset}, event_{event_offset}")
+
+
+def run_ingest_in_process(frames: dict, mode: str = None) -> None:
+    """Load in-memory frames with ingest/load_to_snowflake.py without re-reading data/ CSVs
+    (tables missing from frames are read from data/)."""
+    print("\n" + "=" * 60)
+    print("📤 Step 2: Load to Snowflake (in-process)")
+    print("=" * 60 + "\n")
+
+    try:
+        from ingest.load_to_snowflake import load_frames
+
+        load_frames(
+            frames, mode, workers=CONFIG["LOAD_WORKERS"], batch_id=CONFIG["LOAD_BATCH_ID"],
+            fmt=CONFIG["OUTPUT_FORMAT"],
+        )
+        print("\n✨ Ingest done.\n")
+    except Exception as e:
+        print(f"\n❌ Ingest failed: {e}\n")
+        sys.exit(1)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate game data and optionally load to Snowflake.")
     parser.add_argument(
@@ -162,26 +277,184 @@ def main():
         default=1,
         help="Load batch ID (default: 1). Use 2+ for incremental: new users, sessions, events with unique IDs.",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["python", "numpy", "keyed"],
+        default=None,
+        help="Generation engine (default: python). 'numpy' draws whole columns at once; "
+        "same seed => same data, but not the same data as the python engine. 'keyed' is "
+        "vectorized too, with every value keyed by (seed, player, session), so --players / "
+        "--sample / --date can generate a slice on its own.",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Generate with N processes (implies --engine numpy unless --engine keyed). "
+        "Output is identical for any N.",
+    )
+    parser.add_argument(
+        "--players",
+        metavar="LIST",
+        default=None,
+        help="Keyed engine: only these players, e.g. 1-100,250 (the rows a full run writes for them).",
+    )
+    parser.add_argument(
+        "--sample",
+        metavar="PCT",
+        default=None,
+        help="Keyed engine: only a deterministic sample of the players, e.g. 1%%.",
+    )
+    parser.add_argument(
+        "--date",
+        metavar="DAY[..DAY]",
+        default=None,
+        help="Keyed engine: only the rows of these days (players by first_seen_at, sessions by "
+        "session_start, events by event_time), e.g. 2011-01-20 or 2011-01-20..2011-01-22.",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        default=None,
+        help="Keyed engine: generate only the I-th of N player ranges into data/shard-I-of-N/ "
+        "(no load). Its IDs are the ones a single run gives those players, so every node can "
+        "run its shard with the same settings and no coordination.",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Instead of generating, merge data/shard-*-of-N/ into data/ (identical to a "
+        "single-node run) and load it.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "arrow", "parquet"],
+        default=None,
+        help="File format for data/ (default: csv). 'arrow' writes typed Arrow IPC files "
+        "that the next stages and the loader open memory-mapped. 'parquet' writes sessions "
+        "and events as datasets partitioned by day (date=YYYY-MM-DD/part-*.parquet).",
+    )
+    parser.add_argument(
+        "--properties",
+        choices=["json", "columns"],
+        default=None,
+        help="How event properties are written (default: json). 'columns' writes one typed "
+        "prop_<key> column per property; the loader rebuilds the VARIANT from them.",
+    )
+    parser.add_argument(
+        "--load-workers",
+        metavar="N",
+        type=int,
+        default=None,
+        help="Load the three RAW tables with up to N parallel Snowflake connections (default: 1).",
+    )
+    parser.add_argument(
+        "--no-csv",
+        action="store_true",
+        help="numpy / keyed engines: do not write data/ files, pass the generated frames to the loader in memory",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Plan the batch from the warehouse (next dates and ID offsets, like "
+        "ingest/get_next_incremental.py), generate it and append it, over one warehouse session. "
+        "--start / --end still override the planned dates.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="With --incremental: plan from the zone maps of the previous batch in data/ "
+        "(gen/zonemap.py) instead of querying the warehouse.",
+    )
     args = parser.parse_args()
 
+    if args.format:
+        CONFIG["OUTPUT_FORMAT"] = args.format
+    if args.incremental:
+        plan_incremental_batch(offline=args.offline)
     event_start = args.start or CONFIG["EVENT_DATE_START"]
     event_end = args.end or CONFIG["EVENT_DATE_END"]
     CONFIG["EVENT_DATE_START"] = event_start
     CONFIG["EVENT_DATE_END"] = event_end
     CONFIG["LOAD_BATCH_ID"] = str(args.batch)
+    if args.engine:
+        CONFIG["GEN_ENGINE"] = args.engine
+    if args.players or args.sample or args.date:
+        if args.engine not in (None, "keyed"):
+            print("❌ --players / --sample / --date need the keyed engine")
+            sys.exit(1)
+        CONFIG["GEN_ENGINE"] = "keyed"
+        CONFIG.update(PLAYERS=args.players, SAMPLE=args.sample, DATE=args.date)
+    if args.shard:
+        if args.engine not in (None, "keyed"):
+            print("❌ --shard needs the keyed engine")
+            sys.exit(1)
+        if args.no_csv:
+            print("❌ --shard writes data/shard-I-of-N/ files, drop --no-csv")
+            sys.exit(1)
+        CONFIG["GEN_ENGINE"] = "keyed"
+        CONFIG["SHARD"] = args.shard
+    if args.workers:
+        if CONFIG["GEN_ENGINE"] != "keyed":
+            CONFIG["GEN_ENGINE"] = "numpy"
+        CONFIG["WORKERS"] = args.workers
+    if args.load_workers:
+        CONFIG["LOAD_WORKERS"] = args.load_workers
+    if args.properties:
+        CONFIG["PROPERTIES_FORMAT"] = args.properties
+        SCRIPTS[-1]["env"]["PROPERTIES_FORMAT"] = args.properties
     for script_config in SCRIPTS:
         script_config["env"]["EVENT_DATE_START"] = event_start
         script_config["env"]["EVENT_DATE_END"] = event_end
         script_config["env"]["LOAD_BATCH_ID"] = CONFIG["LOAD_BATCH_ID"]
+        script_config["env"]["GEN_ENGINE"] = CONFIG["GEN_ENGINE"]
+        script_config["env"]["OUTPUT_FORMAT"] = CONFIG["OUTPUT_FORMAT"]
 
     project_root = Path(__file__).resolve().parent
     gen_dir = project_root / "gen"
 
-    run_generation(project_root, gen_dir)
-    if not args.no_ingest:
-        run_ingest(project_root)
+    if args.merge_shards:
+        merge_generated_shards(project_root, args.merge_shards)
+        if args.incremental and not args.no_ingest:
+            run_ingest_in_process({}, "append")
+        elif not args.no_ingest:
+            run_ingest(project_root)
+        else:
+            print("Skipping ingest (--no-ingest). Data is in data/\n")
+    elif args.shard:
+        from gen.keyed import parse_shard, shard_dir
+
+        try:
+            index, count = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        output_dir = shard_dir(project_root / "data", index, count)
+        run_generation_in_process(project_root, collect=False, output_dir=output_dir)
+        print(f"Shard {index}/{count} is in {output_dir}; load after --merge-shards {count}\n")
+    elif CONFIG["GEN_ENGINE"] in ("numpy", "keyed"):
+        if args.no_csv and args.no_ingest:
+            print("❌ --no-csv needs the ingest step (drop --no-ingest), otherwise nothing is kept")
+            sys.exit(1)
+        frames = run_generation_in_process(
+            project_root, write_csv=not args.no_csv, collect=not args.no_ingest
+        )
+        if not args.no_ingest:
+            run_ingest_in_process(frames, "append" if args.incremental else None)
+        else:
+            print("Skipping ingest (--no-ingest). Data is in data/\n")
     else:
-        print("Skipping ingest (--no-ingest). Data is in data/\n")
+        run_generation(project_root, gen_dir)
+        if args.incremental and not args.no_ingest:
+            # Same process as the planning step, so the load reuses its session
+            run_ingest_in_process({}, "append")
+        elif not args.no_ingest:
+            run_ingest(project_root)
+        else:
+            print("Skipping ingest (--no-ingest). Data is in data/\n")
 
     print("=" * 60)
     print("✅ Pipeline finished successfully")
@@ -215,30 +215,12 @@ RUN_MODE="${RUN_MODE:-1}"
 # ----- Generate data -------------------------------------------------------
 
 if [[ "$RUN_MODE" == "2" ]]; then
-  # Auto-detect next date range and ID offsets from Snowflake (max date + 1, max ID + 1)
-  print_step "Incremental batch: detecting date range and ID offsets from Snowflake"
-  INC_START="2011-02-13"
-  INC_END="2011-03-15"
-  INC_PLAYER_OFFSET=1
-  INC_SESSION_OFFSET=1
-  INC_EVENT_OFFSET=0
-  if eval "$(cd "${APP_DIR}" && python ingest/get_next_incremental.py 2>/dev/null)"; then
-    :
-  fi
-  echo "  Dates ${INC_START:-2011-02-13}..${INC_END:-2011-03-15}"
-  echo "  IDs from player_${INC_PLAYER_OFFSET:-1}, session_${INC_SESSION_OFFSET:-1}, event_${INC_EVENT_OFFSET:-0}"
-  (
-    cd "${APP_DIR}"
-    export PLAYER_ID_OFFSET="${INC_PLAYER_OFFSET:-1}"
-    export SESSION_ID_OFFSET="${INC_SESSION_OFFSET:-1}"
-    export EVENT_ID_OFFSET="${INC_EVENT_OFFSET:-0}"
-    python main.py --batch 2 --start "${INC_START:-2011-02-13}" --end "${INC_END:-2011-03-15}" --no-ingest
-  )
-  print_ok "Incremental batch generated (app/data/)"
-  print_step "Appending incremental batch into Snowflake RAW tables"
+  # One process, one Snowflake session: read the watermarks (max date + 1, max ID + 1),
+  # generate the batch and append it
+  print_step "Incremental batch: planning from Snowflake, generating and appending"
   (
     cd "${APP_DIR}"
-    python ingest/load_to_snowflake.py --mode append
+    python main.py --batch 2 --incremental
   )
   print_ok "Incremental batch appended to Snowflake"
 else
@@ -252,7 +234,7 @@ else
   print_step "Loading data into Snowflake RAW tables (create/replace)"
   (
     cd "${APP_DIR}"
-    python ingest/load_to_snowflake.py --mode recreate
+    python ingest/load_to_snowflake.py --mode recreate --batch-id 1
   )
   print_ok "Data loaded into Snowflake"
 fi